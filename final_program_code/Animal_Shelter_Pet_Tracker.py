@@ -13,9 +13,19 @@
         - Python 3.10+
         - tkinter            : GUI components, if applicable)
         - json               : Data Storage and serialization
-        - datetime           : DOB management
         - os                 : File path manipulation 
-        - Pillow (PIL)       : Image handling for pet profiles
+        - Pillow (PIL)       : Image handling for pet profiles (shelter/thumbnails.py)
+                               and near-duplicate photo checks (shelter/assets.py)
+        - shelter            : Tk-free core package (models, validation,
+                               storage, search); the portal calls its
+                               ShelterService for every data operation
+        - virtual_list       : Scrollable, sortable search results (virtual_list.py)
+        - numpy              : Population reports (shelter/analytics.py), loaded
+                               when the report window is first opened
+        - shelter.metrics    : Timings behind the hidden diagnostics window
+                               (Ctrl+Shift+D) and the SHELTER_METRICS_FILE dump
+        - shelter.events     : Change events that patch open search results,
+                               and the SHELTER_CHANGE_FEED file
         - messagebox, Toplevel, filedialog :UI extensions from tkinter 
 
 ===============================================================================
@@ -24,80 +34,65 @@
 # Imports — Standard and third-party libraries
 # =============================================================================
 
-import json
 import tkinter as tk
 from tkinter import messagebox, Toplevel, filedialog
-import datetime
 import os
-from PIL import Image, ImageTk  # Requires Pillow library
+import time
+from shelter import metrics
+from shelter.events import INSERT, RELOAD, ChangeFeed
+from shelter.repository import ConflictError, normalize_filters, search_predicate
+from shelter.service import ShelterService
+from shelter.thumbnails import ThumbnailCache, ThumbnailLoader
+from virtual_list import VirtualResultList
+
+DATA_FILE = "animals.json"
+DATABASE_FILE = "animals.db"
+THUMBNAIL_DIR = ".thumbnails"
+STORAGE_BACKEND = os.environ.get("SHELTER_BACKEND", "journal")  #"journal" or "sqlite"
+DURABILITY = os.environ.get("SHELTER_DURABILITY", "batched")  #"batched" saves in the background, "immediate" waits for the disk
+BINARY_SNAPSHOT = os.environ.get("SHELTER_BINARY_SNAPSHOT", "1") != "0"  #start up from animals.json.bin when current
+LOAD_BATCH_SIZE = 2000  #records indexed per event-loop turn while loading
+SEARCH_DEBOUNCE_MS = 250  #pause in typing before a live search runs
+SEARCH_BATCH_SIZE = 500  #results matched/inserted per step of a search
+RANKED_LIMIT = 200  #best matches listed by a fuzzy search
+FRAME_BUDGET = 0.012  #seconds of search work per event-loop turn (under one 60 Hz frame)
+REFRESH_MS = 2000  #how often to pick up changes saved by other workstations
+SAVE_POLL_MS = 100  #how often to check on background saves while any are queued
+METRICS_FILE = os.environ.get("SHELTER_METRICS_FILE", "")  #JSON Lines metrics dump; setting it enables metrics
+DIAGNOSTICS_REFRESH_MS = 1000  #how often the diagnostics window redraws
+PROFILE_FILE = "shelter_profile.prof"  #where a cProfile capture is saved
+CHANGE_FEED = os.environ.get("SHELTER_CHANGE_FEED", "")  #JSON Lines file other programs can follow; off when empty
+
+#form label -> Animal.to_dict() field, for the intake and update forms
+FORM_FIELDS = {
+    "Name": "name",
+    "Gender (M/F)": "gender",
+    "Type (dog, cat, exotic)": "type",
+    "Breed": "breed",
+    "Weight (lb.)": "weight",
+    "DOB (YYYY-MM-DD)": "dob",
+    "Microchip #": "microchip",
+    "Health Notes": "health_notes",
+    "Description": "description",
+}
+FIELD_LABELS = {field: label.split(" (")[0] for label, field in FORM_FIELDS.items()}
+FIELD_LABELS["image_path"] = "Photo"
 
 # =============================================================================
-# Data Models — Object-oriented structure for pets
+# Service Setup — Choose the data backend
 # =============================================================================
 
-class Animal:
+def create_service():
     """
-    Base class representing general animal information.
-
-    Attributes:
-        animal_type (str)       : Generic type indicator; overridden in subclasses
-        name (str)              : Animal’s name
-        gender (str)            : Gender (e.g., Male, Female)
-        breed (str)             : Breed category
-        weight (float)          : Weight of animal in pounds/kilograms
-        dob (str)               : Date of birth (expected format: YYYY-MM-DD)
-        microchip_number (str)  : Unique identifier for tracking
-        health_notes (str)      : Medical or behavioral remarks
-        description (str)       : Additional descriptors (e.g., temperament)
-        image_path (str)        : File path to profile image (optional)
+    Opens the shelter data with the backend selected by the SHELTER_BACKEND
+    environment variable. The SQLite database is seeded from animals.json the
+    first time it is created. SHELTER_DURABILITY picks whether edits are
+    written behind the GUI ("batched") or before it continues ("immediate").
+    With the journal backend, loading reads the binary copy of animals.json
+    (kept up to date automatically) unless SHELTER_BINARY_SNAPSHOT is 0.
     """
-    def __init__(self, name, gender, breed, weight, dob, microchip_number, health_notes, description, image_path=None):
-        self.animal_type = "animal"
-        self.name = name
-        self.gender = gender
-        self.breed = breed
-        self.weight = weight
-        self.dob = dob
-        self.microchip_number = microchip_number
-        self.health_notes = health_notes
-        self.description = description
-        self.image_path = image_path or ""
-
-    def to_dict(self):
-        """
-        Converts the instance into a dictionary for serialization.
-        """
-        return {
-            "type": self.animal_type,
-            "name": self.name,
-            "gender": self.gender,
-            "breed": self.breed,
-            "weight": self.weight,
-            "dob": self.dob,
-            "microchip": self.microchip_number,
-            "health_notes": self.health_notes,
-            "description": self.description,
-            "image_path": self.image_path,
-        }
-
-# =============================================================================
-# Specific Pet Types — Inherit from Animal and override type
-# =============================================================================
-
-class Cat(Animal):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.animal_type = "cat"
-
-class Dog(Animal):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.animal_type = "dog"
-
-class Exotic(Animal):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.animal_type = "exotic"
+    return ShelterService.open(STORAGE_BACKEND, DATA_FILE, DATABASE_FILE, DURABILITY,
+                               binary_snapshot=BINARY_SNAPSHOT)
 
 # =============================================================================
 # GUI Controller — Manages application window, layout, and user events
@@ -116,11 +111,29 @@ class AnimalPortal:
         self.root.columnconfigure(tuple(range(6)), weight=1)
         self.root.rowconfigure(tuple(range(12)), weight=1)
 
-        self.animals = self.load_animals()
-        self.image_path = ""  # Temporarily store uploaded image path
+        self.shelter = create_service()
+        self.thumbnails = ThumbnailLoader(self.root, ThumbnailCache(THUMBNAIL_DIR))
+        self.image_path = ""  # Temporarily store uploaded photo's reference
+        self.refresh_job = None
+        self.watching_saves = False
+        self.metrics_dump = None
+        if METRICS_FILE:
+            metrics.enable()
+            self.metrics_dump = metrics.MetricsDump(METRICS_FILE).start()
+        self.change_feed = None
+        if CHANGE_FEED:
+            self.change_feed = self.shelter.changes.subscribe(ChangeFeed(CHANGE_FEED))
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-Shift-D>", self.show_diagnostics) #hidden: for support, not in the UI
 
         self.create_onboarding_form()
         self.create_search_form()
+        self.shelter.changes.subscribe(self.apply_changes)
+
+        #records stream in after the window is up
+        self.status = tk.Label(self.root, text="", fg="gray", anchor='w')
+        self.status.grid(row=11, column=0, sticky='w', padx=5)
+        self.load_animals()
 
 # =============================================================================
 # GUI Form Setup — Onboarding and Search Interfaces for Pet Data Entry
@@ -146,6 +159,7 @@ class AnimalPortal:
         #buttons for image upload and sacing form data
         tk.Button(self.root, text="Upload Image", command=self.upload_image).grid(row=10, column=0, columnspan=2)
         tk.Button(self.root, text="SAVE", command=self.save_animal).grid(row=11, column=1, sticky='e', pady=10)
+        tk.Button(self.root, text="REPORTS", command=self.show_report).grid(row=0, column=0, sticky='w', padx=5)
 
 # -----------------------------------------------------------------------------
 
@@ -155,7 +169,7 @@ class AnimalPortal:
         to locate animals based on user-input filters.
         """
         tk.Label(self.root, text="Search", font=('Arial', 14, 'bold')).grid(row=0, column=3, columnspan=2, sticky='nsew')
-        search_fields = ["Name", "Gender (M/F)", "Type", "Breed", "Microchip #"]
+        search_fields = ["Name", "Gender (M/F)", "Type", "Breed", "Microchip #", "Keywords"]
         self.search_entries = {}
 
         #generate search gields using tkinter Entry widgets
@@ -164,212 +178,342 @@ class AnimalPortal:
             entry = tk.Entry(self.root)
             entry.grid(row=i + 1, column=4, sticky='ew', padx=5, pady=2)
             entry.config(width=30)
+            entry.bind("<KeyRelease>", self.schedule_search) #search as you type
             self.search_entries[field] = entry
 
-        #listbox to show results based on search criteria
-        self.search_results = tk.Listbox(self.root, height=10)
-        self.search_results.grid(row=6, column=3, columnspan=2, rowspan=6, sticky='nsew', padx=5)
-        self.search_results.bind("<<ListboxSelect>>", self.show_animal_details)
+        #virtualized list: holds every match but only draws the rows in view
+        self.search_results = VirtualResultList(
+            self.root,
+            format_row=lambda animal: f"{animal.name} ({animal.animal_type}, {animal.breed})",
+            on_select=self.show_animal_details,
+            item_key=lambda animal: animal.animal_id,
+        )
+        self.search_results.grid(row=7, column=3, columnspan=2, rowspan=5, sticky='nsew', padx=5)
+        self.result_filters = None  #filters of the last finished, complete search
+        self.listed_filters = None  #filters of the substring search on screen, finished or not
+        self.ranked_query = None  #(filters, keywords) of the fuzzy results on screen
+        self.search_job = None  #pending debounced search
+        self.search_generation = 0  #bumps on every search so stale work stops
 
         tk.Button(self.root, text="SEARCH", command=self.search_animals).grid(row=5, column=4, sticky='e', pady=10)
 
+        #typo-tolerant matching ranked by relevance; off gives exact substring matches
+        self.fuzzy_search = tk.BooleanVar(self.root, value=True)
+        tk.Checkbutton(self.root, text="Fuzzy match", variable=self.fuzzy_search,
+                       command=self.search_animals).grid(row=0, column=4, sticky='e')
+
 # =============================================================================
 # File Dialog Utility — Upload image for animal profile
 # =============================================================================
 
     def upload_image(self):
         """
-        Opens a file dialog for image selection and stores the file path.
+        Opens a file dialog for image selection and copies the photo into the
+        shelter's photo store, keeping its reference for the save.
+        The thumbnail is generated in the background right away.
         """
         filepath = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.jpeg *.gif")])
         if filepath:
-            self.image_path = filepath
+            reference = self.import_photo(filepath)
+            if reference:
+                self.image_path = reference
+
+    def import_photo(self, filepath, animal=None):
+        """
+        Stores an uploaded photo and, if it matches the photo of an animal
+        already on file (the same picture, or a resized / re-saved copy),
+        asks whether to use it anyway.
+
+        Args:
+            filepath (str)  : File picked in the dialog
+            animal (Animal) : Animal being updated, not counted as a match
+        Returns:
+            The photo's reference, or None if it was not used
+        """
+        try:
+            reference, similar = self.shelter.import_photo(filepath, animal.animal_id if animal else None)
+        except OSError as error:
+            messagebox.showerror("Photo not added", f"The photo could not be copied:\n{error}")
+            return None
+        if similar:
+            names = ", ".join(match.name for match in similar[:10])
+            if not messagebox.askyesno("Possible duplicate photo",
+                                       f"This photo looks like the one on file for {names}.\nUse it anyway?"):
+                return None
+        self.thumbnails.prefetch(self.shelter.photo_path(reference))
+        return reference
 
 # =============================================================================
 # Result Display — Show animal details in pop-up window
 # =============================================================================
 
-    def show_animal_details(self, event):
+    @metrics.timed("gui.details")
+    def show_animal_details(self, item):
         """
         Displays detailed profile info for a selected animal from the search list.
         Includes name, type, health data, etc. if available.
         """
-        selection = self.search_results.curselection()
-        if not selection:
+        animal = self.shelter.get(item.animal_id) #fresh copy of the record for viewing/editing
+        if animal is None:
             return
 
-        selected_text = self.search_results.get(selection[0]) 
-        name = selected_text.split(" (")[0] #parse name from display string
-
-        for idx, animal in enumerate(self.animals):
-            if animal.name == name:
-                detail_win = Toplevel(self.root)
-                detail_win.title(f"Details for {animal.name}")
-                detail_win.geometry("500x600")
-
-                #assemble formatted information string
-                info = (
-                    f"Name: {animal.name}\n"
-                    f"Gender: {animal.gender}\n"
-                    f"Type: {animal.animal_type}\n"
-                    f"Breed: {animal.breed}\n"
-                    f"Weight: {animal.weight} lbs\n"
-                    f"DOB: {animal.dob}\n"
-                    f"Microchip #: {animal.microchip_number}\n"
-                    f"Health Notes: {animal.health_notes}\n"
-                    f"Description: {animal.description}"
-                )
-
-                #render information as label
-                label = tk.Label(detail_win, text=info, justify='left', anchor='nw')
-                label.pack(fill='both', expand=True, padx=10, pady=10)
-
-                #if image path exists and is valid display profile image
-                if animal.image_path and os.path.exists(animal.image_path):
-                    img = Image.open(animal.image_path)
-                    img.thumbnail((300, 300))
-                    img_tk = ImageTk.PhotoImage(img)
-                    img_label = tk.Label(detail_win, image=img_tk)
-                    img_label.image = img_tk  # Keep reference
-                    img_label.pack(pady=5)
-
-                # ------------------------------------------------------------------
-                # Nested window for updating animal information
-                # ------------------------------------------------------------------
-
-                def open_update_window():
-                    update_win = Toplevel(detail_win)
-                    update_win.title(f"Update {animal.name}")
-                    update_win.geometry("400x600")
-                    entries = {}
-                    fields = ["Name", "Gender (M/F)", "Type (dog, cat, exotic)", "Breed", "Weight (lb.)", "DOB (YYYY-MM-DD)", "Microchip #", "Health Notes", "Description"]
+        detail_win = Toplevel(self.root)
+        detail_win.title(f"Details for {animal.name}")
+        detail_win.geometry("500x600")
+
+        #assemble formatted information string
+        info = (
+            f"Name: {animal.name}\n"
+            f"Gender: {animal.gender}\n"
+            f"Type: {animal.animal_type}\n"
+            f"Breed: {animal.breed}\n"
+            f"Weight: {animal.weight} lbs\n"
+            f"DOB: {animal.dob}\n"
+            f"Intake: {animal.intake}\n"
+            f"Microchip #: {animal.microchip_number}\n"
+            f"Health Notes: {animal.health_notes}\n"
+            f"Description: {animal.description}"
+        )
+
+        #render information as label
+        label = tk.Label(detail_win, text=info, justify='left', anchor='nw')
+        label.pack(fill='both', expand=True, padx=10, pady=10)
+
+        #if the photo is in the store (or, for old records, at its path) display it
+        photo_path = self.shelter.photo_path(animal.image_path)
+        if photo_path:
+            #placeholder until the thumbnail is decoded off the main thread
+            img_label = tk.Label(detail_win, text="Loading photo...", fg="gray")
+            img_label.pack(pady=5)
+
+            def show_photo(img_tk):
+                if not img_label.winfo_exists():
+                    return  #window closed before the photo was ready
+                if img_tk is None:
+                    img_label.config(text="Photo could not be opened.")
+                    return
+                img_label.config(image=img_tk, text="")
+                img_label.image = img_tk  # Keep reference
+
+            self.thumbnails.request(photo_path, show_photo)
+
+        # ------------------------------------------------------------------
+        # Nested window for updating animal information
+        # ------------------------------------------------------------------
+
+        def open_update_window():
+            update_win = Toplevel(detail_win)
+            update_win.title(f"Update {animal.name}")
+            update_win.geometry("400x600")
+            entries = {}
+            fields = ["Name", "Gender (M/F)", "Type (dog, cat, exotic)", "Breed", "Weight (lb.)", "DOB (YYYY-MM-DD)", "Microchip #", "Health Notes", "Description"]
                     
-                    #generate entry form with prefilled data
-                    for i, field in enumerate(fields):
-                        tk.Label(update_win, text=field + ":").grid(row=i, column=0, sticky='e', padx=5, pady=5)
-                        ent = tk.Entry(update_win, width=30)
-                        ent.grid(row=i, column=1, padx=5, pady=5)
-                        entries[field] = ent
-
-                    #Populate fields with existing data
-                    entries["Name"].insert(0, animal.name)
-                    entries["Gender (M/F)"].insert(0, animal.gender)
-                    entries["Type (dog, cat, exotic)"].insert(0, animal.animal_type)
-                    entries["Breed"].insert(0, animal.breed)
-                    entries["Weight (lb.)"].insert(0, animal.weight)
-                    entries["DOB (YYYY-MM-DD)"].insert(0, animal.dob)
-                    entries["Microchip #"].insert(0, animal.microchip_number)
-                    entries["Health Notes"].insert(0, animal.health_notes)
-                    entries["Description"].insert(0, animal.description)
-
-                    #optional image update
-                    def upload_new_image():
-                        path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.jpeg *.gif")])
-                        if path:
-                            animal.image_path = path
-
-                    tk.Button(update_win, text="Upload New Image", command=upload_new_image).grid(row=len(fields), column=0, columnspan=2)
-
-                    #save validation and updating logic
-                    def save_updates():
-                        if not entries["Name"].get().strip():
-                            messagebox.showerror("Error", "Name is required.")
-                            return
-                        gender_val = entries["Gender (M/F)"].get().strip().upper()
-                        if gender_val not in ("M", "F"):
-                            messagebox.showerror("Error", "Gender must be M or F.")
+            #generate entry form with prefilled data
+            for i, field in enumerate(fields):
+                tk.Label(update_win, text=field + ":").grid(row=i, column=0, sticky='e', padx=5, pady=5)
+                ent = tk.Entry(update_win, width=30)
+                ent.grid(row=i, column=1, padx=5, pady=5)
+                entries[field] = ent
+
+            #Populate fields with existing data
+            entries["Name"].insert(0, animal.name)
+            entries["Gender (M/F)"].insert(0, animal.gender)
+            entries["Type (dog, cat, exotic)"].insert(0, animal.animal_type)
+            entries["Breed"].insert(0, animal.breed)
+            entries["Weight (lb.)"].insert(0, animal.weight)
+            entries["DOB (YYYY-MM-DD)"].insert(0, animal.dob)
+            entries["Microchip #"].insert(0, animal.microchip_number)
+            entries["Health Notes"].insert(0, animal.health_notes)
+            entries["Description"].insert(0, animal.description)
+
+            #optional image update; animal stays as loaded so the save can tell what changed
+            new_image = {}
+
+            def upload_new_image():
+                path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.jpeg *.gif")])
+                reference = path and self.import_photo(path, animal)
+                if reference:
+                    new_image["image_path"] = reference
+
+            tk.Button(update_win, text="Upload New Image", command=upload_new_image).grid(row=len(fields), column=0, columnspan=2)
+
+            #save validation and updating logic
+            def save_updates():
+                #validate and commit to persistent storage
+                fields = {field: entries[label].get() for label, field in FORM_FIELDS.items()}
+                fields.update(new_image)
+                force = False
+                while True:
+                    try:
+                        _, errors = self.shelter.update_animal(animal, fields, force)
+                        break
+                    except ConflictError as conflict:
+                        if conflict.current is None:
+                            messagebox.showerror("Not saved", f"{animal.name} was deleted on another workstation.")
+                            update_win.destroy()
+                            detail_win.destroy()
                             return
-                        dob_input = entries["DOB (YYYY-MM-DD)"].get().strip()
-                        if dob_input:
-                            try:
-                                datetime.datetime.strptime(dob_input, "%Y-%m-%d")
-                            except ValueError:
-                                messagebox.showerror("Error", "DOB must be in YYYY-MM-DD format.")
-                                return
-
-                        #update object properties with validated values
-                        animal.name = entries["Name"].get().strip()
-                        animal.gender = gender_val
-                        animal.animal_type = entries["Type (dog, cat, exotic)"].get().strip().lower()
-                        animal.breed = entries["Breed"].get().strip()
-                        animal.weight = entries["Weight (lb.)"].get().strip()
-                        animal.dob = dob_input
-                        animal.microchip_number = entries["Microchip #"].get().strip()
-                        animal.health_notes = entries["Health Notes"].get().strip()
-                        animal.description = entries["Description"].get().strip()
-
-                        #commit to persistent storage
-                        self.save_animals_to_file()
-                        messagebox.showinfo("Success", "Animal updated successfully!")
-                        update_win.destroy()
-                        detail_win.destroy()
-                        self.search_results.delete(0, tk.END)
-
-                    tk.Button(update_win, text="Save Changes", command=save_updates).grid(row=len(fields) + 1, column=1, pady=10)
-
-                tk.Button(detail_win, text="Update Animal", command=open_update_window).pack(pady=5)
-
-                # ------------------------------------------------------------------
-                # Option to delete animal record with confirmation prompt
-                # ------------------------------------------------------------------
-
-                def delete_animal():
-                    if messagebox.askyesno("Confirm Delete", f"Delete {animal.name}?"):
-                        self.animals.pop(idx)
-                        self.save_animals_to_file()
-                        self.search_results.delete(0, tk.END)
-                        detail_win.destroy()
-                        messagebox.showinfo("Deleted", f"{animal.name} has been deleted.")
-
-                tk.Button(detail_win, text="Delete Animal", fg="red", command=delete_animal).pack(pady=5)
-                break
+                        if not self.confirm_overwrite(animal, conflict):
+                            return #keep the other workstation's values; the form stays open
+                        force = True
+                if errors:
+                    messagebox.showerror("Error", errors[0])
+                    return
+                self.watch_saves()
+                messagebox.showinfo("Success", "Animal updated successfully!")
+                update_win.destroy()
+                detail_win.destroy()
+
+            tk.Button(update_win, text="Save Changes", command=save_updates).grid(row=len(fields) + 1, column=1, pady=10)
+
+        tk.Button(detail_win, text="Update Animal", command=open_update_window).pack(pady=5)
+
+        # ------------------------------------------------------------------
+        # Option to delete animal record with confirmation prompt
+        # ------------------------------------------------------------------
+
+        def delete_animal():
+            if messagebox.askyesno("Confirm Delete", f"Delete {animal.name}?"):
+                try:
+                    self.shelter.delete_animal(animal.animal_id, animal.to_dict())
+                except ConflictError as conflict:
+                    if not self.confirm_overwrite(animal, conflict, "Delete it anyway?"):
+                        return
+                    self.shelter.delete_animal(animal.animal_id)
+                self.watch_saves()
+                detail_win.destroy()
+                messagebox.showinfo("Deleted", f"{animal.name} has been deleted.")
+
+        tk.Button(detail_win, text="Delete Animal", fg="red", command=delete_animal).pack(pady=5)
+
+    def confirm_overwrite(self, animal, conflict, question="Replace those changes with yours?"):
+        """
+        Asks whether to go ahead after another workstation changed the same
+        fields of this animal since it was opened.
+        """
+        changed = ", ".join(FIELD_LABELS.get(field, field) for field in conflict.fields)
+        return messagebox.askyesno("Changed on another workstation",
+                                   f"{animal.name} was changed on another workstation since you opened it"
+                                   f" ({changed}).\n{question}")
 
 # =============================================================================
-# Data Management Functions — Save, Load, and Search Animal Records
-#==============================================================================
-    def save_animal(self):
+# Reports — Population analytics window
+# =============================================================================
+
+    def show_report(self):
         """
-        Validates and captures input from onboarding form to create a new animal record.
-        Handles type resolution, object instantiation, and data persistence.
+        Opens a window with the population report (counts, ages, weights and
+        length of stay). The report's columns are built once and kept current
+        as animals are saved, so reopening or refreshing it is quick.
         """
-        #retrieve and clean input values
-        name = self.entries["Name"].get().strip()
-        gender = self.entries["Gender (M/F)"].get().strip().upper()
-        type_ = self.entries["Type (dog, cat, exotic)"].get().strip().lower()
-
-        #gather remaining inputs into a dictionary for object construction
-        kwargs = {
-            "name": name,
-            "gender": gender,
-            "breed": self.entries["Breed"].get().strip(),
-            "weight": self.entries["Weight (lb.)"].get().strip(),
-            "dob": self.entries["DOB (YYYY-MM-DD)"].get().strip(),
-            "microchip_number": self.entries["Microchip #"].get().strip(),
-            "health_notes": self.entries["Health Notes"].get().strip(),
-            "description": self.entries["Description"].get().strip(),
-            "image_path": self.image_path
-        }
-
-        #validate required fields
-        if not name or gender not in ("M", "F") or not type_ or not kwargs["breed"]:
-            messagebox.showerror("Error", "Please fill required fields correctly.")
+        try:
+            from shelter.analytics import export_report, format_report  #needs NumPy
+        except ImportError:
+            messagebox.showerror("Reports unavailable", "Reports need NumPy (pip install numpy).")
             return
 
-        #validate date format
-        if kwargs["dob"]:
+        report_win = Toplevel(self.root)
+        report_win.title("Shelter Report")
+        report_win.geometry("560x600")
+        text = tk.Text(report_win, wrap='none')
+        text.pack(fill='both', expand=True, padx=10, pady=10)
+        current = {}
+
+        def refresh():
+            current["report"] = self.shelter.report()
+            text.config(state='normal')
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, format_report(current["report"]))
+            text.config(state='disabled')
+
+        def export():
+            path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+            if not path:
+                return
+            try:
+                export_report(current["report"], path)
+            except OSError as error:
+                messagebox.showerror("Export failed", str(error))
+                return
+            messagebox.showinfo("Exported", f"Report saved to {path}")
+
+        tk.Button(report_win, text="Refresh", command=refresh).pack(side='left', padx=10, pady=5)
+        tk.Button(report_win, text="Export JSON...", command=export).pack(side='right', padx=10, pady=5)
+        refresh()
+
+# =============================================================================
+# Diagnostics — Hidden metrics and profiling window
+# =============================================================================
+
+    def show_diagnostics(self, event=None):
+        """
+        Opens the diagnostics window (Ctrl+Shift+D): p50/p95/p99 timings and
+        counters for loading, saving, searching and photos, refreshed every
+        second, with switches for recording metrics and a cProfile capture.
+        """
+        diag_win = Toplevel(self.root)
+        diag_win.title("Diagnostics")
+        diag_win.geometry("640x520")
+        text = tk.Text(diag_win, wrap='none', font=('Courier', 10))
+        text.pack(fill='both', expand=True, padx=10, pady=10)
+        recording = tk.BooleanVar(diag_win, value=metrics.enabled())
+
+        def redraw():
+            if not text.winfo_exists():
+                return #window closed
+            if not metrics.profiling():
+                text.config(state='normal')
+                text.delete("1.0", tk.END)
+                text.insert(tk.END, metrics.format_snapshot(metrics.snapshot()))
+                text.config(state='disabled')
+            diag_win.after(DIAGNOSTICS_REFRESH_MS, redraw)
+
+        def toggle_profile():
+            if not metrics.profiling():
+                metrics.start_profile()
+                profile_button.config(text="Stop profile")
+                return
+            summary = metrics.stop_profile(PROFILE_FILE)
+            profile_button.config(text="Start profile")
+            text.config(state='normal')
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, f"Saved to {os.path.abspath(PROFILE_FILE)}\n\n{summary}")
+            text.config(state='disabled')
+
+        def dump_now():
+            path = METRICS_FILE or "shelter_metrics.jsonl"
             try:
-                datetime.datetime.strptime(kwargs["dob"], "%Y-%m-%d")
-            except ValueError:
-                messagebox.showerror("Error", "DOB must be in YYYY-MM-DD format.")
+                metrics.dump(path)
+            except OSError as error:
+                messagebox.showerror("Not written", str(error))
                 return
+            messagebox.showinfo("Written", f"Metrics appended to {os.path.abspath(path)}")
 
-        #resolve class type from input and instantiate object
-        cls = {"cat": Cat, "dog": Dog, "exotic": Exotic}.get(type_, Animal)
-        animal = cls(**kwargs)
-        self.animals.append(animal)  #append to live memory
+        tk.Checkbutton(diag_win, text="Record metrics", variable=recording,
+                       command=lambda: metrics.enable(recording.get())).pack(side='left', padx=10, pady=5)
+        profile_button = tk.Button(diag_win, text="Stop profile" if metrics.profiling() else "Start profile",
+                                   command=toggle_profile)
+        profile_button.pack(side='left', padx=5, pady=5)
+        tk.Button(diag_win, text="Reset", command=metrics.reset).pack(side='left', padx=5, pady=5)
+        tk.Button(diag_win, text="Dump to file", command=dump_now).pack(side='right', padx=10, pady=5)
+        redraw()
 
-        #commit update to file
-        self.save_animals_to_file()
+# =============================================================================
+# Data Management Functions — Save, Load, and Search Animal Records
+#==============================================================================
+    def save_animal(self):
+        """
+        Validates and captures input from onboarding form to create a new animal record.
+        Handles type resolution, object instantiation, and data persistence.
+        """
+        #retrieve input values; the service validates them (same rules as the bulk importer)
+        fields = {field: self.entries[label].get() for label, field in FORM_FIELDS.items()}
+        fields["image_path"] = self.image_path
+        animal, errors = self.shelter.add_animal(fields)
+        if errors:
+            messagebox.showerror("Error", errors[0])
+            return
+        self.watch_saves()
 
         #UI feedback and cleanup
         messagebox.showinfo("Success", "Animal added successfully!")
@@ -379,62 +523,254 @@ class AnimalPortal:
 
 # -----------------------------------------------------------------------------
 
+    def schedule_search(self, event=None):
+        """
+        Debounces typing in the search fields: the search runs once the user
+        has paused for SEARCH_DEBOUNCE_MS.
+        """
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.search_animals)
+
     def search_animals(self):
         """
-        Filters the animal records in memory using user-defined criteria.
+        Queries the shelter data using user-defined criteria.
         Displays matching entries in the search results listbox.
+
+        With "Fuzzy match" on, a search with a name, type, breed or keywords
+        lists the RANKED_LIMIT best matches in relevance order, tolerating
+        typos and spacing ("rotweiler", "domestic shorthair"). Keywords are
+        looked up in health notes and descriptions.
+
+        When the filters only got narrower since the last complete search
+        (e.g. a letter was typed), the previous results are re-filtered instead
+        of searching every animal again. Matching and listbox inserts run in
+        batches spread over event-loop turns so typing never stalls.
         """
-        self.search_results.delete(0, tk.END) #clear old results
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
 
         #retrieve filter values
-        name_filter = self.search_entries["Name"].get().lower()
-        gender_filter = self.search_entries["Gender (M/F)"].get().upper()
-        type_filter = self.search_entries["Type"].get().lower()
-        breed_filter = self.search_entries["Breed"].get().lower()
-        microchip_filter = self.search_entries["Microchip #"].get()
-
-        #loop through animal records and apply filters
-        for animal in self.animals:
-            if (name_filter in animal.name.lower() and
-                (gender_filter == "" or gender_filter == animal.gender) and
-                type_filter in animal.animal_type.lower() and
-                breed_filter in animal.breed.lower() and
-                microchip_filter in animal.microchip_number):
-                #display matched animal
-                self.search_results.insert(tk.END, f"{animal.name} ({animal.animal_type}, {animal.breed})")
+        filters = normalize_filters(
+            name=self.search_entries["Name"].get(),
+            gender=self.search_entries["Gender (M/F)"].get(),
+            animal_type=self.search_entries["Type"].get(),
+            breed=self.search_entries["Breed"].get(),
+            microchip=self.search_entries["Microchip #"].get(),
+        )
+        keywords = self.search_entries["Keywords"].get().strip()
+        if keywords or (self.fuzzy_search.get() and (filters["name"] or filters["animal_type"] or filters["breed"])):
+            self.show_ranked(filters, keywords)
+            return
+        if filters == self.result_filters:
+            return #results already on screen
+
+        batches = self.shelter.search_batches(filters, self.result_filters, self.search_results.items, SEARCH_BATCH_SIZE)
+        self.clear_results() #clear old results
+        self.listed_filters = filters
+        self.search_generation += 1
+        self.continue_search(self.search_generation, batches, filters)
+
+    def show_ranked(self, filters, keywords):
+        """
+        Lists the best fuzzy matches, best first. Only RANKED_LIMIT are kept,
+        so they arrive in one step instead of in batches.
+        """
+        query = (filters, keywords)
+        if query == self.ranked_query:
+            return #results already on screen
+        matches = self.shelter.ranked_search(filters, keywords, RANKED_LIMIT)
+        self.clear_results()
+        self.show_results(matches)
+        self.ranked_query = query
+        self.status.config(text=f"{len(matches):,} best matches")
+
+    def continue_search(self, generation, batches, filters):
+        """
+        Shows result batches until FRAME_BUDGET is used up, then yields to the
+        event loop and picks up again on the next turn.
+        """
+        if generation != self.search_generation:
+            return #a newer search replaced this one
+        deadline = time.perf_counter() + FRAME_BUDGET
+        while time.perf_counter() < deadline:
+            try:
+                batch = next(batches)
+            except StopIteration:
+                #only results computed over every animal can be refined later
+                self.result_filters = None if self.loading else filters
+                self.status.config(text=f"{len(self.search_results):,} matches")
+                return
+            self.show_results(batch)
+        self.root.after(1, self.continue_search, generation, batches, filters)
+
+    @metrics.timed("gui.show_results")
+    def show_results(self, animals):
+        """
+        Adds a batch of animals to the results list; only rows in view are drawn.
+        """
+        self.search_results.extend(animals)
 
 # -----------------------------------------------------------------------------
 
-    def save_animals_to_file(self):
+    def clear_results(self):
         """
-        Serializes all current animal records to a JSON file for persistence.
+        Empties the search results list.
         """
-        with open("animals.json", "w") as file:
-            json.dump([animal.to_dict() for animal in self.animals], file, indent=2)
+        self.search_results.clear()
+        self.result_filters = None
+        self.listed_filters = None
+        self.ranked_query = None
+        self.search_generation += 1 #stop any search still filling the list
 
-#------------------------------------------------------------------------------
+    def apply_changes(self, events):
+        """
+        Change subscriber: patches the search results on screen instead of
+        clearing them. Edited animals are redrawn where they are, deleted
+        ones and ones that no longer match drop out, and new matches are
+        added to a complete substring search (a search still running finds
+        them itself). Fuzzy results keep their ranking; a new animal only
+        shows up there on the next search. A RELOAD runs the search again.
+        """
+        if not (self.search_results.items or self.result_filters is not None):
+            return #no results open
+        if any(event.kind == RELOAD for event in events):
+            filters_on_screen = self.listed_filters is not None or self.ranked_query is not None
+            self.result_filters = None
+            self.ranked_query = None
+            if filters_on_screen:
+                self.search_animals()
+            return
+        matches = search_predicate(**self.listed_filters) if self.listed_filters is not None else None
+        listed = {animal.animal_id for animal in self.search_results.items}
+        replaced, removed, added = {}, set(), []
+        for event in events:
+            animal = self.shelter.get(event.animal_id)
+            if animal is None:
+                removed.add(event.animal_id)
+            elif matches is None: #fuzzy results
+                if event.animal_id in listed:
+                    replaced[event.animal_id] = animal
+                elif event.kind == INSERT:
+                    self.ranked_query = None #re-rank on the next search
+            elif matches(animal):
+                if event.animal_id in listed:
+                    replaced[event.animal_id] = animal
+                elif self.result_filters is not None:
+                    added.append(animal)
+            elif event.animal_id in listed:
+                removed.add(event.animal_id)
+        self.search_results.patch(replaced, removed & listed, added)
+
+# -----------------------------------------------------------------------------
 
     def load_animals(self):
         """
-        Loads animal records from the local JSON file and reconstructs object instances.
-        Handles file absence and decoding errors gracefully.
-    
-        Returns:
-            List of Animal (or subclass) instances
+        Starts loading animal records in batches scheduled with root.after, so the
+        window is usable immediately and stays responsive while a large file loads.
+        Searches run against whatever has been loaded so far.
+        """
+        self.loading = True
+        self.status.config(text="Loading animals...")
+        self.load_batches = self.shelter.iter_load(batch_size=LOAD_BATCH_SIZE)
+        self.root.after(1, self.load_next_batch)
+
+    def load_next_batch(self):
+        """
+        Loads one batch of records and schedules the next one.
+        Unreadable records are skipped and reported once loading finishes.
+        """
+        try:
+            count = next(self.load_batches)
+        except StopIteration:
+            self.finish_loading()
+            return
+        except ValueError:
+            self.loading = False
+            self.status.config(text="Animal data could not be read.") #not a JSON list at all
+            return
+        self.status.config(text=f"Loading animals... {count:,}")
+        self.root.after(1, self.load_next_batch)
+
+    def finish_loading(self):
+        """
+        Shows the final count and warns about records that had to be skipped.
+        """
+        self.loading = False
+        self.status.config(text=f"{self.shelter.count():,} animals")
+        skipped = self.shelter.skipped_records
+        if skipped:
+            details = "\n".join(f"Record {number}: {message}" for number, message in skipped[:10])
+            messagebox.showwarning("Some records skipped",
+                                   f"{len(skipped)} record(s) in {DATA_FILE} could not be read and were skipped:\n{details}")
+        else:
+            self.shelter.collect_photos() #deletes photos no animal uses anymore, off the main thread
+        self.refresh_job = self.root.after(REFRESH_MS, self.refresh_from_disk)
+
+    def refresh_from_disk(self):
+        """
+        Picks up animals other workstations added, changed or deleted (only
+        the changed records are read); the search results follow through
+        apply_changes().
+        """
+        try:
+            changed = self.shelter.refresh()
+        except OSError:
+            changed = [] #e.g. a network share hiccup; try again next time
+        if changed is None or changed:
+            self.status.config(text=f"{self.shelter.count():,} animals (updated by another workstation)")
+        self.refresh_job = self.root.after(REFRESH_MS, self.refresh_from_disk)
+
+# -----------------------------------------------------------------------------
+
+    def watch_saves(self):
+        """
+        Starts checking on background saves with root.after, until none are queued.
+        """
+        if not self.watching_saves:
+            self.watching_saves = True
+            self.root.after(SAVE_POLL_MS, self.check_saves)
+
+    def check_saves(self):
+        """
+        Reports finished background saves: the status bar for success, a
+        message for failures. Failed writes stay queued and are retried.
+        """
+        for saved, rejected, error in self.shelter.write_results():
+            if error is not None:
+                self.status.config(text="Saving failed; retrying...")
+                messagebox.showerror("Not saved yet", f"Changes could not be written to {DATA_FILE}:\n{error}\n"
+                                                      "They are kept and will be retried.")
+            if rejected:
+                names = ", ".join(animal.name for animal in map(self.shelter.get, rejected) if animal is not None)
+                messagebox.showerror("Not saved", "Another workstation changed the same animal at the same "
+                                                  f"moment, so these edits were not saved: {names or 'deleted animal'}")
+        if self.shelter.pending_writes():
+            self.root.after(SAVE_POLL_MS, self.check_saves)
+            return
+        self.watching_saves = False
+        self.status.config(text=f"{self.shelter.count():,} animals, all changes saved")
+
+#------------------------------------------------------------------------------
+
+    def on_close(self):
+        """
+        Waits for any background work and closes the shelter data (writing
+        changes still queued) before exiting.
         """
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+        self.thumbnails.close()
+        if self.metrics_dump is not None:
+            self.metrics_dump.stop() #writes a last line
+        if self.change_feed is not None:
+            self.change_feed.close()
         try:
-            with open("animals.json", "r") as file:
-                data = json.load(file)
-                loaded = []
-                for entry in data:
-                    #determine appropriate class for deserialization
-                    cls = {"cat": Cat, "dog": Dog, "exotic": Exotic}.get(entry.get("type", "animal"), Animal)
-                    loaded.append(cls(entry["name"], entry.get("gender", ""), entry["breed"],
-                                      entry["weight"], entry["dob"], entry["microchip"],
-                                      entry["health_notes"], entry["description"], entry.get("image_path", "")))
-                return loaded
-        except (FileNotFoundError, json.JSONDecodeError):
-            return [] #return empty list upon fialure
+            self.shelter.close()
+        except OSError as error:
+            messagebox.showerror("Not saved", f"Some changes could not be written to {DATA_FILE}:\n{error}")
+        self.root.destroy()
 
 # =============================================================================
 # Application Entry Point — Launches GUI
@@ -0,0 +1,4 @@
+"""
+Benchmark scripts for the Animal Shelter Pet Tracker.
+Run them from the final_program_code folder, e.g. python -m benchmarks.search_index
+"""
@@ -0,0 +1,144 @@
+"""
+===============================================================================
+    Benchmark — Vectorized analytics vs. a Python loop
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Loads a synthetic shelter into the in-memory repository and computes
+        the population report two ways: a plain Python loop over
+        repository.animals (what a report would cost without analytics.py)
+        and ShelterAnalytics over NumPy columns. Also times building the
+        columns and keeping them current for single edits, and checks both
+        ways produce the same report.
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.analytics
+            python -m benchmarks.analytics --size 100000
+
+    Dependencies:
+        - numpy              : Through shelter.analytics
+        - benchmarks.data    : Synthetic dataset
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import datetime
+import math
+import os
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.data import iter_records, write_dataset
+from shelter.analytics import AGE_BINS, AGE_LABELS, DAYS_PER_YEAR, PERCENTILES, STAY_BINS, STAY_LABELS, ShelterAnalytics
+from shelter.repository import InMemoryAnimalRepository
+from shelter.storage import JournaledStorage
+
+TODAY = datetime.date(2025, 7, 29)
+EDITS = 1000
+
+# =============================================================================
+# Reference Implementation — One pass over Animal objects
+# =============================================================================
+
+def percentile(ordered, fraction):
+    #linear interpolation, as numpy.percentile
+    position = (len(ordered) - 1) * fraction
+    low, high = math.floor(position), math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def bin_of(value, bins):
+    slot = 0
+    while slot + 1 < len(bins) and value >= bins[slot + 1]:
+        slot += 1
+    return slot
+
+
+def python_report(animals, today):
+    """
+    The report computed with plain Python over every animal.
+    """
+    ordinal = today.toordinal()
+    by_type, by_gender, by_breed = Counter(), Counter(), Counter()
+    ages = [0] * len(AGE_BINS)
+    stays = [0] * len(STAY_BINS)
+    weights = defaultdict(list)
+    unknown_age = 0
+    for animal in animals:
+        by_type[animal.animal_type] += 1
+        by_gender[animal.gender] += 1
+        by_breed[animal.breed] += 1
+        dob = animal.dob_ordinal
+        if dob and dob <= ordinal:
+            ages[bin_of((ordinal - dob) / DAYS_PER_YEAR, AGE_BINS)] += 1
+        else:
+            unknown_age += 1
+        if animal.weight_lb is not None:
+            weights[animal.animal_type].append(animal.weight_lb)
+        intake = animal.intake_ordinal
+        if intake and intake <= ordinal:
+            stays[bin_of(ordinal - intake, STAY_BINS)] += 1
+    weight_stats = {}
+    for type_, values in weights.items():
+        values.sort()
+        weight_stats[type_] = [round(percentile(values, p / 100), 2) for p in PERCENTILES]
+    age_years = dict(zip(AGE_LABELS, ages), unknown=unknown_age)
+    return by_type, by_gender, by_breed, age_years, weight_stats, dict(zip(STAY_LABELS, stays))
+
+
+def same_report(expected, report):
+    by_type, by_gender, by_breed, age_years, weight_stats, stays = expected
+    return (by_type == report["by_type"] and by_gender == report["by_gender"] and
+            by_breed == report["by_breed"] and age_years == report["age_years"] and
+            stays == report["length_of_stay_days"]["histogram"] and
+            all(weight_stats[type_] == [summary[f"p{p}"] for p in PERCENTILES]
+                for type_, summary in report["weight_lb_by_type"].items()))
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare NumPy analytics with a Python loop.")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shelter-analytics-") as workdir:
+        path = os.path.join(workdir, "animals.json")
+        write_dataset(path, args.size)
+        repository = InMemoryAnimalRepository(JournaledStorage(path))
+        load_time, _ = timed(repository.load)
+        print(f"\n{args.size:,} animals loaded in {load_time:.2f} s")
+
+        loop_time, expected = timed(lambda: python_report(repository.animals, TODAY))
+        table_time, table = timed(repository.load_table)
+        build_time, analytics = timed(lambda: ShelterAnalytics.from_table(table))
+        report_time, report = timed(lambda: analytics.report(TODAY))
+        assert same_report(expected, report), "reports differ"
+
+        edits = list(iter_records(EDITS, seed=7))
+        edit_time, _ = timed(lambda: [analytics.add(record) for record in edits])
+        refresh_time, _ = timed(lambda: analytics.report(TODAY))
+        repository.close()
+
+    print(f"  {'python loop over repository.animals':<44} {loop_time * 1000:>10.1f} ms")
+    print(f"  {'build columns: load_table()':<44} {table_time * 1000:>10.1f} ms")
+    print(f"  {'build columns: ShelterAnalytics.from_table':<44} {build_time * 1000:>10.1f} ms")
+    print(f"  {'vectorized report':<44} {report_time * 1000:>10.1f} ms"
+          f"   ({loop_time / report_time:.0f}x the loop)")
+    print(f"  {'incremental add, per animal':<44} {edit_time / EDITS * 1e6:>10.1f} us")
+    print(f"  {f'report after {EDITS} adds':<44} {refresh_time * 1000:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
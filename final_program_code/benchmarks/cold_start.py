@@ -0,0 +1,130 @@
+"""
+===============================================================================
+    Benchmark — Cold start: JSON vs. binary snapshot
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Times what a freshly started portal spends before the first search,
+        reading animals.json as before and reading the memory-mapped binary
+        snapshot (animals.json.bin) made from it. Each measurement runs in
+        a new Python process, so imports and allocations are those of a real
+        start; the files themselves are in the OS cache, as they are on
+        every start but the first after a reboot.
+
+        For each size it reports:
+          - records       : storage.iter_records() alone (parse vs. map)
+          - load          : repository.load(), records plus the search index
+          - memory        : peak resident size of the process after load
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.cold_start
+            python -m benchmarks.cold_start --sizes 100000 1000000 --repeat 5
+
+    Dependencies:
+        - benchmarks.data    : Synthetic datasets
+        - binary_snapshot, storage, repository : Code under test
+        - /proc/self/status  : Peak memory (Linux only; reported as 0 elsewhere)
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.data import write_dataset
+from shelter.binary_snapshot import BINARY_SUFFIX, write_binary_snapshot
+from shelter.repository import InMemoryAnimalRepository
+from shelter.storage import JournaledStorage
+
+# =============================================================================
+# Child Process — One cold start
+# =============================================================================
+
+def peak_memory_mb():
+    #VmHWM belongs to this process image; ru_maxrss would include the parent's peak before exec
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def measure(path, binary, what):
+    """
+    Runs one cold start in this process and returns its timings.
+    """
+    storage = JournaledStorage(path, binary_snapshot=binary)
+    start = time.perf_counter()
+    if what == "records":
+        count = sum(1 for _ in storage.iter_records())
+    else:
+        repository = InMemoryAnimalRepository(storage)
+        repository.load()
+        count = len(repository.index)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "count": count, "peak_mb": peak_memory_mb()}
+
+
+def run_child(path, binary, what):
+    command = [sys.executable, "-m", "benchmarks.cold_start", "--child", path, what]
+    if binary:
+        command.append("--binary")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold-start time of JSON and binary snapshots.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "WHAT"), help=argparse.SUPPRESS)
+    parser.add_argument("--binary", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], args.binary, args.child[1])))
+        return
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="shelter-cold-start-") as workdir:
+            path = os.path.join(workdir, "animals.json")
+            write_dataset(path, size)
+            #what the first binary-mode start does on its background thread
+            storage = JournaledStorage(path)
+            start = time.perf_counter()
+            stat = os.stat(path)
+            write_binary_snapshot(path + BINARY_SUFFIX, storage.iter_records(), stat.st_size, stat.st_mtime_ns)
+            build_time = time.perf_counter() - start
+            storage.close()
+
+            json_size = os.path.getsize(path)
+            binary_size = os.path.getsize(path + BINARY_SUFFIX)
+            print(f"\n{size:,} animals  (animals.json {json_size / 1e6:.1f} MB, "
+                  f"animals.json.bin {binary_size / 1e6:.1f} MB, built in {build_time:.2f} s)")
+            for what in ("records", "load"):
+                results = {}
+                for label, binary in (("json", False), ("binary", True)):
+                    runs = [run_child(path, binary, what) for _ in range(args.repeat)]
+                    results[label] = min(runs, key=lambda run: run["seconds"])
+                    assert results[label]["count"] == size, f"{label} {what} read {results[label]['count']} records"
+                json_run, binary_run = results["json"], results["binary"]
+                print(f"  {what:<8} json {json_run['seconds']:>7.2f} s {json_run['peak_mb']:>7.0f} MB"
+                      f"   binary {binary_run['seconds']:>7.2f} s {binary_run['peak_mb']:>7.0f} MB"
+                      f"   ({json_run['seconds'] / binary_run['seconds']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
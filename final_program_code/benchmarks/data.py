@@ -0,0 +1,161 @@
+"""
+===============================================================================
+    Benchmark — Synthetic shelter data
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Generates realistic animals.json datasets for the benchmarks. Names
+        and breeds follow a Zipf distribution, so a few popular names
+        ("Luna", "Max") repeat constantly while most appear rarely, as in a
+        real shelter. Type, gender, weight and DOB follow per-type ranges,
+        and stays since intake are mostly weeks with a long tail.
+        Optionally a pool of small JPEG photos is generated and shared
+        between the records that have a photo.
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.data animals.json --size 100000
+            python -m benchmarks.data animals.json --size 10000 --images 200
+
+    Dependencies:
+        - Pillow (PIL)       : Only when generating images
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import argparse
+import bisect
+import datetime
+import itertools
+import json
+import os
+import random
+
+NAMES = ["Luna", "Bella", "Max", "Charlie", "Lucy", "Cooper", "Daisy", "Milo", "Geraldine",
+         "Tsuko", "Rhubarb", "Oliver", "Nala", "Simba", "Pepper", "Shadow", "Ziggy", "Biscuit"]
+#long tail of rarer names, so repeat names are skewed rather than uniform
+NAMES += [first + second for first, second in itertools.product(
+    ("Ash", "Bram", "Clem", "Dot", "Fen", "Gus", "Hazel", "Ivy", "Juno", "Kit", "Lark", "Moss"),
+    ("", "ie", "o", "ette", "by", "ster", "a", "ington"))]
+BREEDS = {"dog": ["Rottweiler Mix", "Labrador Retriever", "Pit Bull Terrier", "Beagle", "German Shepherd",
+                  "Chihuahua", "Border Collie", "Boxer Mix", "Dachshund", "Great Pyrenees"],
+          "cat": ["Domestic Short Hair", "Domestic Long Hair", "Domestic Medium Hair", "Siamese",
+                  "Maine Coon", "Russian Blue", "Bengal"],
+          "exotic": ["Lionhead", "Bearded Dragon", "Cockatiel", "Guinea Pig", "Ball Python", "Ferret"]}
+TYPE_WEIGHTS = {"dog": 0.5, "cat": 0.4, "exotic": 0.1}
+WEIGHT_RANGES = {"dog": (5, 110), "cat": (4, 20), "exotic": (0.2, 12)}
+HEALTH_NOTES = ["Up to date on shots", "Spayed/neutered", "Needs dental cleaning", "Heartworm negative",
+                "On joint supplements", "Mild skin allergy", ""]
+DESCRIPTIONS = ["Friendly and loves people", "Shy at first, warms up quickly", "High energy, needs a yard",
+                "Good with kids and other pets", "Quiet lap animal", "Loves treats and car rides", ""]
+
+# =============================================================================
+# Distributions
+# =============================================================================
+
+def zipf_sampler(values, rng, exponent=1.1):
+    """
+    Returns a function drawing from values with P(rank k) ~ 1 / k**exponent.
+    """
+    cumulative = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, len(values) + 1)))
+    total = cumulative[-1]
+    return lambda: values[bisect.bisect(cumulative, rng.random() * total)]
+
+
+def make_images(image_dir, count, seed=220, size=(640, 480)):
+    """
+    Writes count small JPEG photos (gradients with a random tint) to image_dir.
+
+    Returns:
+        List of image paths
+    """
+    from PIL import Image  #only needed when images are requested
+
+    rng = random.Random(seed)
+    os.makedirs(image_dir, exist_ok=True)
+    gradient = Image.linear_gradient("L").resize(size)
+    paths = []
+    for number in range(count):
+        tint = tuple(rng.randrange(256) for _ in range(3))
+        img = Image.merge("RGB", [gradient.point(lambda value, c=c: (value + c) % 256) for c in tint])
+        path = os.path.join(image_dir, f"photo_{number:05d}.jpg")
+        img.save(path, "JPEG", quality=85)
+        paths.append(path)
+    return paths
+
+# =============================================================================
+# Records
+# =============================================================================
+
+def iter_records(count, seed=220, image_paths=(), photo_ratio=0.3):
+    """
+    Yields count Animal.to_dict() records. A photo_ratio share of them point
+    at one of image_paths (when any are given).
+    """
+    rng = random.Random(seed)
+    name_of = zipf_sampler(NAMES, rng)
+    breed_of = {type_: zipf_sampler(breeds, rng) for type_, breeds in BREEDS.items()}
+    types = list(TYPE_WEIGHTS)
+    type_weights = list(TYPE_WEIGHTS.values())
+    today = datetime.date(2025, 7, 29).toordinal()
+    for number in range(count):
+        type_ = rng.choices(types, type_weights)[0]
+        low, high = WEIGHT_RANGES[type_]
+        weight = round(rng.uniform(low, high), 1)
+        born = today - rng.randrange(60, 15 * 365)
+        #most stays are short, a few animals wait for years
+        stay = min(int(rng.expovariate(1 / 60)), today - born)
+        yield {
+            "id": f"{seed:08x}{number:024x}",
+            "type": type_,
+            "name": name_of(),
+            "gender": rng.choice("MF"),
+            "breed": breed_of[type_](),
+            "weight": str(int(weight)) if weight.is_integer() else str(weight),
+            "dob": datetime.date.fromordinal(born).isoformat() if rng.random() < 0.9 else "",
+            "microchip": str(rng.randrange(10**14, 10**15)) if rng.random() < 0.8 else "",
+            "health_notes": rng.choice(HEALTH_NOTES),
+            "description": rng.choice(DESCRIPTIONS),
+            "image_path": rng.choice(image_paths) if image_paths and rng.random() < photo_ratio else "",
+            "intake": datetime.date.fromordinal(today - stay).isoformat(),
+        }
+
+
+def make_records(count, seed=220, image_paths=(), photo_ratio=0.3):
+    return list(iter_records(count, seed, image_paths, photo_ratio))
+
+
+def write_dataset(path, count, seed=220, images=0):
+    """
+    Writes an animals.json file of count records, generating images next to
+    it in an "images" folder when images > 0.
+
+    Returns:
+        List of generated image paths
+    """
+    image_paths = make_images(os.path.join(os.path.dirname(os.path.abspath(path)), "images"), images, seed) if images else []
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[\n")
+        for number, record in enumerate(iter_records(count, seed, image_paths)):
+            file.write((",\n" if number else "") + json.dumps(record))
+        file.write("\n]\n")
+    return image_paths
+
+# =============================================================================
+# Command Line Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic animals.json.")
+    parser.add_argument("path")
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--images", type=int, default=0, help="number of distinct photos to generate")
+    parser.add_argument("--seed", type=int, default=220)
+    args = parser.parse_args()
+    write_dataset(args.path, args.size, args.seed, args.images)
+    print(f"Wrote {args.size:,} animals to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+===============================================================================
+    Benchmark — Import cost and headless startup
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Imports each entry point in a fresh interpreter and reports how long
+        the import took, the peak memory it allocated, how many modules it
+        pulled in and whether tkinter or Pillow came along. Also times a
+        headless startup: importing the shelter package, opening a synthetic
+        animals.json and loading it, with no display involved.
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.import_cost
+            python -m benchmarks.import_cost --size 100000 --json
+
+    Dependencies:
+        - subprocess         : Fresh interpreter per measurement
+        - benchmarks.data    : Synthetic dataset for the startup timing
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.data import write_dataset
+
+TARGETS = ["shelter", "shelter.models", "shelter.service", "shelter.bulk", "shelter.thumbnails",
+           "Animal_Shelter_Pet_Tracker"]
+
+#run in the child interpreter and print one JSON line; tracemalloc slows
+#imports down, so time and memory are measured in separate interpreters
+_IMPORT_PROBE = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+import {target}
+seconds = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{"seconds": seconds, "modules": len(loaded),
+                  "tkinter": "tkinter" in sys.modules, "PIL": "PIL" in sys.modules}}))
+"""
+
+_MEMORY_PROBE = """
+import json, tracemalloc
+tracemalloc.start()
+import {target}
+print(json.dumps({{"allocated": tracemalloc.get_traced_memory()[1]}}))
+"""
+
+_STARTUP_PROBE = """
+import json, time
+start = time.perf_counter()
+from shelter import ShelterService
+service = ShelterService.open("journal", {path!r})
+for count in service.iter_load():
+    pass
+service.close()
+import sys
+print(json.dumps({{"seconds": time.perf_counter() - start, "records": count,
+                  "tkinter": "tkinter" in sys.modules, "PIL": "PIL" in sys.modules}}))
+"""
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+def run_probe(code, repeat):
+    """
+    Runs code in repeat fresh interpreters; returns the median of each number.
+    """
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                                text=True, check=True).stdout
+        runs.append(json.loads(output))
+    result = dict(runs[0])
+    for key in ("seconds", "allocated", "modules"):
+        if key in result:
+            result[key] = statistics.median(run[key] for run in runs)
+    return result
+
+
+def measure(size, repeat=5):
+    report = {"imports": {}, "startup": None}
+    for target in TARGETS:
+        result = run_probe(_IMPORT_PROBE.format(target=target), repeat)
+        result.update(run_probe(_MEMORY_PROBE.format(target=target), 1))
+        report["imports"][target] = result
+    with tempfile.TemporaryDirectory(prefix="shelter-import-") as workdir:
+        path = os.path.join(workdir, "animals.json")
+        write_dataset(path, size)
+        report["startup"] = run_probe(_STARTUP_PROBE.format(path=path), repeat)
+    return report
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import cost and headless startup.")
+    parser.add_argument("--size", type=int, default=10_000, help="animals in the startup dataset")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.size, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"  {'import':<30} {'ms':>8} {'KiB':>8} {'modules':>8}  tkinter  PIL")
+    for target, result in report["imports"].items():
+        print(f"  {target:<30} {result['seconds'] * 1000:>8.1f} {result['allocated'] / 1024:>8.0f}"
+              f" {result['modules']:>8.0f}  {str(result['tkinter']):<7}  {result['PIL']}")
+    startup = report["startup"]
+    print(f"\nHeadless startup ({startup['records']:,} animals): {startup['seconds'] * 1000:.1f} ms,"
+          f" tkinter loaded: {startup['tkinter']}, PIL loaded: {startup['PIL']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+===============================================================================
+    Benchmark — HTTP API load test
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Opens many keep-alive connections to a running shelter.server and
+        fires a mix of searches, microchip lookups and (optionally) writes
+        at it for a fixed time, then reports throughput, latency percentiles
+        and how many responses were 304s thanks to If-None-Match.
+
+        With --spawn N a server is started on a synthetic dataset of N
+        animals first, so the test needs nothing else running.
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.load_test --spawn 100000
+            python -m benchmarks.load_test --port 8220 --connections 50 --writes 0.05
+
+    Dependencies:
+        - asyncio            : Concurrent client connections
+        - benchmarks.data    : Synthetic dataset for --spawn
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.data import NAMES, write_dataset
+
+SEARCHES = ["/animals?limit=20", "/animals?name=lu", "/animals?type=dog&gender=F", "/animals?breed=hair",
+            "/animals?name=a&breed=mix", "/animals?microchip=42&limit=10"]
+
+# =============================================================================
+# Client
+# =============================================================================
+
+async def request(reader, writer, method, target, body=None, etag=None):
+    """
+    Sends one request on a keep-alive connection.
+
+    Returns:
+        (status, headers, body)
+    """
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost", f"Content-Length: {len(payload)}"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, data
+
+
+async def client(host, port, deadline, write_ratio, rng, latencies, statuses, etags):
+    reader, writer = await asyncio.open_connection(host, port)
+    created = []
+    try:
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < write_ratio and created and rng.random() < 0.5:
+                status, _, _ = await request(reader, writer, "PUT", f"/animals/{rng.choice(created)}",
+                                             {"description": f"updated {rng.random():.6f}"})
+            elif roll < write_ratio:
+                status, _, data = await request(reader, writer, "POST", "/animals", {
+                    "name": rng.choice(NAMES), "gender": rng.choice("MF"), "type": "dog", "breed": "Load Test Mix"})
+                if status == 201:
+                    created.append(json.loads(data)["id"])
+            else:
+                target = rng.choice(SEARCHES) if rng.random() < 0.8 else f"/microchips/{rng.randrange(10**14, 10**15)}"
+                status, headers, _ = await request(reader, writer, "GET", target, etag=etags.get(target))
+                if "etag" in headers:
+                    etags[target] = headers["etag"]
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+    return created
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def run_load(host, port, connections, seconds, write_ratio, seed=220):
+    latencies = []
+    statuses = Counter()
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    created = await asyncio.gather(*(client(host, port, deadline, write_ratio, random.Random(seed + number),
+                                            latencies, statuses, {})
+                                     for number in range(connections)))
+    elapsed = time.perf_counter() - started
+
+    #remove what the test added so it can be rerun against real data
+    reader, writer = await asyncio.open_connection(host, port)
+    for animal_id in (animal_id for ids in created for animal_id in ids):
+        await request(reader, writer, "DELETE", f"/animals/{animal_id}")
+    writer.close()
+
+    return {
+        "connections": connections,
+        "seconds": elapsed,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "latency_ms": {name: percentile(latencies, fraction) * 1000
+                       for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))},
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def spawn_server(size, port, workdir):
+    """
+    Starts shelter.server on a fresh synthetic dataset; waits until it listens.
+    """
+    path = os.path.join(workdir, "animals.json")
+    write_dataset(path, size)
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, "-m", "shelter.server", "--data", path, "--port", str(port),
+                                "--thumbnails", os.path.join(workdir, "thumbnails")],
+                               cwd=here, stdout=subprocess.PIPE, text=True)
+    print(process.stdout.readline().strip(), file=sys.stderr)  #"Serving ..." once loaded
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a running shelter.server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8220)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writes", type=float, default=0.0, help="share of requests that write (0-1)")
+    parser.add_argument("--spawn", type=int, metavar="SIZE", help="start a server on SIZE synthetic animals")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="shelter-load-") as workdir:
+        process = spawn_server(args.spawn, args.port, workdir) if args.spawn else None
+        try:
+            report = asyncio.run(run_load(args.host, args.port, args.connections, args.seconds, args.writes))
+        finally:
+            if process is not None:
+                #SIGINT lets the server close its files; Windows has no such signal
+                process.send_signal(signal.SIGINT) if os.name == "posix" else process.terminate()
+                process.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
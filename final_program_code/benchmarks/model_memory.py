@@ -0,0 +1,105 @@
+"""
+===============================================================================
+    Benchmark — Memory used by the animal model
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Measures with tracemalloc how much memory stays allocated after
+        loading a synthetic animals.json into:
+          - the original dict-based classes (all fields kept as raw strings)
+          - the current __slots__ classes (interned categories, float
+            weight, ordinal DOB)
+          - a columnar AnimalTable
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.model_memory
+            python -m benchmarks.model_memory --sizes 100000
+
+    Dependencies:
+        - tracemalloc        : Allocation tracking
+        - models, animal_table : Local modules
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from shelter.animal_table import AnimalTable
+from shelter.models import animal_from_dict
+from benchmarks.data import make_records
+
+# =============================================================================
+# Reference Model — The class layout before __slots__
+# =============================================================================
+
+class LegacyAnimal:
+    def __init__(self, entry):
+        self.animal_id = entry["id"]
+        self.animal_type = entry["type"]
+        self.name = entry["name"]
+        self.gender = entry["gender"]
+        self.breed = entry["breed"]
+        self.weight = entry["weight"]
+        self.dob = entry["dob"]
+        self.microchip_number = entry["microchip"]
+        self.health_notes = entry["health_notes"]
+        self.description = entry["description"]
+        self.image_path = entry["image_path"]
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+def make_json(count, seed=220):
+    return json.dumps(make_records(count, seed))
+
+
+def retained_bytes(text, build):
+    """
+    Parses text, builds the model from the records, drops the parsed records
+    and returns the bytes still allocated (i.e. held by the model).
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = json.loads(text)
+    model = build(records)
+    del records
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del model
+    return current
+
+
+VARIANTS = {
+    "dict-based classes": lambda records: [LegacyAnimal(entry) for entry in records],
+    "__slots__ classes": lambda records: [animal_from_dict(entry) for entry in records],
+    "AnimalTable": AnimalTable.from_records,
+}
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory held by each animal model.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        text = make_json(size)
+        print(f"\n{size:,} animals")
+        baseline = None
+        for label, build in VARIANTS.items():
+            used = retained_bytes(text, build)
+            baseline = baseline or used
+            print(f"  {label:<20} {used / 2**20:>9.1f} MiB  {used / size:>7.0f} B/animal  {used / baseline:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+===============================================================================
+    Benchmark — Search index vs. linear scan
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Builds synthetic shelters of increasing size and times the search
+        form's filter combinations against the original linear scan and
+        the AnimalSearchIndex, checking both return the same animals.
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.search_index
+            python -m benchmarks.search_index --sizes 1000 100000
+
+    Dependencies:
+        - models, search_index : Local modules
+        - benchmarks.data    : Synthetic shelter records
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import time
+
+from benchmarks.data import make_records
+from shelter.models import animal_from_dict
+from shelter.search_index import AnimalSearchIndex
+
+QUERIES = [
+    {},
+    {"name": "lu"},
+    {"name": "luna"},
+    {"breed": "mix"},
+    {"animal_type": "dog", "gender": "F"},
+    {"name": "a", "breed": "hair"},
+    {"microchip": "4242"},
+]
+
+# =============================================================================
+# Synthetic Data and Reference Implementation
+# =============================================================================
+
+def make_animals(count, seed=220):
+    return [animal_from_dict(record) for record in make_records(count, seed)]
+
+
+def linear_search(animals, name="", gender="", animal_type="", breed="", microchip=""):
+    """
+    The search form's original loop, kept as the reference.
+    """
+    name_filter = name.lower()
+    gender_filter = gender.upper()
+    type_filter = animal_type.lower()
+    breed_filter = breed.lower()
+    return [animal for animal in animals
+            if (name_filter in animal.name.lower() and
+                (gender_filter == "" or gender_filter == animal.gender) and
+                type_filter in animal.animal_type.lower() and
+                breed_filter in animal.breed.lower() and
+                microchip in animal.microchip_number)]
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the search index with the linear scan.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        animals = make_animals(size)
+        start = time.perf_counter()
+        index = AnimalSearchIndex(animals)
+        build = time.perf_counter() - start
+        print(f"\n{size:,} animals — index built in {build * 1000:.1f} ms")
+        print(f"  {'query':<40} {'matches':>9} {'linear ms':>10} {'index ms':>10}")
+        for query in QUERIES:
+            linear_time, expected = best_of(lambda: linear_search(animals, **query))
+            index_time, actual = best_of(lambda: index.search(**query))
+            assert [id(a) for a in actual] == [id(a) for a in expected], f"mismatch for {query}"
+            print(f"  {str(query):<40} {len(actual):>9,} {linear_time * 1000:>10.2f} {index_time * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
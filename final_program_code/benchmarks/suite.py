@@ -0,0 +1,287 @@
+"""
+===============================================================================
+    Benchmark — Hot path suite
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Times the tracker's hot paths on synthetic shelters (benchmarks.data)
+        of several sizes and writes the results as JSON, so runs on different
+        commits can be compared:
+          - load          : JSON parse, and repository load as the GUI does it
+          - save          : one record (journal append vs. full rewrite),
+                            a bulk add, and a full snapshot rewrite
+          - search        : every combination of the search form's filters
+          - ranked        : fuzzy / keyword searches (top RANKED_LIMIT), and
+                            building the notes index on first use
+          - thumbnails    : rendering and caching photos through the Tk-free
+                            parts of thumbnails.py (needs --images)
+
+        Usage (from the final_program_code folder):
+            python -m benchmarks.suite --output results.json
+            python -m benchmarks.suite --sizes 1000 1000000 --images 50
+            python -m benchmarks.suite --compare results.json
+
+    Dependencies:
+        - benchmarks.data    : Synthetic datasets
+        - repository, storage, thumbnails : Code under test
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.data import iter_records, write_dataset
+from shelter.models import animal_from_dict
+from shelter.repository import InMemoryAnimalRepository
+from shelter.storage import JournaledStorage, JsonFileStorage
+
+#one representative value per search field; every combination is timed
+SEARCH_VALUES = {"name": "lu", "gender": "F", "animal_type": "dog", "breed": "mix", "microchip": "42"}
+#typos, spacing and keyword searches for the ranked (fuzzy) search
+RANKED_QUERIES = {
+    "breed_typo": {"breed": "rotweiler"},
+    "breed_spacing": {"breed": "domestic shorthair"},
+    "name_short_typo": {"name": "lna"},
+    "type_broad": {"animal_type": "dog"},
+    "keywords": {"text": "friendly kids"},
+    "keywords_typo": {"text": "vacinated dental"},
+    "name+breed+keywords": {"name": "max", "breed": "beagel", "text": "yard"},
+}
+RANKED_LIMIT = 200
+SINGLE_SAVES = 20
+BULK_SAVE_SIZE = 1000
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def best_of(func, repeat=3):
+    """
+    Returns (fastest time in seconds, result of the last call).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def fresh_animals(count, seed):
+    #a seed other than the dataset's keeps the IDs distinct from stored ones
+    return [animal_from_dict(record) for record in iter_records(count, seed)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# =============================================================================
+# Benchmarks — Each returns a list of result dictionaries
+# =============================================================================
+
+def bench_load(path, repeat):
+    def parse():
+        with open(path, "r", encoding="utf-8") as file:
+            return len(json.load(file))
+
+    def load():
+        repository = InMemoryAnimalRepository(JournaledStorage(path))
+        count = repository.load()
+        repository.close()
+        return count
+
+    results = []
+    for name, func in (("load/json_parse", parse), ("load/repository", load)):
+        seconds, count = best_of(func, repeat)
+        results.append({"name": name, "seconds": seconds, "records": count})
+    return results
+
+
+def bench_search(path, repeat):
+    repository = InMemoryAnimalRepository(JournaledStorage(path))
+    repository.load()
+    results = []
+    fields = list(SEARCH_VALUES)
+    for size in range(len(fields) + 1):
+        for combination in itertools.combinations(fields, size):
+            filters = {field: SEARCH_VALUES[field] for field in combination}
+            seconds, matches = best_of(lambda: repository.search(**filters), repeat)
+            results.append({"name": "search/" + ("+".join(combination) or "all"),
+                            "seconds": seconds, "matches": len(matches)})
+    repository.close()
+    return results
+
+
+def bench_ranked_search(path, repeat):
+    repository = InMemoryAnimalRepository(JournaledStorage(path))
+    repository.load()
+    start = time.perf_counter()
+    repository.index.text_index()
+    results = [{"name": "ranked/text_index_build", "seconds": time.perf_counter() - start}]
+    for name, query in RANKED_QUERIES.items():
+        seconds, matches = best_of(lambda: repository.ranked_search(**query, limit=RANKED_LIMIT), repeat)
+        results.append({"name": "ranked/" + name, "seconds": seconds, "matches": len(matches)})
+    repository.close()
+    return results
+
+
+def bench_save(path, workdir):
+    results = []
+
+    #journal backend: one fsync'd append per saved animal
+    repository = InMemoryAnimalRepository(JournaledStorage(path, compact_threshold=10**9))
+    repository.load()
+    animals = fresh_animals(SINGLE_SAVES, seed=1)
+    start = time.perf_counter()
+    for animal in animals:
+        repository.add(animal)
+    results.append({"name": "save/single_journal", "seconds": (time.perf_counter() - start) / len(animals)})
+
+    batch = fresh_animals(BULK_SAVE_SIZE, seed=2)
+    start = time.perf_counter()
+    repository.add_many(batch)
+    results.append({"name": "save/bulk_journal", "seconds": time.perf_counter() - start,
+                    "records": len(batch)})
+
+    records = [animal.to_dict() for animal in repository.animals]
+    start = time.perf_counter()
+    repository.storage.write_all(records)
+    results.append({"name": "save/snapshot", "seconds": time.perf_counter() - start,
+                    "records": len(records)})
+    repository.close()
+
+    #the original behaviour: the whole file rewritten for one new animal
+    copy = os.path.join(workdir, "rewrite.json")
+    shutil.copy(path, copy)
+    storage = JsonFileStorage(copy)
+    storage.load()
+    record = fresh_animals(1, seed=3)[0].to_dict()
+    start = time.perf_counter()
+    storage.insert(record["id"], record)
+    results.append({"name": "save/single_rewrite", "seconds": time.perf_counter() - start})
+    return results
+
+
+def bench_thumbnails(image_paths, workdir):
+    #only the Pillow side of thumbnails.py; nothing here needs a display
+    from shelter.thumbnails import ThumbnailCache, render_thumbnail
+
+    results = []
+    start = time.perf_counter()
+    for source in image_paths:
+        render_thumbnail(source)
+    results.append({"name": "thumbnail/render", "seconds": (time.perf_counter() - start) / len(image_paths)})
+
+    cache = ThumbnailCache(os.path.join(workdir, "thumbnails"))
+    for name in ("thumbnail/cache_cold", "thumbnail/cache_warm"):
+        start = time.perf_counter()
+        for source in image_paths:
+            cache.thumbnail_path(source)
+        results.append({"name": name, "seconds": (time.perf_counter() - start) / len(image_paths)})
+
+    start = time.perf_counter()
+    for source in image_paths:
+        cache.load(source)
+    results.append({"name": "thumbnail/load_cached", "seconds": (time.perf_counter() - start) / len(image_paths)})
+    return results
+
+# =============================================================================
+# Suite
+# =============================================================================
+
+def run_suite(sizes, images=0, repeat=3, log=print):
+    """
+    Runs every benchmark at each size.
+
+    Returns:
+        {"meta": {...}, "results": [{"size", "name", "seconds", ...}, ...]}
+    """
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="shelter-bench-") as workdir:
+            path = os.path.join(workdir, "animals.json")
+            start = time.perf_counter()
+            image_paths = write_dataset(path, size, images=images)
+            log(f"{size:,} animals generated in {time.perf_counter() - start:.1f} s")
+
+            #big datasets get fewer repeats so the suite stays practical
+            runs = [bench_load(path, repeat if size < 1_000_000 else 1),
+                    bench_search(path, repeat),
+                    bench_ranked_search(path, repeat),
+                    bench_save(path, workdir)]
+            if image_paths:
+                runs.append(bench_thumbnails(image_paths, workdir))
+            for run in runs:
+                for result in run:
+                    result["size"] = size
+                    log(f"  {result['name']:<48} {result['seconds'] * 1000:>10.3f} ms")
+                    results.append(result)
+    meta = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "images": images,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Prints the ratio of every current timing to the baseline's, flagging
+    changes larger than threshold.
+    """
+    before = {(result["size"], result["name"]): result["seconds"] for result in baseline["results"]}
+    print(f"\nvs. {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for result in current["results"]:
+        old = before.get((result["size"], result["name"]))
+        if not old:
+            continue
+        ratio = result["seconds"] / old
+        flag = "  slower" if ratio > 1 + threshold else "  faster" if ratio < 1 - threshold else ""
+        print(f"  {result['size']:>9,} {result['name']:<48} {ratio:>6.2f}x{flag}")
+
+# =============================================================================
+# Benchmark Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the tracker's hot paths on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--images", type=int, default=0, help="distinct photos to generate for thumbnail timings")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    log = lambda message: print(message, file=sys.stderr)
+    report = run_suite(args.sizes, args.images, args.repeat, log)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            compare(json.load(file), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Core Package
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        The tracker's data layer with no GUI attached: models, validation,
+        storage engines, repositories and search. Importing it never loads
+        tkinter or Pillow, and needs no display, so batch jobs, services and
+        tests can use it directly.
+
+        - models             : Animal classes and record conversion
+        - validation         : Intake / update form rules
+        - storage, loader    : JSON snapshot + journal persistence
+        - binary_snapshot    : Memory-mapped binary copy of the snapshot for fast starts
+        - filelock           : Lock shared by processes opening the same file
+        - repository, search_index, animal_table : Queries and indexes
+        - ranked_search      : Fuzzy matching and BM25 ranking for searches
+        - sqlite_repository  : SQLite backend
+        - thumbnails         : Photo thumbnails (Pillow imported on first use)
+        - assets             : Content-addressed photo store with near-duplicate
+                               detection and cleanup of unused photos
+        - service            : ShelterService, the front end clients use
+        - bulk               : Bulk import/export command line tool
+        - analytics          : Population reports over NumPy columns (needs numpy)
+        - metrics            : Latency histograms, counters and cProfile capture
+        - events             : Change events, the bus delivering them and the
+                               JSON Lines change feed
+        - server             : Local HTTP/JSON API (asyncio)
+
+        The names below are re-exported lazily: "from shelter import
+        ShelterService" imports only the modules that class needs.
+===============================================================================
+"""
+
+_EXPORTS = {
+    "Animal": "models",
+    "Cat": "models",
+    "Dog": "models",
+    "Exotic": "models",
+    "animal_from_dict": "models",
+    "clean_record": "validation",
+    "validation_errors": "validation",
+    "AnimalRepository": "repository",
+    "InMemoryAnimalRepository": "repository",
+    "ConflictError": "repository",
+    "JournaledStorage": "storage",
+    "ShelterService": "service",
+    "open_repository": "service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'shelter' has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value  #later lookups skip this function
+    return value
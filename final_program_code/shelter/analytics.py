@@ -0,0 +1,362 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Population Analytics
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Population reports for management: counts by type, gender and breed,
+        the age distribution (from DOB), weight percentiles per type and
+        length of stay (days since intake) for the animals in the shelter.
+
+        ShelterAnalytics holds one NumPy array per field, built from an
+        AnimalTable in one pass and then kept up to date animal by animal,
+        so a report is a handful of vectorized group-bys and histograms
+        instead of a Python loop over every Animal.
+
+        Usage (from the final_program_code folder):
+            python -m shelter.analytics --data animals.json
+            python -m shelter.analytics --output report.json --today 2025-07-29
+            python -m shelter.analytics --backend sqlite --database animals.db --output report.json
+
+    Dependencies:
+        - numpy              : Column arrays and the aggregates over them
+        - animal_table, models : Record parsing and the columnar source table
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard, third-party libraries and local modules
+# =============================================================================
+
+import argparse
+import datetime
+import json
+import os
+
+import numpy as np
+
+from .models import parse_dob, parse_weight
+
+AGE_BINS = (0, 1, 2, 4, 7, 10, 15)  #years; the last bin is open-ended
+STAY_BINS = (0, 8, 31, 91, 181, 366)  #days; the last bin is open-ended
+STAY_LABELS = ("0-7 days", "8-30 days", "31-90 days", "91-180 days", "181-365 days", "over a year")
+PERCENTILES = (10, 25, 50, 75, 90)
+DAYS_PER_YEAR = 365.2425
+
+# =============================================================================
+# Vectorized Helpers
+# =============================================================================
+
+def _bin_labels(bins, unit):
+    labels = [f"{low}-{high} {unit}" for low, high in zip(bins, bins[1:])]
+    return labels + [f"{bins[-1]}+ {unit}"]
+
+
+AGE_LABELS = tuple(_bin_labels(AGE_BINS, "years"))
+
+
+def histogram(values, bins):
+    """
+    Counts values per bin; bins are the lower edges, the last bin open-ended.
+    """
+    slots = np.searchsorted(np.asarray(bins, dtype=float), values, side="right") - 1
+    return np.bincount(slots, minlength=len(bins))
+
+
+def grouped_stats(codes, values, groups):
+    """
+    Count, mean and PERCENTILES of values for each group code at once.
+    Sorting by (code, value) puts each group in one sorted run; every
+    percentile is then read out of the runs with array indexing, using the
+    same linear interpolation as numpy.percentile.
+
+    Returns:
+        (counts, means, percentiles) arrays; percentiles has one row per
+        group and is NaN for empty groups
+    """
+    counts = np.bincount(codes, minlength=groups)
+    sums = np.bincount(codes, weights=values, minlength=groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    order = np.lexsort((values, codes))
+    ordered = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = np.full((groups, len(PERCENTILES)), np.nan)
+    present = counts > 0
+    if present.any():
+        positions = starts[present, None] + (counts[present, None] - 1) * (np.asarray(PERCENTILES) / 100)
+        low = np.floor(positions).astype(np.int64)
+        high = np.ceil(positions).astype(np.int64)
+        fraction = positions - low
+        result[present] = ordered[low] + (ordered[high] - ordered[low]) * fraction
+    return counts, means, result
+
+
+def _summary(count, mean, percentiles):
+    summary = {"count": int(count), "mean": round(float(mean), 2) if count else None}
+    summary.update((f"p{p}", round(float(value), 2) if count else None) for p, value in zip(PERCENTILES, percentiles))
+    return summary
+
+# =============================================================================
+# Category Codes — Text values stored as small integers
+# =============================================================================
+
+class _Categories:
+    def __init__(self, values=()):
+        self.values = list(values)
+        self._code_of = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+# =============================================================================
+# Shelter Analytics — Column arrays kept in step with the animal store
+# =============================================================================
+
+class ShelterAnalytics:
+    """
+    NumPy columns over every animal in the shelter.
+
+    Rows of removed animals are marked dead and reused by the next add, so
+    add/update/remove are O(1) and the arrays only grow (by doubling).
+    Dates are stored as date ordinals and weights in pounds; unknown or
+    unparseable values are 0 (dates) or NaN (weight) and left out of the
+    statistics that need them.
+    """
+    def __init__(self, capacity=1024):
+        self.size = 0               #rows in use, live or dead
+        self._row_of = {}           #animal_id -> row
+        self._free = []             #dead rows to reuse
+        self.types = _Categories()
+        self.genders = _Categories()
+        self.breeds = _Categories()
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.type_codes = np.zeros(capacity, dtype=np.int32)
+        self.gender_codes = np.zeros(capacity, dtype=np.int32)
+        self.breed_codes = np.zeros(capacity, dtype=np.int32)
+        self.weights = np.full(capacity, np.nan)
+        self.dobs = np.zeros(capacity, dtype=np.int64)
+        self.intakes = np.zeros(capacity, dtype=np.int64)
+
+    @classmethod
+    def from_table(cls, table):
+        """
+        Builds the columns from an AnimalTable (repository.load_table()).
+        Its typed arrays are copied wholesale; no per-row Python work.
+        """
+        count = len(table)
+        analytics = cls(capacity=max(1024, count))
+        analytics.size = count
+        analytics._row_of = {animal_id: row for row, animal_id in enumerate(table.ids)}
+        analytics.alive[:count] = True
+        for column, categories, codes in ((table.types, "types", analytics.type_codes),
+                                          (table.genders, "genders", analytics.gender_codes),
+                                          (table.breeds, "breeds", analytics.breed_codes)):
+            setattr(analytics, categories, _Categories(column.categories))
+            codes[:count] = np.frombuffer(column.codes, dtype=f"u{column.codes.itemsize}")
+        analytics.weights[:count] = np.frombuffer(table.weights, dtype=np.float64)
+        for source, target in ((table.dob_ordinals, analytics.dobs), (table.intake_ordinals, analytics.intakes)):
+            target[:count] = np.frombuffer(source, dtype=f"i{source.itemsize}")
+        return analytics
+
+    def __len__(self):
+        return len(self._row_of)
+
+    # -------------------------------------------------------------------------
+    # Incremental maintenance
+    # -------------------------------------------------------------------------
+
+    def add(self, record):
+        """
+        Adds one Animal.to_dict() record (or updates it if its ID is known).
+        """
+        row = self._row_of.get(record.get("id", ""))
+        if row is None:
+            row = self._free.pop() if self._free else self._next_row()
+            self._row_of[record.get("id", "")] = row
+        self._set(row, record)
+
+    update = add
+
+    def remove(self, animal_id):
+        row = self._row_of.pop(animal_id, None)
+        if row is not None:
+            self.alive[row] = False
+            self._free.append(row)
+
+    def _next_row(self):
+        if self.size == len(self.alive):
+            for name in ("alive", "type_codes", "gender_codes", "breed_codes", "weights", "dobs", "intakes"):
+                column = getattr(self, name)
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:len(column)] = column
+                setattr(self, name, grown)
+        self.size += 1
+        return self.size - 1
+
+    def _set(self, row, record):
+        self.alive[row] = True
+        self.type_codes[row] = self.types.code(record.get("type", "animal"))
+        self.gender_codes[row] = self.genders.code(record.get("gender", ""))
+        self.breed_codes[row] = self.breeds.code(record.get("breed", ""))
+        weight = parse_weight(record.get("weight", ""))
+        self.weights[row] = weight if isinstance(weight, float) else np.nan
+        for field, column in (("dob", self.dobs), ("intake", self.intakes)):
+            date = parse_dob(record.get(field, ""))
+            column[row] = date if isinstance(date, int) else 0
+
+    # -------------------------------------------------------------------------
+    # Reports
+    # -------------------------------------------------------------------------
+
+    def _live(self, column):
+        return column[:self.size][self.alive[:self.size]]
+
+    def counts(self, field):
+        """
+        Animals per "type", "gender" or "breed" value, most common first.
+        """
+        categories, codes = {"type": (self.types, self.type_codes), "gender": (self.genders, self.gender_codes),
+                             "breed": (self.breeds, self.breed_codes)}[field]
+        counts = np.bincount(self._live(codes), minlength=len(categories.values))
+        order = np.argsort(-counts, kind="stable")
+        return {categories.values[code]: int(counts[code]) for code in order if counts[code]}
+
+    def age_distribution(self, today):
+        """
+        Animals per AGE_LABELS bin, from DOB; "unknown" counts blank or future DOBs.
+        """
+        dobs = self._live(self.dobs)
+        known = (dobs > 0) & (dobs <= today)
+        counts = histogram((today - dobs[known]) / DAYS_PER_YEAR, AGE_BINS)
+        distribution = dict(zip(AGE_LABELS, counts.tolist()))
+        distribution["unknown"] = int(len(dobs) - known.sum())
+        return distribution
+
+    def weight_by_type(self):
+        """
+        Count, mean and percentiles of weight (lb.) per type, for known weights.
+        """
+        types = self._live(self.type_codes)
+        weights = self._live(self.weights)
+        known = ~np.isnan(weights)
+        counts, means, percentiles = grouped_stats(types[known], weights[known], len(self.types.values))
+        return {self.types.values[code]: _summary(counts[code], means[code], percentiles[code])
+                for code in range(len(self.types.values)) if counts[code]}
+
+    def length_of_stay(self, today):
+        """
+        Days since intake: overall and per-type statistics plus a histogram
+        over STAY_LABELS. Animals without an intake date count as "unknown".
+        """
+        intakes = self._live(self.intakes)
+        types = self._live(self.type_codes)
+        known = (intakes > 0) & (intakes <= today)
+        days = (today - intakes[known]).astype(np.float64)
+        counts, means, percentiles = grouped_stats(np.zeros(len(days), dtype=np.int64), days, 1)
+        by_type = grouped_stats(types[known], days, len(self.types.values))
+        return {
+            "overall": _summary(counts[0], means[0], percentiles[0]),
+            "by_type": {self.types.values[code]: _summary(*(stat[code] for stat in by_type))
+                        for code in range(len(self.types.values)) if by_type[0][code]},
+            "histogram": dict(zip(STAY_LABELS, histogram(days, STAY_BINS).tolist())),
+            "unknown": int(len(intakes) - known.sum()),
+        }
+
+    def report(self, today=None):
+        """
+        Every report in one JSON-ready dictionary.
+
+        Args:
+            today (datetime.date) : Date ages and stays are measured to (default: today)
+        """
+        today = today or datetime.date.today()
+        ordinal = today.toordinal()
+        return {
+            "date": today.isoformat(),
+            "animals": len(self),
+            "by_type": self.counts("type"),
+            "by_gender": self.counts("gender"),
+            "by_breed": self.counts("breed"),
+            "age_years": self.age_distribution(ordinal),
+            "weight_lb_by_type": self.weight_by_type(),
+            "length_of_stay_days": self.length_of_stay(ordinal),
+        }
+
+# =============================================================================
+# Formatting and Export
+# =============================================================================
+
+def format_report(report, top_breeds=10):
+    """
+    Renders a report() dictionary as plain text for the report window and
+    the terminal.
+    """
+    def stats(summary):
+        if not summary["count"]:
+            return "no data"
+        return (f"n={summary['count']:,}  mean {summary['mean']:g}  median {summary['p50']:g}"
+                f"  (p10 {summary['p10']:g}, p90 {summary['p90']:g})")
+
+    lines = [f"Shelter population on {report['date']}: {report['animals']:,} animals", ""]
+    for title, key in (("By type", "by_type"), ("By gender", "by_gender")):
+        lines.append(title + ":")
+        lines.extend(f"  {value or '(blank)':<24}{count:>10,}" for value, count in report[key].items())
+        lines.append("")
+    breeds = list(report["by_breed"].items())
+    lines.append(f"Top breeds ({min(top_breeds, len(breeds))} of {len(breeds)}):")
+    lines.extend(f"  {value or '(blank)':<24}{count:>10,}" for value, count in breeds[:top_breeds])
+    lines += ["", "Age:"]
+    lines.extend(f"  {label:<24}{count:>10,}" for label, count in report["age_years"].items())
+    lines += ["", "Weight (lb.) by type:"]
+    lines.extend(f"  {value:<12}{stats(summary)}" for value, summary in report["weight_lb_by_type"].items())
+    stay = report["length_of_stay_days"]
+    lines += ["", "Length of stay (days):", f"  {'all':<12}{stats(stay['overall'])}"]
+    lines.extend(f"  {value:<12}{stats(summary)}" for value, summary in stay["by_type"].items())
+    lines.extend(f"  {label:<24}{count:>10,}" for label, count in stay["histogram"].items())
+    lines.append(f"  {'no intake date':<24}{stay['unknown']:>10,}")
+    return "\n".join(lines)
+
+
+def export_report(report, path):
+    """
+    Writes a report() dictionary to path as JSON (replacing it atomically).
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    os.replace(temp_path, path)
+
+# =============================================================================
+# Command Line Entry Point
+# =============================================================================
+
+def main():
+    from .service import DATA_FILE, DATABASE_FILE, open_repository
+
+    parser = argparse.ArgumentParser(description="Population report for the shelter's animals.")
+    parser.add_argument("--data", default=DATA_FILE, help="animals.json to report on")
+    parser.add_argument("--backend", choices=("journal", "sqlite"), default="journal")
+    parser.add_argument("--database", default=DATABASE_FILE)
+    parser.add_argument("--output", help="write the report here as JSON (default: print it as text)")
+    parser.add_argument("--today", type=datetime.date.fromisoformat, help="measure ages and stays to this date")
+    args = parser.parse_args()
+
+    repository = open_repository(args.backend, args.data, args.database)
+    try:
+        repository.load()
+        report = ShelterAnalytics.from_table(repository.load_table()).report(args.today)
+    finally:
+        repository.close()
+    if args.output:
+        export_report(report, args.output)
+        print(f"Wrote the report on {report['animals']:,} animals to {args.output}")
+    else:
+        print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
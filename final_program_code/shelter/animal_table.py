@@ -0,0 +1,173 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Columnar Animal Table
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Column-oriented, array-backed view of many animal records for bulk
+        analytics. Categorical fields (type, gender, breed) are stored as
+        small integer codes into a category list, weight as a float array
+        (NaN when unknown) and DOB and intake date as int arrays of date
+        ordinals (0 when unknown), so a million records cost a few bytes per numeric field
+        instead of one Python object each.
+
+    Dependencies:
+        - array              : Typed, compact numeric columns
+        - models             : Field parsing helpers and record conversion
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import math
+from array import array
+
+from .models import animal_from_dict, format_dob, format_weight, parse_dob, parse_weight
+
+# =============================================================================
+# Category Column — Values stored as codes into a list of distinct values
+# =============================================================================
+
+class _CategoryColumn:
+    """
+    Stores a repetitive text column as integer codes plus one copy of each value.
+    """
+    def __init__(self, typecode):
+        self.categories = []
+        self._code_of = {}
+        self.codes = array(typecode)
+
+    def append(self, value):
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+# =============================================================================
+# Animal Table — One column per Animal.to_dict() field
+# =============================================================================
+
+class AnimalTable:
+    """
+    Columnar table of animal records.
+
+    Attributes:
+        types, genders, breeds (_CategoryColumn) : .codes array and .categories list
+        weights (array 'd')                      : Weight in pounds, NaN when unknown
+        dob_ordinals (array 'l')                 : DOB as date ordinal, 0 when unknown
+        intake_ordinals (array 'l')              : Intake date as date ordinal, 0 when unknown
+        ids, names, microchips, health_notes,
+        descriptions, image_paths (list of str)  : Free-text columns
+
+    Weights or dates that are not parseable are kept in a small side table so
+    record(i) still round-trips exactly.
+    """
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.types = _CategoryColumn("B")
+        self.genders = _CategoryColumn("B")
+        self.breeds = _CategoryColumn("I")
+        self.weights = array("d")
+        self.dob_ordinals = array("l")
+        self.intake_ordinals = array("l")
+        self.microchips = []
+        self.health_notes = []
+        self.descriptions = []
+        self.image_paths = []
+        self._raw_text = {}  #(row, field) -> unparseable weight/dob/intake text
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds a table from an iterable of Animal.to_dict() records.
+        """
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, record):
+        row = len(self.ids)
+        self.ids.append(record.get("id", ""))
+        self.names.append(record.get("name", ""))
+        self.types.append(record.get("type", "animal"))
+        self.genders.append(record.get("gender", ""))
+        self.breeds.append(record.get("breed", ""))
+
+        text = record.get("weight", "")
+        weight = parse_weight(text)
+        if weight is not None:
+            text = text.strip() if isinstance(text, str) else format_weight(weight)
+            #not a number, NaN (the column's blank) or a number format_weight() would not give back
+            if not isinstance(weight, float) or math.isnan(weight) or format_weight(weight) != text:
+                self._raw_text[(row, "weight")] = text
+        self.weights.append(weight if isinstance(weight, float) else math.nan)
+
+        for field, column in (("dob", self.dob_ordinals), ("intake", self.intake_ordinals)):
+            date = parse_dob(record.get(field, ""))
+            if isinstance(date, str):
+                self._raw_text[(row, field)] = date
+            column.append(date if isinstance(date, int) else 0)
+
+        self.microchips.append(record.get("microchip", ""))
+        self.health_notes.append(record.get("health_notes", ""))
+        self.descriptions.append(record.get("description", ""))
+        self.image_paths.append(record.get("image_path", ""))
+
+    # -------------------------------------------------------------------------
+    # Row access
+    # -------------------------------------------------------------------------
+
+    def record(self, row):
+        """
+        Returns row as an Animal.to_dict() record.
+        """
+        weight = self.weights[row]
+        dob = self.dob_ordinals[row]
+        intake = self.intake_ordinals[row]
+        return {
+            "id": self.ids[row],
+            "type": self.types[row],
+            "name": self.names[row],
+            "gender": self.genders[row],
+            "breed": self.breeds[row],
+            "weight": self._raw_text.get((row, "weight"), "" if math.isnan(weight) else format_weight(weight)),
+            "dob": self._raw_text.get((row, "dob"), format_dob(dob) if dob else ""),
+            "microchip": self.microchips[row],
+            "health_notes": self.health_notes[row],
+            "description": self.descriptions[row],
+            "image_path": self.image_paths[row],
+            "intake": self._raw_text.get((row, "intake"), format_dob(intake) if intake else ""),
+        }
+
+    def animal(self, row):
+        """
+        Builds a full Animal object for one row.
+        """
+        return animal_from_dict(self.record(row))
+
+    # -------------------------------------------------------------------------
+    # Bulk helpers
+    # -------------------------------------------------------------------------
+
+    def value_counts(self, column):
+        """
+        Counts rows per category of "type", "gender" or "breed".
+
+        Returns:
+            Dictionary mapping category value -> row count
+        """
+        categorical = {"type": self.types, "gender": self.genders, "breed": self.breeds}[column]
+        counts = [0] * len(categorical.categories)
+        for code in categorical.codes:
+            counts[code] += 1
+        return dict(zip(categorical.categories, counts))
@@ -0,0 +1,414 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Photo Asset Store
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Managed storage for profile photos. An uploaded photo is copied once
+        into the store, named by the SHA-256 of its content, and records
+        hold a reference to it ("sha256:<hash>.jpg") instead of whatever
+        path the user picked. Records keep working when the original file
+        moves, and the same photo uploaded for several animals is stored
+        (and thumbnailed) once.
+
+        - AssetStore          : put() hashes while copying, in chunks, and
+                                skips the copy when the content is already
+                                stored; resolve() turns a reference (or a
+                                legacy path) into a file to open
+        - PerceptualIndex     : 64-bit difference hashes of stored photos,
+                                so near-duplicates (re-saved, resized or
+                                recompressed copies) are flagged at intake
+        - collect_garbage     : Removes photos no record refers to anymore,
+                                after a grace period
+        - find_moved          : Looks for legacy photos that were moved, when
+                                migrating old records
+
+        Layout: <store>/<first two hash characters>/<hash><extension>, plus
+        phash.jsonl (one {"key", "phash"} line per stored photo, appended so
+        several workstations can share a store).
+
+        Usage (from the final_program_code folder; see also ShelterService):
+            python -m shelter.assets migrate --search sample_images
+            python -m shelter.assets collect
+
+    Dependencies:
+        - Pillow (PIL)       : Perceptual hashes (imported on first use; without
+                               it photos are still stored, just not compared)
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+HASH_CHUNK_SIZE = 1 << 20  #photos are hashed and copied this many bytes at a time
+REFERENCE_PREFIX = "sha256:"
+PHASH_FILE = "phash.jsonl"
+NEAR_DUPLICATE_DISTANCE = 6  #differing bits (of 64) still counted as the same photo
+GC_GRACE_SECONDS = 24 * 60 * 60  #unreferenced photos younger than this are kept
+
+_KEY = re.compile(r"([0-9a-f]{64})(\.[a-z0-9]{1,5})?")
+
+# =============================================================================
+# References — What records store instead of a file path
+# =============================================================================
+
+def is_reference(value):
+    """
+    True when value is an asset reference rather than a legacy file path.
+    """
+    return value.startswith(REFERENCE_PREFIX) and _KEY.fullmatch(value[len(REFERENCE_PREFIX):]) is not None
+
+
+def reference_key(value):
+    """
+    Returns the stored file name ("<hash>.jpg") a reference points at.
+    """
+    return value[len(REFERENCE_PREFIX):]
+
+
+def digest_of(path):
+    """
+    Returns the content hash encoded in the name of a stored photo, or None
+    when path is not in an asset store layout. Lets callers such as the
+    thumbnail cache skip hashing files whose hash is already known.
+    """
+    name = os.path.basename(path)
+    match = _KEY.fullmatch(name)
+    if match and os.path.basename(os.path.dirname(path)) == name[:2]:
+        return match.group(1)
+    return None
+
+
+def find_moved(path, search_dirs):
+    """
+    Looks for a legacy photo that is no longer at path under the same file
+    name in search_dirs. Windows paths are understood on any platform.
+
+    Returns:
+        The first existing candidate, or None
+    """
+    name = path.replace("\\", "/").rsplit("/", 1)[-1]
+    for folder in search_dirs:
+        candidate = os.path.join(folder, name)
+        if name and os.path.isfile(candidate):
+            return candidate
+    return None
+
+# =============================================================================
+# Perceptual Hashing — Near-duplicate detection
+# =============================================================================
+
+def perceptual_hash(path):
+    """
+    64-bit difference hash (dHash): the photo is shrunk to 9x8 grayscale and
+    each bit records whether a pixel is brighter than its right neighbour.
+    Re-encoding, resizing or small edits change only a few bits.
+
+    Raises:
+        ImportError if Pillow is not installed; OSError if the image cannot be read
+    """
+    from PIL import Image, ImageOps  # Requires Pillow library
+
+    with Image.open(path) as img:
+        img.draft("L", (64, 64))  #JPEGs decode at reduced scale
+        img = ImageOps.exif_transpose(img).convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+        pixels = img.tobytes()
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            value = value << 1 | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return value
+
+
+class PerceptualIndex:
+    """
+    Perceptual hashes of stored photos, searchable by Hamming distance.
+
+    Each hash is split into eight bytes and indexed by each of them. Two
+    hashes at most seven bits apart must share at least one whole byte, so
+    looking up the eight bytes of a query finds every near-duplicate without
+    comparing against every stored photo.
+    """
+    def __init__(self):
+        self.hashes = {}  #stored file name -> hash
+        self._bands = [{} for _ in range(8)]  #byte position -> {byte value: set of names}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, key, value):
+        if key in self.hashes:
+            self.remove(key)
+        self.hashes[key] = value
+        for band, holders in enumerate(self._bands):
+            holders.setdefault(value >> (band * 8) & 0xFF, set()).add(key)
+
+    def remove(self, key):
+        value = self.hashes.pop(key, None)
+        if value is None:
+            return
+        for band, holders in enumerate(self._bands):
+            names = holders[value >> (band * 8) & 0xFF]
+            names.discard(key)
+            if not names:
+                del holders[value >> (band * 8) & 0xFF]
+
+    def near(self, value, max_distance=NEAR_DUPLICATE_DISTANCE):
+        """
+        Returns {stored file name: distance} for hashes within max_distance
+        bits of value (max_distance must be below 8), closest first.
+        """
+        candidates = set()
+        for band, holders in enumerate(self._bands):
+            candidates.update(holders.get(value >> (band * 8) & 0xFF, ()))
+        found = {}
+        for key in candidates:
+            distance = (self.hashes[key] ^ value).bit_count()
+            if distance <= max_distance:
+                found[key] = distance
+        return dict(sorted(found.items(), key=lambda item: item[1]))
+
+# =============================================================================
+# Asset Store — Content-addressed photo files
+# =============================================================================
+
+class AssetStore:
+    """
+    Folder of photos named by content hash.
+
+    Args:
+        root_dir (str) : Store folder (created on first put)
+    """
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.phash_path = os.path.join(root_dir, PHASH_FILE)
+        self._lock = threading.Lock()
+        self._phashes = None  #PerceptualIndex, read from phash.jsonl on first use
+
+    def path_for(self, key):
+        """
+        Returns where the stored file name key lives in the store.
+        """
+        return os.path.join(self.root_dir, key[:2], key)
+
+    def resolve(self, value):
+        """
+        Returns the file to open for an image_path value: the stored photo
+        for a reference, the path itself for a legacy path, or "" when there
+        is no photo or the file is missing.
+        """
+        if not value:
+            return ""
+        path = self.path_for(reference_key(value)) if is_reference(value) else value
+        return path if os.path.isfile(path) else ""
+
+    def put(self, source):
+        """
+        Copies source into the store, hashing it in the same chunked pass.
+        When the content is already stored the copy is discarded, so a photo
+        uploaded many times is kept once.
+
+        Returns:
+            (reference, True if the content was new)
+        Raises:
+            OSError if source cannot be read or the store cannot be written
+        """
+        extension = os.path.splitext(source)[1].lower()
+        if not re.fullmatch(r"\.[a-z0-9]{1,5}", extension):
+            extension = ""
+        os.makedirs(self.root_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        temp_path = os.path.join(self.root_dir, f"upload.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(source, "rb") as file, open(temp_path, "wb") as copy:
+                for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    copy.write(chunk)
+            key = digest.hexdigest() + extension
+            target = self.path_for(key)
+            if os.path.exists(target):
+                os.utime(target)  #in use again: restart its garbage-collection grace period
+                return REFERENCE_PREFIX + key, False
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._index_phash(key, target)
+        return REFERENCE_PREFIX + key, True
+
+    # -------------------------------------------------------------------------
+    # Near-duplicates
+    # -------------------------------------------------------------------------
+
+    def perceptual_index(self):
+        """
+        Returns the PerceptualIndex, reading phash.jsonl the first time.
+        """
+        with self._lock:
+            if self._phashes is None:
+                self._phashes = PerceptualIndex()
+                try:
+                    with open(self.phash_path, "r", encoding="utf-8") as file:
+                        for line in file:
+                            try:
+                                entry = json.loads(line)
+                                self._phashes.add(entry["key"], int(entry["phash"], 16))
+                            except (ValueError, KeyError, TypeError):
+                                continue  #a torn last line from an interrupted write
+                except FileNotFoundError:
+                    pass
+            return self._phashes
+
+    def near_duplicates(self, reference, max_distance=NEAR_DUPLICATE_DISTANCE):
+        """
+        References of other stored photos that look like the one referenced,
+        closest first. Empty when Pillow is missing or the photo has no hash.
+        """
+        if not is_reference(reference):
+            return []
+        index = self.perceptual_index()
+        key = reference_key(reference)
+        value = index.hashes.get(key)
+        if value is None:
+            return []
+        return [REFERENCE_PREFIX + other for other in index.near(value, max_distance) if other != key]
+
+    def _index_phash(self, key, path):
+        try:
+            value = perceptual_hash(path)
+        except (ImportError, OSError, ValueError):
+            return  #not an image Pillow can read (or no Pillow): stored, just not compared
+        index = self.perceptual_index()
+        with self._lock:
+            index.add(key, value)
+            with open(self.phash_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps({"key": key, "phash": f"{value:016x}"}) + "\n")
+
+    # -------------------------------------------------------------------------
+    # Garbage collection
+    # -------------------------------------------------------------------------
+
+    def stored_keys(self):
+        """
+        Yields (stored file name, path) for every photo in the store.
+        """
+        try:
+            shards = os.scandir(self.root_dir)
+        except FileNotFoundError:
+            return
+        with shards:
+            for shard in shards:
+                if not shard.is_dir() or len(shard.name) != 2:
+                    continue
+                with os.scandir(shard.path) as files:
+                    for entry in files:
+                        if _KEY.fullmatch(entry.name):
+                            yield entry.name, entry.path
+
+    def collect_garbage(self, referenced, grace_seconds=GC_GRACE_SECONDS):
+        """
+        Deletes stored photos not in referenced, once they are older than
+        grace_seconds. The grace period covers photos just uploaded but not
+        saved yet, and ones another workstation saved since referenced was
+        gathered. Safe to run on a background thread.
+
+        Args:
+            referenced (set) : image_path values still in use (legacy paths are ignored)
+        Returns:
+            Number of photos deleted
+        """
+        keep = {reference_key(value) for value in referenced if is_reference(value)}
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        for key, path in list(self.stored_keys()):
+            if key in keep:
+                continue
+            try:
+                if os.stat(path).st_mtime >= cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue  #another workstation collected it first
+            removed += 1
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass  #shard folder still holds other photos
+        if removed:
+            self._compact_phashes()
+        return removed
+
+    def _compact_phashes(self):
+        """
+        Drops hashes of deleted photos from phash.jsonl.
+        """
+        index = self.perceptual_index()
+        with self._lock:
+            for key in [key for key in index.hashes if not os.path.exists(self.path_for(key))]:
+                index.remove(key)
+            temp_path = f"{self.phash_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for key, value in index.hashes.items():
+                    file.write(json.dumps({"key": key, "phash": f"{value:016x}"}) + "\n")
+            os.replace(temp_path, self.phash_path)
+
+    def collect_in_background(self, referenced, grace_seconds=GC_GRACE_SECONDS):
+        """
+        Runs collect_garbage on a daemon thread and returns the thread.
+        """
+        thread = threading.Thread(target=self.collect_garbage, args=(referenced, grace_seconds),
+                                  name="photo-gc", daemon=True)
+        thread.start()
+        return thread
+
+# =============================================================================
+# Command Line — Migrate legacy photo paths and collect unused photos
+# =============================================================================
+
+def main():
+    from .service import DATA_FILE, DATABASE_FILE, ShelterService
+
+    parser = argparse.ArgumentParser(description="Manage the shelter's photo store.")
+    parser.add_argument("command", choices=("migrate", "collect"),
+                        help="migrate: copy photos records point at into the store; "
+                             "collect: delete stored photos no record uses")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--backend", choices=("journal", "sqlite"), default="journal")
+    parser.add_argument("--database", default=DATABASE_FILE)
+    parser.add_argument("--photos", help="photo store folder (default: photos/ next to the data)")
+    parser.add_argument("--search", action="append", default=[],
+                        help="folder to look in for photos that were moved (repeatable)")
+    parser.add_argument("--grace-hours", type=float, default=GC_GRACE_SECONDS / 3600,
+                        help="keep unused photos younger than this (collect)")
+    args = parser.parse_args()
+
+    service = ShelterService.open(args.backend, args.data, args.database, photo_dir=args.photos)
+    try:
+        service.repository.load()
+        if args.command == "migrate":
+            migrated, missing = service.migrate_photos(args.search)
+            print(f"Moved {migrated:,} photo(s) into {service.assets.root_dir}")
+            for animal in missing:
+                print(f"  not found for {animal.name}: {animal.image_path}")
+        elif service.skipped_records:
+            #photos of the unreadable records would look unused and be deleted
+            parser.exit(1, f"{len(service.skipped_records)} record(s) could not be read; "
+                           "fix them before collecting unused photos\n")
+        else:
+            removed = service.assets.collect_garbage(service.photo_references(), args.grace_hours * 3600)
+            print(f"Deleted {removed:,} unused photo(s) from {service.assets.root_dir}")
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,448 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Binary Snapshot
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Compact binary copy of animals.json (animals.json.bin) that opens
+        without parsing. The file is memory-mapped and records are handed
+        out as MappedRecord views, which decode a field only when it is
+        read, so loading costs what the search index needs and nothing
+        more. animals.json stays the file that is written, exported and
+        exchanged; the binary copy is a cache rebuilt whenever it no longer
+        matches the JSON it was made from (see JournaledStorage).
+
+        Layout (little-endian, every section 8-byte aligned):
+
+        - header             : magic, version, record count, size / mtime of
+                               the source JSON, section offsets
+        - string table       : each distinct type, gender and breed once,
+                               length-prefixed UTF-8
+        - columns            : fixed width, one entry per record
+                                 weight  float64 (NaN when blank)
+                                 offsets uint64  (start of each record, plus end)
+                                 type, gender, breed uint32 string-table codes
+                                 dob, intake int32 date ordinals (0 when blank)
+                                 rev     int32
+                                 present uint32 bit mask of the keys the record has
+        - key text           : id, name and microchip of every record, one
+                               NUL-separated UTF-8 column each (uint64 length
+                               first), so each decodes in a single call
+        - records            : per record, the end offsets of its other text
+                               fields (health notes, description, photo,
+                               extras) as uint32, then their UTF-8 bytes
+
+        Values the columns cannot hold exactly (a weight typed as "9.50", a
+        DOB that is not a date, a name containing NUL, unknown keys) go to the record's "extras"
+        field as JSON, so a MappedRecord always reads back the record that
+        was written.
+
+    Dependencies:
+        - mmap, struct, array : Standard library
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import functools
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+from .models import LazyAnimal, format_dob, format_weight, parse_dob, parse_weight, resolved_type
+
+MAGIC = b"SHELTBIN"
+VERSION = 1
+BINARY_SUFFIX = ".bin"
+CACHED_VALUES = 1 << 16  #distinct weights / dates remembered while encoding (they repeat a lot)
+
+#magic, version, count, source size, source mtime_ns, strings, columns, key text, records
+_HEADER = struct.Struct("<8sIIqqqqqq")
+CATEGORICAL = ("type", "gender", "breed")
+KEY_TEXT = ("id", "name", "microchip")  #read by the search index on every load
+TEXT = ("health_notes", "description", "image_path")
+DATES = ("dob", "intake")
+#to_dict() order; a record's present mask has one bit per key, in this order
+KEYS = ("id", "type", "name", "gender", "breed", "weight", "dob", "microchip",
+        "health_notes", "description", "image_path", "intake", "rev")
+_BIT = {key: 1 << position for position, key in enumerate(KEYS)}
+_ID, _NAME, _MICROCHIP, _TYPE, _GENDER, _BREED = (_BIT[key] for key in ("id", "name", "microchip", "type", "gender", "breed"))
+_EXTRAS = 1 << len(KEYS)  #extras field holds more keys or exact values
+_TEXT_SLOT = {key: position for position, key in enumerate(TEXT)}
+_KEY_SLOT = {key: position for position, key in enumerate(KEY_TEXT)}
+_TEXT_FIELDS = struct.Struct(f"<{len(TEXT) + 1}I")
+
+# =============================================================================
+# Column Values — What the fixed-width columns can hold exactly
+# =============================================================================
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+@functools.lru_cache(maxsize=CACHED_VALUES)
+def _exact_weight(value):
+    """
+    The weight column entry for the string value (NaN for blank), or None
+    when the column would not give value back exactly.
+    """
+    if value == "":
+        return math.nan
+    weight = parse_weight(value)
+    if not isinstance(weight, float) or math.isnan(weight):
+        return None  #NaN marks a blank in the column, so a typed "nan" goes to the extras
+    return weight if format_weight(weight) == value else None
+
+
+@functools.lru_cache(maxsize=CACHED_VALUES)
+def _exact_date(value):
+    """
+    The date column entry for the string value (0 for blank), or None when
+    the column would not give value back exactly.
+    """
+    if value == "":
+        return 0
+    ordinal = parse_dob(value)
+    return ordinal if isinstance(ordinal, int) and format_dob(ordinal) == value else None
+
+# =============================================================================
+# Writing — Records to the binary layout
+# =============================================================================
+
+def encode_records(records, source_size=0, source_mtime_ns=0):
+    """
+    Encodes records (Animal.to_dict() dictionaries) as a binary snapshot.
+
+    Args:
+        source_size, source_mtime_ns : Identify the JSON the records came from
+    Returns:
+        bytes
+    """
+    codes = {}
+    strings = []
+    weights, offsets = array("d"), array("Q")
+    categorical = {field: array("I") for field in CATEGORICAL}
+    dates = {field: array("i") for field in DATES}
+    revisions, present = array("i"), array("I")
+    key_text = [[] for _ in KEY_TEXT]
+    blob = bytearray()
+    for record in records:
+        mask = 0
+        extras = {}
+        texts = [b""] * (len(TEXT) + 1)
+        keys = [""] * len(KEY_TEXT)
+        row_codes = dict.fromkeys(CATEGORICAL, 0)
+        weight, ordinals, revision = math.nan, dict.fromkeys(DATES, 0), 0
+        for key, value in record.items():
+            if key in _KEY_SLOT and isinstance(value, str) and "\0" not in value:
+                keys[_KEY_SLOT[key]] = value
+            elif key in _TEXT_SLOT and isinstance(value, str):
+                texts[_TEXT_SLOT[key]] = value.encode("utf-8")
+            elif key in row_codes and isinstance(value, str):
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(strings)
+                    strings.append(value)
+                row_codes[key] = code
+            elif key == "weight" and isinstance(value, str) and _exact_weight(value) is not None:
+                weight = _exact_weight(value)
+            elif key in ordinals and isinstance(value, str) and _exact_date(value) is not None:
+                ordinals[key] = _exact_date(value)
+            elif key == "rev" and type(value) is int and -2 ** 31 <= value < 2 ** 31:
+                revision = value
+            else:
+                extras[key] = value  #unknown key, or a value the columns cannot hold exactly
+                continue
+            mask |= _BIT[key]
+        if extras:
+            mask |= _EXTRAS
+            texts[-1] = json.dumps(extras, separators=(",", ":")).encode("utf-8")
+        for column, value in zip(key_text, keys):
+            column.append(value)
+        for field in CATEGORICAL:
+            categorical[field].append(row_codes[field])
+        for field in DATES:
+            dates[field].append(ordinals[field])
+        weights.append(weight)
+        revisions.append(revision)
+        present.append(mask)
+        offsets.append(len(blob))
+        end, ends = 0, []
+        for text in texts:
+            end += len(text)
+            ends.append(end)
+        blob += _TEXT_FIELDS.pack(*ends)
+        blob += b"".join(texts)
+    offsets.append(len(blob))
+
+    table = bytearray(struct.pack("<I", len(strings)))
+    for value in strings:
+        encoded = value.encode("utf-8")
+        table += struct.pack("<I", len(encoded)) + encoded
+    table += bytes(_align(len(table)) - len(table))
+    columns = bytearray()
+    for column in (weights, offsets, *categorical.values(), *dates.values(), revisions, present):
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns += column.tobytes()
+    columns += bytes(_align(len(columns)) - len(columns))
+    text = bytearray()
+    for column in key_text:
+        encoded = "\0".join(column).encode("utf-8")
+        text += struct.pack("<Q", len(encoded)) + encoded
+        text += bytes(_align(len(text)) - len(text))
+    strings_at = _align(_HEADER.size)
+    columns_at = strings_at + len(table)
+    text_at = columns_at + len(columns)
+    records_at = text_at + len(text)
+    header = _HEADER.pack(MAGIC, VERSION, len(present), source_size, source_mtime_ns,
+                          strings_at, columns_at, text_at, records_at)
+    return b"".join((header, bytes(strings_at - _HEADER.size), table, columns, text, blob))
+
+
+def write_binary_snapshot(path, records, source_size=0, source_mtime_ns=0):
+    """
+    Writes records to path as a binary snapshot, atomically (a temporary
+    file renamed over the target), so readers never map a partial file.
+    """
+    data = encode_records(records, source_size, source_mtime_ns)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(data)
+
+# =============================================================================
+# Reading — Memory-mapped snapshot and lazy record views
+# =============================================================================
+
+class BinarySnapshot:
+    """
+    A memory-mapped binary snapshot. Columns are memoryviews straight onto
+    the mapping. The id, name and microchip columns are decoded when the
+    snapshot opens (loading indexes all three); every other text field is
+    decoded when it is read.
+    """
+    def __init__(self, mapping):
+        self._mapping = mapping
+        view = memoryview(mapping)
+        (magic, version, count, self.source_size, self.source_mtime_ns,
+         strings_at, columns_at, text_at, records_at) = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a binary snapshot of this version")
+        self.count = count
+        (string_count,) = struct.unpack_from("<I", view, strings_at)
+        self.strings = []
+        position = strings_at + 4
+        for _ in range(string_count):
+            (length,) = struct.unpack_from("<I", view, position)
+            self.strings.append(sys.intern(str(view[position + 4:position + 4 + length], "utf-8")))
+            position += 4 + length
+        columns = view[columns_at:records_at]
+        widths = (("weights", "d", 8), ("offsets", "Q", 8), ("type", "I", 4), ("gender", "I", 4), ("breed", "I", 4),
+                  ("dob", "i", 4), ("intake", "i", 4), ("rev", "i", 4), ("present", "I", 4))
+        position = 0
+        for name, code, width in widths:
+            length = count + 1 if name == "offsets" else count
+            setattr(self, name, columns[position:position + length * width].cast(code))
+            position += length * width
+        self.resolved_types = [resolved_type(value) for value in self.strings]
+        position = text_at
+        for name in ("ids", "names", "microchips"):
+            (length,) = struct.unpack_from("<Q", view, position)
+            values = str(view[position + 8:position + 8 + length], "utf-8").split("\0") if count else []
+            if len(values) != count:
+                raise ValueError("key text column does not match the record count")
+            setattr(self, name, values)
+            position = text_at + _align(position + 8 + length - text_at)
+        self.records = view[records_at:]
+
+    @classmethod
+    def open(cls, path, source_size=None, source_mtime_ns=None):
+        """
+        Maps the binary snapshot at path.
+
+        Returns:
+            The BinarySnapshot, or None when the file is missing, unreadable,
+            or was made from a different version of the JSON (when the
+            source size / mtime_ns are given). Big-endian machines always
+            get None and read the JSON instead.
+        """
+        if sys.byteorder != "little":
+            return None  #columns are mapped as they are on disk
+        try:
+            with open(path, "rb") as file:
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None  #missing, or empty (mmap cannot map zero bytes)
+        try:
+            snapshot = cls(mapping)
+        except (ValueError, struct.error, TypeError):
+            return None  #views made before the error still hold the mapping; it closes when they are freed
+        if source_size is not None and (snapshot.source_size, snapshot.source_mtime_ns) != (source_size, source_mtime_ns):
+            snapshot.close()
+            return None
+        return snapshot
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield MappedRecord(self, row)
+
+    def close(self):
+        """
+        Releases the mapping. Only safe once no MappedRecord is in use.
+        """
+        for name in ("weights", "offsets", "type", "gender", "breed", "dob", "intake", "rev", "present", "records"):
+            getattr(self, name).release()
+        self._mapping.close()
+
+    # -------------------------------------------------------------------------
+
+    def text(self, row, slot):
+        start = self.offsets[row]
+        ends = _TEXT_FIELDS.unpack_from(self.records, start)
+        begin = start + _TEXT_FIELDS.size + (ends[slot - 1] if slot else 0)
+        return str(self.records[begin:start + _TEXT_FIELDS.size + ends[slot]], "utf-8")
+
+    def extras(self, row):
+        return json.loads(self.text(row, len(TEXT))) if self.present[row] & _EXTRAS else {}
+
+    def value(self, row, key):
+        """
+        Returns the record's value for key; raises KeyError if it has none.
+        """
+        mask = self.present[row]
+        bit = _BIT.get(key, 0)
+        if not mask & bit:
+            if mask & _EXTRAS:
+                return self.extras(row)[key]
+            raise KeyError(key)
+        if key in _KEY_SLOT:
+            return (self.ids, self.names, self.microchips)[_KEY_SLOT[key]][row]
+        slot = _TEXT_SLOT.get(key)
+        if slot is not None:
+            return self.text(row, slot)
+        if key in CATEGORICAL:
+            return self.strings[getattr(self, key)[row]]
+        if key == "weight":
+            weight = self.weights[row]
+            return "" if math.isnan(weight) else format_weight(weight)
+        if key in DATES:
+            ordinal = getattr(self, key)[row]
+            return format_dob(ordinal) if ordinal else ""
+        return self.rev[row]
+
+    def keys(self, row):
+        mask = self.present[row]
+        keys = [key for key in KEYS if mask & _BIT[key]]
+        if mask & _EXTRAS:
+            keys += [key for key in self.extras(row) if key not in keys]
+        return keys
+
+
+class MappedRecord(Mapping):
+    """
+    Read-only record backed by a row of a BinarySnapshot. Behaves as the
+    to_dict() dictionary it was written from; each read decodes one field.
+    """
+    __slots__ = ("snapshot", "row")
+
+    def __init__(self, snapshot, row):
+        self.snapshot = snapshot
+        self.row = row
+
+    def __getitem__(self, key):
+        return self.snapshot.value(self.row, key)
+
+    def get(self, key, default=None):
+        try:
+            return self.snapshot.value(self.row, key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        mask = self.snapshot.present[self.row]
+        if mask & _BIT.get(key, 0):
+            return True
+        return bool(mask & _EXTRAS) and key in self.snapshot.extras(self.row)
+
+    def __iter__(self):
+        return iter(self.snapshot.keys(self.row))
+
+    def __len__(self):
+        return len(self.snapshot.keys(self.row))
+
+    def lazy_animal(self):
+        """
+        Returns the MappedAnimal for this row.
+        """
+        return MappedAnimal(self.snapshot, self.row)
+
+
+class MappedAnimal(LazyAnimal):
+    """
+    LazyAnimal over a snapshot row. The fields the search index reads on
+    load come straight from the snapshot (type, gender and breed are
+    string-table lookups, the others list lookups in the decoded key text
+    columns); everything else goes through record, a
+    MappedRecord, like any LazyAnimal.
+    """
+    __slots__ = ("snapshot", "row")
+
+    def __init__(self, snapshot, row):
+        self.snapshot = snapshot
+        self.row = row
+
+    @property
+    def record(self):
+        return MappedRecord(self.snapshot, self.row)
+
+    @property
+    def animal_id(self):
+        if self.snapshot.present[self.row] & _ID:
+            return self.snapshot.ids[self.row]
+        return self.record.get("id", "")
+
+    @property
+    def name(self):
+        if self.snapshot.present[self.row] & _NAME:
+            return self.snapshot.names[self.row]
+        return self.record["name"]
+
+    @property
+    def microchip_number(self):
+        if self.snapshot.present[self.row] & _MICROCHIP:
+            return self.snapshot.microchips[self.row]
+        return self.record["microchip"]
+
+    @property
+    def animal_type(self):
+        if self.snapshot.present[self.row] & _TYPE:
+            return self.snapshot.resolved_types[self.snapshot.type[self.row]]
+        return resolved_type(self.record.get("type", "animal"))
+
+    @property
+    def gender(self):
+        if self.snapshot.present[self.row] & _GENDER:
+            return self.snapshot.strings[self.snapshot.gender[self.row]]
+        return self.record.get("gender", "")
+
+    @property
+    def breed(self):
+        if self.snapshot.present[self.row] & _BREED:
+            return self.snapshot.strings[self.snapshot.breed[self.row]]
+        return self.record["breed"]
@@ -0,0 +1,275 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Bulk Import / Export Tool
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Headless command line companion to the GUI for moving intake batches
+        between shelters.
+
+        - import : Streams a CSV or JSON Lines file, validates rows with the
+                   same rules as the intake form on a pool of worker
+                   processes, reports every bad row, and saves the good ones
+                   in one atomic write (nothing is saved if any row is bad,
+                   unless --skip-invalid is given).
+        - export : Writes the animals matching the search filters to CSV or
+                   JSON Lines.
+
+        Usage (from the final_program_code folder; --data/--database
+        point at the shelter's files):
+            python -m shelter.bulk import intake.csv
+            python -m shelter.bulk import intake.jsonl --skip-invalid --workers 4
+            python -m shelter.bulk export cats.csv --type cat --gender F
+
+    Dependencies:
+        - csv, json          : File formats
+        - concurrent.futures : Process pool for validation
+        - service            : Data access and photo storage shared with the GUI
+        - validation         : Form rules shared with the GUI
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .models import RECORD_FIELDS
+from .repository import normalize_filters
+from .service import DATA_FILE, DATABASE_FILE, ShelterService
+from .validation import validate_rows
+
+CHUNK_SIZE = 1000  #rows sent to a worker process at a time
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# =============================================================================
+# Readers and Writers — CSV and JSON Lines
+# =============================================================================
+
+def file_format(path, requested=None):
+    """
+    Returns "csv" or "jsonl", from requested or else the file extension.
+    """
+    if requested:
+        return requested
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"cannot tell the format of {path}; pass --format csv or --format jsonl")
+    return FORMATS[extension]
+
+
+def iter_rows(path, fmt, on_error):
+    """
+    Yields (row_number, fields) for each data row of path, one at a time.
+    Rows that cannot be parsed are reported as on_error(row_number, message).
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            for number, fields in enumerate(csv.DictReader(file), start=1):
+                yield number, fields
+            return
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+            except ValueError as error:
+                on_error(number, f"not valid JSON ({error})")
+                continue
+            if not isinstance(fields, dict):
+                on_error(number, "expected a JSON object")
+                continue
+            yield number, fields
+
+
+def write_records(path, fmt, records):
+    """
+    Writes records to path through a temporary file, so an interrupted export
+    never leaves a half-written file behind.
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=RECORD_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        else:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+                count += 1
+    os.replace(temp_path, path)
+    return count
+
+# =============================================================================
+# Validation — Chunks of rows checked on worker processes
+# =============================================================================
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_validated(rows, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields (row_number, cleaned record, error messages) in input order.
+
+    Chunks are validated on a process pool with at most two chunks per worker
+    in flight, so the input is streamed rather than read up front. workers=0
+    validates in this process instead.
+    """
+    if workers == 0:
+        for chunk in _chunks(rows, chunk_size):
+            yield from validate_rows(chunk)
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        limit = 2 * workers
+        for chunk in _chunks(rows, chunk_size):
+            in_flight.append(pool.submit(validate_rows, chunk))
+            if len(in_flight) >= limit:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+# =============================================================================
+# Commands
+# =============================================================================
+
+def import_file(service, path, fmt, workers=None, skip_invalid=False, dry_run=False, report=print):
+    """
+    Validates every row of path and adds the valid animals in one atomic write.
+    Photo file paths in image_path are copied into the photo store first, as
+    the intake form does; a photo that cannot be stored rejects its row.
+
+    Args:
+        service         : Loaded ShelterService to add to
+        report          : Called as report(message) for each rejected row
+        skip_invalid    : Save the valid rows even if some rows are rejected
+        dry_run         : Validate only; save nothing
+    Returns:
+        (number of animals added, number of rejected rows)
+    """
+    rejected = 0
+
+    def reject(number, message):
+        nonlocal rejected
+        rejected += 1
+        report(f"row {number}: {message}")
+
+    records = []
+    seen_ids = set()
+    rows = iter_rows(path, fmt, reject)
+    for number, record, errors in iter_validated(rows, workers):
+        record_id = record.get("id")
+        if record_id and (record_id in seen_ids or service.get(record_id) is not None):
+            errors.append(f"ID {record_id} already exists.")
+        if errors:
+            reject(number, " ".join(errors))
+            continue
+        if record_id:
+            seen_ids.add(record_id)
+        records.append((number, record))
+
+    if dry_run or (rejected and not skip_invalid):
+        return 0, rejected
+    stored = []
+    for number, record in records:
+        errors = service.store_photo(record)
+        if errors:
+            reject(number, " ".join(errors))
+        else:
+            stored.append(record)
+    if rejected and not skip_invalid:
+        return 0, rejected  #photos already stored are unreferenced and go with the next collect
+    return service.add_animals(stored), rejected
+
+
+def export_file(repository, path, fmt, filters):
+    """
+    Writes every animal matching filters (the search form's fields) to path.
+
+    Returns:
+        Number of animals exported
+    """
+    records = (animal.to_dict()
+               for batch in repository.iter_search(**filters, batch_size=CHUNK_SIZE)
+               for animal in batch)
+    return write_records(path, fmt, records)
+
+# =============================================================================
+# Command Line Entry Point
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import and export of shelter animals.")
+    parser.add_argument("--backend", choices=("journal", "sqlite"),
+                        default=os.environ.get("SHELTER_BACKEND", "journal"))
+    parser.add_argument("--data", default=DATA_FILE, help="animals.json file (journal backend)")
+    parser.add_argument("--database", default=DATABASE_FILE, help="SQLite file (sqlite backend)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="add animals from a CSV or JSON Lines file")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=("csv", "jsonl"))
+    importer.add_argument("--workers", type=int, help="validation processes (0 = no pool)")
+    importer.add_argument("--skip-invalid", action="store_true", help="save valid rows even if some are rejected")
+    importer.add_argument("--dry-run", action="store_true", help="validate only")
+
+    exporter = commands.add_parser("export", help="write matching animals to a CSV or JSON Lines file")
+    exporter.add_argument("path")
+    exporter.add_argument("--format", choices=("csv", "jsonl"))
+    for option in ("name", "gender", "type", "breed", "microchip"):
+        exporter.add_argument(f"--{option}", default="")
+
+    args = parser.parse_args(argv)
+    try:
+        fmt = file_format(args.path, args.format)
+    except ValueError as error:
+        parser.error(str(error))
+
+    service = ShelterService.open(args.backend, args.data, args.database)
+    try:
+        service.repository.load()
+        for number, message in service.skipped_records:
+            print(f"warning: stored record {number} could not be read ({message})", file=sys.stderr)
+
+        if args.command == "export":
+            filters = normalize_filters(name=args.name, gender=args.gender, animal_type=args.type,
+                                        breed=args.breed, microchip=args.microchip)
+            print(f"Exported {export_file(service.repository, args.path, fmt, filters)} animals to {args.path}")
+            return 0
+
+        added, rejected = import_file(service, args.path, fmt, args.workers, args.skip_invalid,
+                                      args.dry_run, report=lambda message: print(message, file=sys.stderr))
+        if rejected and not args.skip_invalid:
+            print(f"{rejected} rows rejected; nothing was imported", file=sys.stderr)
+            return 1
+        if args.dry_run:
+            print(f"Dry run: {rejected} rows rejected")
+        else:
+            print(f"Imported {added} animals ({rejected} rows rejected)")
+        return 1 if rejected else 0
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Change Events
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Tells interested code what changed instead of making it recompute
+        everything after each save. Repositories report every insert,
+        update and delete (their own and those picked up from other
+        workstations) as a ChangeEvent carrying the record before and after
+        the change; a ChangeBus collects them and hands each subscriber one
+        coalesced batch per operation.
+
+        - ChangeEvent        : insert / update / delete / reload, with the
+                               to_dict() records before and after
+        - coalesce           : Merges a batch so each animal appears once
+        - ChangeBus          : Subscribers, batching and delivery
+        - ChangeFeed         : Subscriber appending events to a JSON Lines
+                               file, so other processes can follow along
+        - read_feed, follow  : Reading that file from a saved position
+
+        Usage (print changes as they are saved):
+            python -m shelter.events animals.changes.jsonl --follow
+
+    Dependencies:
+        - filelock           : Keeps appends from several workstations whole
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+
+from .filelock import FileLock
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+RELOAD = "reload"  #everything may have changed; rebuild from the repository
+LOCAL = "local"    #made through this process
+REMOTE = "remote"  #saved by another process and picked up here
+FOLLOW_INTERVAL = 1.0  #seconds between checks of a followed feed
+
+# =============================================================================
+# Change Event — One change to one animal
+# =============================================================================
+
+class ChangeEvent:
+    """
+    One change to the animal data.
+
+    Attributes:
+        kind (str)      : INSERT, UPDATE, DELETE or RELOAD
+        animal_id (str) : Animal changed ("" for RELOAD)
+        before (dict)   : Its to_dict() record before the change (None for an insert)
+        after (dict)    : Its record after the change (None for a delete)
+        origin (str)    : LOCAL or REMOTE
+
+    The records are shared with the repository and must not be modified.
+    """
+    __slots__ = ("kind", "animal_id", "before", "after", "origin")
+
+    def __init__(self, kind, animal_id="", before=None, after=None, origin=LOCAL):
+        self.kind = kind
+        self.animal_id = animal_id
+        self.before = before
+        self.after = after
+        self.origin = origin
+
+    @classmethod
+    def between(cls, animal_id, before, after, origin=LOCAL):
+        """
+        Returns the event turning before into after, or None if there is
+        nothing to report (an animal inserted and deleted again).
+        """
+        if before is None and after is None:
+            return None
+        kind = INSERT if before is None else DELETE if after is None else UPDATE
+        return cls(kind, animal_id, before, after, origin)
+
+    def to_json(self):
+        return {"op": self.kind, "id": self.animal_id, "before": self.before,
+                "after": self.after, "origin": self.origin}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["op"], data.get("id", ""), data.get("before"), data.get("after"),
+                   data.get("origin", LOCAL))
+
+    def __repr__(self):
+        return f"ChangeEvent({self.kind!r}, {self.animal_id!r}, origin={self.origin!r})"
+
+
+def coalesce(events):
+    """
+    Merges a batch of events so each animal appears once: its record before
+    the first change and after the last (an update then a delete is a
+    delete, an insert then an update is an insert, an insert then a delete
+    disappears). A merged event is LOCAL if any of its events was, so the
+    change feed still records this process's part of it. A RELOAD replaces
+    everything before it.
+
+    Returns:
+        List of events, each animal where it first changed
+    """
+    merged = {}  #animal_id -> event, or None when the changes cancelled out
+    reload = None
+    for event in events:
+        if event.kind == RELOAD:
+            merged, reload = {}, event
+            continue
+        first = merged.get(event.animal_id)
+        if first is None:
+            merged[event.animal_id] = event
+        else:
+            origin = LOCAL if LOCAL in (first.origin, event.origin) else event.origin
+            merged[event.animal_id] = ChangeEvent.between(event.animal_id, first.before, event.after, origin)
+    result = [reload] if reload is not None else []
+    result.extend(event for event in merged.values() if event is not None)
+    return result
+
+# =============================================================================
+# Change Bus — Subscribers and batched delivery
+# =============================================================================
+
+class ChangeBus:
+    """
+    Collects published events and hands them to subscribers as one
+    coalesced list per deliver() call.
+
+    The owner (ShelterService) delivers after each operation, so a bulk
+    import or a refresh that picked up a thousand changes arrives as one
+    batch; batch() holds delivery back across several operations.
+    Subscribers run on the thread that delivers.
+    """
+    def __init__(self):
+        self._subscribers = []
+        self._pending = []
+        self._lock = threading.Lock()
+        self._held = 0
+
+    def subscribe(self, callback):
+        """
+        Has callback(events) called with every delivered batch.
+
+        Returns:
+            callback, for unsubscribe()
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, event):
+        """
+        Queues an event for the next delivery. Safe from any thread; dropped
+        when nobody is subscribed.
+        """
+        if not self._subscribers:
+            return
+        with self._lock:
+            self._pending.append(event)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Delivers everything published inside the with block as one batch
+        when it ends.
+        """
+        self._held += 1
+        try:
+            yield self
+        finally:
+            self._held -= 1
+            self.deliver()
+
+    def deliver(self):
+        """
+        Hands the queued events, coalesced, to every subscriber (nothing
+        happens inside batch()).
+
+        Returns:
+            Number of events delivered
+        """
+        if self._held:
+            return 0
+        with self._lock:
+            events, self._pending = self._pending, []
+        events = coalesce(events)
+        if events:
+            for callback in list(self._subscribers):
+                callback(events)
+        return len(events)
+
+# =============================================================================
+# Change Feed — Events as JSON Lines for other processes
+# =============================================================================
+
+class ChangeFeed:
+    """
+    Bus subscriber appending LOCAL events to a JSON Lines file, one object
+    per event with "seq", "time" and "pid" added. Every workstation that
+    writes to the same feed adds its own changes, so a reader following the
+    file sees each change once. Each batch is one locked append, so readers
+    never see half of one.
+
+    Write errors are kept in self.error rather than raised into the save
+    that produced the events; the feed is best effort.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.error = None
+        self._lock = FileLock(path + ".lock")
+        self._seq = 0
+
+    def __call__(self, events):
+        now = datetime.datetime.now().isoformat(timespec="milliseconds")
+        lines = []
+        for event in events:
+            if event.origin != LOCAL:
+                continue  #the process that made it writes it
+            self._seq += 1
+            line = dict(event.to_json(), seq=self._seq, time=now, pid=os.getpid())
+            lines.append(json.dumps(line, separators=(",", ":")) + "\n")
+        if not lines:
+            return
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as file:
+                file.write("".join(lines))
+            self.error = None
+        except OSError as error:
+            self.error = error
+
+    def close(self):
+        self._lock.close()
+
+
+def _read_entries(path, position):
+    """
+    Returns [(event, offset just past its line)] for the complete lines
+    after position. A feed shorter than position (deleted and started
+    over) is read again from the start.
+    """
+    try:
+        with open(path, "rb") as file:
+            if position > os.fstat(file.fileno()).st_size:
+                position = 0
+            file.seek(position)
+            data = file.read()
+    except FileNotFoundError:
+        return []
+    entries = []
+    start = 0
+    while True:
+        end = data.find(b"\n", start) + 1
+        if not end:
+            break  #a line still being written is left for the next read
+        if data[start:end].strip():
+            entries.append((ChangeEvent.from_json(json.loads(data[start:end])), position + end))
+        start = end
+    return entries
+
+
+def read_feed(path, position=0):
+    """
+    Reads the events appended to a change feed since position.
+
+    Args:
+        path (str)     : Feed file
+        position (int) : Byte offset returned by the previous call (0 for all)
+    Returns:
+        (list of ChangeEvent, position to pass next time)
+    """
+    entries = _read_entries(path, position)
+    if entries:
+        return [event for event, _ in entries], entries[-1][1]
+    try:
+        return [], position if position <= os.path.getsize(path) else 0
+    except OSError:
+        return [], 0
+
+
+def follow(path, position=0, interval=FOLLOW_INTERVAL):
+    """
+    Yields (event, position just after it) for every event in the feed from
+    position on, waiting for new ones indefinitely. Saving the position of
+    the last event handled lets a reader resume where it stopped.
+    """
+    while True:
+        entries = _read_entries(path, position)
+        yield from entries
+        if entries:
+            position = entries[-1][1]
+        else:
+            time.sleep(interval)
+
+# =============================================================================
+# Command Line Entry Point
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the changes recorded in a change feed.")
+    parser.add_argument("feed", help="JSON Lines change feed (SHELTER_CHANGE_FEED)")
+    parser.add_argument("--position", type=int, default=0, help="byte offset to start from")
+    parser.add_argument("--follow", action="store_true", help="keep waiting for new changes")
+    args = parser.parse_args(argv)
+
+    if args.follow:
+        changes = follow(args.feed, args.position)
+    else:
+        changes = _read_entries(args.feed, args.position)
+    try:
+        for event, position in changes:
+            name = (event.after or event.before or {}).get("name", "")
+            print(f"{position:>10}  {event.kind:<7} {event.animal_id}  {name}", flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
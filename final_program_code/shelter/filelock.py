@@ -0,0 +1,124 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Advisory File Lock
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Cross-process lock used when several workstations (or a workstation
+        and the API server) open the same animals.json. The lock is taken on
+        a small side file (animals.json.lock) with flock() on POSIX and
+        msvcrt.locking() on Windows. It is advisory: it only keeps out
+        programs that take the same lock, which every storage engine here does.
+
+    Dependencies:
+        - fcntl / msvcrt     : Operating system file locks
+        - threading          : Re-entrant lock for threads of one process
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import os
+import threading
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# =============================================================================
+# Platform Helpers
+# =============================================================================
+
+def _lock_file(file, blocking):
+    """
+    Locks file; returns False if blocking is off and someone else holds it.
+    """
+    if os.name == "nt":
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                #LK_LOCK gives up after about ten seconds; keep waiting
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock_file(file):
+    if os.name == "nt":
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+# =============================================================================
+# File Lock
+# =============================================================================
+
+class FileLock:
+    """
+    Exclusive lock shared by every process that locks the same path.
+
+    Also serves as the in-process lock: it is re-entrant for the thread
+    holding it, and only the outermost acquire/release touch the file, so
+    methods that take it can call each other freely.
+
+    Args:
+        path (str) : Lock file to create (its contents are never used)
+    """
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """
+        Takes the lock. With blocking=False returns False at once instead of
+        waiting when another thread or process holds it.
+        """
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a+b")
+                locked = _lock_file(self._file, blocking)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            if not locked:
+                self._thread_lock.release()
+                return False
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            _unlock_file(self._file)
+        self._thread_lock.release()
+
+    def close(self):
+        """
+        Closes the lock file; the next acquire() reopens it.
+        """
+        with self._thread_lock:
+            if self._depth == 0 and self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
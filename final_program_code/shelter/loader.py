@@ -0,0 +1,144 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Streaming JSON Loader
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Reads a JSON array file (such as animals.json) one element at a time
+        instead of parsing the whole document up front. Records are handed
+        out as soon as they are decoded, so callers can start working before
+        the file is finished, and only one chunk of text is in memory at once.
+
+        A record that is malformed or cut off is skipped (and reported through
+        an optional callback) without losing the records around it.
+
+    Dependencies:
+        - json               : raw_decode for each array element
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import json
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\r\n"
+_SEPARATORS = _WHITESPACE + ","
+_decoder = json.JSONDecoder()
+
+# =============================================================================
+# Element Scanner — Finds where an array element ends without decoding it
+# =============================================================================
+
+def _element_end(text, pos):
+    """
+    Returns the index just past the array element starting at pos, or -1 if
+    the text ends before the element does. Strings and nesting are tracked so
+    commas or brackets inside them are not mistaken for the element's end.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(pos, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char == "]" and depth == 0:
+            return index  #closing bracket of the enclosing array
+        elif char in "}]":
+            if depth == 0:
+                return index + 1  #stray closing brace; skip past it
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        elif char == "," and depth == 0:
+            return index
+    return -1
+
+# =============================================================================
+# Streaming Reader — Yields array elements one at a time
+# =============================================================================
+
+def iter_json_records(path, on_error=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields each element of the JSON array stored at path.
+
+    Args:
+        path (str or file)  : File holding a JSON array, or that file already
+                              opened in text mode (it is closed when done)
+        on_error (callable) : Called as on_error(element_number, message) for
+                              every element that cannot be decoded
+        chunk_size (int)    : Characters read per file read
+    Raises:
+        FileNotFoundError if path does not exist.
+        ValueError if the file does not start with a JSON array.
+    """
+    file = open(path, "r", encoding="utf-8") if isinstance(path, str) else path
+    with file:
+        text = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            #drop consumed text and append the next chunk
+            nonlocal text, pos, eof
+            chunk = file.read(chunk_size)
+            text = text[pos:] + chunk
+            pos = 0
+            eof = not chunk
+
+        #find the opening bracket
+        while True:
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(text) or eof:
+                break
+            fill()
+        if pos >= len(text):
+            return  #empty file
+        if text[pos] != "[":
+            raise ValueError(f"{file.name} does not contain a JSON array")
+        pos += 1
+
+        number = 0
+        while True:
+            #skip separators between elements
+            while True:
+                while pos < len(text) and text[pos] in _SEPARATORS:
+                    pos += 1
+                if pos < len(text) or eof:
+                    break
+                fill()
+            if pos >= len(text) or text[pos] == "]":
+                return
+
+            try:
+                record, end = _decoder.raw_decode(text, pos)
+            except ValueError as error:
+                #either the element runs past the buffer or it is malformed
+                end = _element_end(text, pos)
+                if end == -1 and not eof:
+                    fill()
+                    continue
+                number += 1
+                if end == -1:
+                    if on_error:
+                        on_error(number, "record is incomplete at end of file")
+                    return
+                if on_error:
+                    on_error(number, str(error))
+                pos = end
+                continue
+            number += 1
+            yield record
+            pos = end
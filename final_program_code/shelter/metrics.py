@@ -0,0 +1,364 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Metrics and Profiling
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Lightweight instrumentation for "the portal is slow" reports. Code
+        marks the operations worth watching; nothing is recorded until
+        metrics are enabled (SHELTER_METRICS=1, or enable()), and while
+        disabled each hook is one flag check.
+
+        - timed / timer      : Decorator and context manager recording how
+                               long an operation took into a latency histogram
+        - timed_iter         : Same for work spread over the batches of an
+                               iterator (loading, searching), counting the
+                               items it produced
+        - count              : Counters (records scanned, matches, bytes written)
+        - snapshot, dump     : Every histogram as count / mean / p50 / p95 /
+                               p99 / max, appended to a JSON Lines file by
+                               dump() or periodically by MetricsDump
+        - start_profile, stop_profile : Optional cProfile capture
+
+        Histograms keep counts in logarithmic buckets (16 per doubling), so
+        memory stays constant and percentiles are within about 3%.
+
+    Dependencies:
+        - cProfile, pstats   : Standard library, imported when profiling starts
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import datetime
+import functools
+import io
+import json
+import math
+import os
+import threading
+import time
+
+SUB_BUCKETS = 16  #histogram buckets per doubling of the value
+PERCENTILES = (50, 95, 99)
+DUMP_INTERVAL = 60.0  #seconds between MetricsDump lines
+
+_enabled = os.environ.get("SHELTER_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+_histograms = {}  #name -> Histogram
+_counters = {}    #name -> int
+_profile = None   #cProfile.Profile while a capture runs
+
+# =============================================================================
+# Switches
+# =============================================================================
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """
+    Turns recording on or off. What was recorded so far is kept.
+    """
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    """
+    Forgets every histogram and counter.
+    """
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+# =============================================================================
+# Histogram — Logarithmic buckets
+# =============================================================================
+
+class Histogram:
+    """
+    Latency histogram in seconds with constant memory.
+
+    A value lands in bucket exponent * SUB_BUCKETS + sub-bucket, where the
+    exponent comes from math.frexp and the sub-bucket splits each doubling
+    evenly, so every bucket is about 4% wide.
+    """
+    __slots__ = ("buckets", "count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def add(self, value):
+        mantissa, exponent = math.frexp(value)  #value = mantissa * 2 ** exponent, mantissa in [0.5, 1)
+        bucket = exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS) if value > 0 else None
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def percentile(self, fraction):
+        """
+        Value below which fraction of the observations fall (bucket midpoint,
+        clamped to the smallest and largest value seen).
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = self.buckets.get(None, 0)  #observations of exactly zero
+        if seen >= rank:
+            return 0.0
+        for bucket in sorted(key for key in self.buckets if key is not None):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                exponent, sub = divmod(bucket, SUB_BUCKETS)
+                middle = math.ldexp(0.5 + (sub + 0.5) / (2 * SUB_BUCKETS), exponent)
+                return min(max(middle, self.minimum), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        """
+        Returns count, total and mean / percentiles / max in milliseconds.
+        """
+        result = {"count": self.count, "total_s": round(self.total, 6),
+                  "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0}
+        for percent in PERCENTILES:
+            result[f"p{percent}_ms"] = round(self.percentile(percent / 100) * 1000, 3)
+        result["max_ms"] = round(self.maximum * 1000, 3)
+        return result
+
+# =============================================================================
+# Recording — Hooks placed around operations
+# =============================================================================
+
+def observe(name, seconds):
+    """
+    Records one duration for name.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def count(name, amount=1):
+    """
+    Adds amount to counter name.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timer(name):
+    """
+    Context manager timing its block into histogram name:
+
+        with metrics.timer("storage.compact"):
+            ...
+    """
+    return _Timer(name) if _enabled else _NO_TIMER
+
+
+def timed(name):
+    """
+    Decorator timing every call of the function into histogram name.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def timed_iter(name, iterator, counter=None):
+    """
+    Wraps an iterator whose work happens as it is consumed (possibly over
+    many event-loop turns). Records the time spent producing items, not the
+    time the consumer spent in between, once the iterator is exhausted or
+    dropped. With counter, len() of each item is added to that counter.
+
+    Returns iterator itself while metrics are disabled.
+    """
+    if not _enabled:
+        return iterator
+    return _timed_iter(name, iter(iterator), counter)
+
+
+def _timed_iter(name, iterator, counter):
+    busy = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                busy += time.perf_counter() - start
+                return
+            busy += time.perf_counter() - start
+            if counter is not None:
+                count(counter, len(item))
+            yield item
+    finally:
+        observe(name, busy)
+
+# =============================================================================
+# Reporting — Snapshots and the JSON Lines file
+# =============================================================================
+
+def snapshot():
+    """
+    Returns the current metrics as a JSON-ready dictionary.
+    """
+    with _lock:
+        timings = {name: histogram.summary() for name, histogram in sorted(_histograms.items())}
+        counters = dict(sorted(_counters.items()))
+    return {"time": datetime.datetime.now().isoformat(timespec="seconds"), "pid": os.getpid(),
+            "enabled": _enabled, "timings": timings, "counters": counters}
+
+
+def format_snapshot(data):
+    """
+    Renders a snapshot as a plain-text table for the diagnostics window.
+    """
+    lines = [f"{'operation':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for name, summary in data["timings"].items():
+        lines.append(f"{name:<28}{summary['count']:>8,}{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}"
+                     f"{summary['p99_ms']:>10.2f}{summary['max_ms']:>10.2f}")
+    lines.append("")
+    lines.append(f"{'counter':<28}{'value':>18}")
+    for name, value in data["counters"].items():
+        lines.append(f"{name:<28}{value:>18,}")
+    return "\n".join(lines)
+
+
+def dump(path):
+    """
+    Appends one snapshot line to the JSON Lines file at path.
+    """
+    line = json.dumps(snapshot(), separators=(",", ":")) + "\n"
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(line)
+
+
+class MetricsDump:
+    """
+    Appends a snapshot to a JSON Lines file every interval seconds on a
+    daemon thread, and once more on stop().
+    """
+    def __init__(self, path, interval=DUMP_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self._write()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            dump(self.path)
+        except OSError:
+            pass  #metrics are best effort; never disturb the portal over them
+
+# =============================================================================
+# Profiling — Optional cProfile capture
+# =============================================================================
+
+def profiling():
+    return _profile is not None
+
+
+def start_profile():
+    """
+    Starts a cProfile capture of the calling thread (for the portal, the Tk
+    thread that runs every event handler).
+    """
+    global _profile
+    if _profile is not None:
+        return
+    import cProfile
+
+    _profile = cProfile.Profile()
+    _profile.enable()
+
+
+def stop_profile(path=None, limit=25):
+    """
+    Ends the capture started by start_profile().
+
+    Args:
+        path (str)  : Also save the raw stats here (for pstats / snakeviz)
+        limit (int) : Functions listed in the summary
+    Returns:
+        Text summary of the most expensive functions by cumulative time,
+        or "" if no capture was running
+    """
+    global _profile
+    profile, _profile = _profile, None
+    if profile is None:
+        return ""
+    import pstats
+
+    profile.disable()
+    if path:
+        profile.dump_stats(path)
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
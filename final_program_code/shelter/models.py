@@ -0,0 +1,380 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Data Models
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Animal class hierarchy shared by the GUI and the storage/repository
+        layers, plus helpers for rebuilding objects from stored records.
+
+    Dependencies:
+        - None (standard library only)
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import datetime
+import sys
+import uuid
+
+# =============================================================================
+# Field Helpers — IDs and compact storage of weight / DOB
+# =============================================================================
+
+def new_animal_id():
+    """
+    Returns a new random record ID (32 hex characters).
+    """
+    return uuid.uuid4().hex
+
+
+def parse_weight(value):
+    """
+    Parses a weight entry into a float. Blank entries become None; text that
+    is not a number is kept as-is so no user input is ever lost.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def format_weight(value):
+    """
+    Formats a stored weight the way it is saved and displayed ("9", "9.5").
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return value
+
+
+def parse_dob(value):
+    """
+    Parses a YYYY-MM-DD date into a proleptic Gregorian ordinal. Blank entries
+    become None; unparseable legacy text is kept as-is.
+    """
+    if isinstance(value, int):
+        return value
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value).toordinal()
+    except ValueError:
+        pass
+    try:
+        #strptime also accepts the unpadded dates the entry forms let through
+        return datetime.datetime.strptime(value, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return value
+
+
+def format_dob(value):
+    """
+    Formats a stored DOB as YYYY-MM-DD.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, int):
+        return datetime.date.fromordinal(value).isoformat()
+    return value
+
+# =============================================================================
+# Data Models — Object-oriented structure for pets
+# =============================================================================
+
+
+class Animal:
+    """
+    Base class representing general animal information.
+
+    Instances use __slots__ (no per-instance __dict__). Type, gender and breed
+    are interned so repeated values share one string, weight is held as a
+    float (or as typed, if the float would not give the text back) and DOB as
+    a date ordinal; the weight and dob properties still read and write the
+    familiar text form.
+
+    Attributes:
+        animal_type (str)       : Generic type indicator; overridden in subclasses
+        name (str)              : Animal’s name
+        gender (str)            : Gender (e.g., Male, Female)
+        breed (str)             : Breed category
+        weight (str)            : Weight of animal in pounds (weight_lb is the float)
+        dob (str)               : Date of birth (YYYY-MM-DD; dob_ordinal is the number)
+        microchip_number (str)  : Unique identifier for tracking
+        health_notes (str)      : Medical or behavioral remarks
+        description (str)       : Additional descriptors (e.g., temperament)
+        image_path (str)        : Profile photo (optional): an asset store reference
+                                  ("sha256:<hash>.jpg", see assets.py) or, in
+                                  records not migrated yet, a file path
+        intake (str)            : Date the shelter took the animal in (YYYY-MM-DD;
+                                  intake_ordinal is the number)
+        animal_id (str)         : Stable unique record ID, generated when not given
+        revision (int)          : How many times the stored record has been updated
+    """
+    __slots__ = ("animal_id", "_animal_type", "name", "_gender", "_breed", "_weight", "_dob",
+                 "microchip_number", "health_notes", "description", "image_path", "revision", "_intake")
+
+    def __init__(self, name, gender, breed, weight, dob, microchip_number, health_notes, description, image_path=None, animal_id=None, revision=0, intake=""):
+        self.animal_id = animal_id or new_animal_id()
+        self.revision = revision
+        self.animal_type = "animal"
+        self.name = name
+        self.gender = gender
+        self.breed = breed
+        self.weight = weight
+        self.dob = dob
+        self.microchip_number = microchip_number
+        self.health_notes = health_notes
+        self.description = description
+        self.image_path = image_path or ""
+        self.intake = intake
+
+    #categorical fields are interned so thousands of "dog"/"F"/"Beagle" share one object
+    @property
+    def animal_type(self):
+        return self._animal_type
+
+    @animal_type.setter
+    def animal_type(self, value):
+        self._animal_type = sys.intern(value)
+
+    @property
+    def gender(self):
+        return self._gender
+
+    @gender.setter
+    def gender(self, value):
+        self._gender = sys.intern(value)
+
+    @property
+    def breed(self):
+        return self._breed
+
+    @breed.setter
+    def breed(self, value):
+        self._breed = sys.intern(value)
+
+    @property
+    def weight(self):
+        return format_weight(self._weight)
+
+    @weight.setter
+    def weight(self, value):
+        weight = parse_weight(value)
+        if isinstance(value, str) and isinstance(weight, float) and format_weight(weight) != value.strip():
+            weight = value.strip()  #"9.50", "09": kept as typed, since the float would not give them back
+        self._weight = weight
+
+    @property
+    def weight_lb(self):
+        """
+        Weight as a float, or None when blank or not a number.
+        """
+        weight = parse_weight(self._weight)
+        return weight if isinstance(weight, float) else None
+
+    @property
+    def dob(self):
+        return format_dob(self._dob)
+
+    @dob.setter
+    def dob(self, value):
+        self._dob = parse_dob(value)
+
+    @property
+    def dob_ordinal(self):
+        """
+        Date of birth as a date ordinal, or None when blank or not a date.
+        """
+        return self._dob if isinstance(self._dob, int) else None
+
+    @property
+    def intake(self):
+        return format_dob(self._intake)
+
+    @intake.setter
+    def intake(self, value):
+        self._intake = parse_dob(value)
+
+    @property
+    def intake_ordinal(self):
+        """
+        Intake date as a date ordinal, or None when blank or not a date.
+        """
+        return self._intake if isinstance(self._intake, int) else None
+
+    def to_dict(self):
+        """
+        Converts the instance into a dictionary for serialization.
+        """
+        return {
+            "id": self.animal_id,
+            "type": self.animal_type,
+            "name": self.name,
+            "gender": self.gender,
+            "breed": self.breed,
+            "weight": self.weight,
+            "dob": self.dob,
+            "microchip": self.microchip_number,
+            "health_notes": self.health_notes,
+            "description": self.description,
+            "image_path": self.image_path,
+            "intake": self.intake,
+            "rev": self.revision,
+        }
+
+
+#keys of Animal.to_dict(), in order; the CSV export and SQLite columns follow them
+RECORD_FIELDS = ("id", "type", "name", "gender", "breed", "weight", "dob",
+                 "microchip", "health_notes", "description", "image_path", "intake", "rev")
+
+# =============================================================================
+# Specific Pet Types — Inherit from Animal and override type
+# =============================================================================
+
+class Cat(Animal):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.animal_type = "cat"
+
+class Dog(Animal):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.animal_type = "dog"
+
+class Exotic(Animal):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.animal_type = "exotic"
+
+# =============================================================================
+# Record Conversion — Resolve classes and rebuild objects from dictionaries
+# =============================================================================
+
+ANIMAL_CLASSES = {"cat": Cat, "dog": Dog, "exotic": Exotic}
+
+
+def animal_class(type_):
+    """
+    Returns the class for a type name, falling back to the generic Animal.
+    """
+    return ANIMAL_CLASSES.get(type_, Animal)
+
+
+def resolved_type(type_):
+    """
+    Returns the animal_type an object built for type_ ends up with.
+    """
+    return type_ if type_ in ANIMAL_CLASSES else "animal"
+
+
+def animal_from_dict(entry):
+    """
+    Rebuilds an Animal (or subclass) instance from a to_dict() record.
+    Records saved before IDs existed get a freshly generated ID.
+    """
+    cls = animal_class(entry.get("type", "animal"))
+    return cls(entry["name"], entry.get("gender", ""), entry["breed"],
+               entry["weight"], entry["dob"], entry["microchip"],
+               entry["health_notes"], entry["description"], entry.get("image_path", ""),
+               entry.get("id"), int(entry.get("rev") or 0), entry.get("intake", ""))
+
+# =============================================================================
+# Lazy Records — Defer building Animal objects until they are needed
+# =============================================================================
+
+class LazyAnimal:
+    """
+    Read-only stand-in for an Animal, wrapping the record it was loaded from.
+
+    Exposes the fields used for listing and searching straight from the
+    record; hydrate() builds the full Animal when one is actually needed
+    (viewing, editing). Any other attribute access hydrates transparently.
+    """
+    __slots__ = ("record",)
+
+    def __init__(self, record):
+        self.record = record
+
+    @property
+    def animal_id(self):
+        return self.record.get("id", "")
+
+    @property
+    def animal_type(self):
+        return resolved_type(self.record.get("type", "animal"))
+
+    @property
+    def name(self):
+        return self.record["name"]
+
+    @property
+    def gender(self):
+        return self.record.get("gender", "")
+
+    @property
+    def breed(self):
+        return self.record["breed"]
+
+    @property
+    def microchip_number(self):
+        return self.record["microchip"]
+
+    @property
+    def revision(self):
+        return int(self.record.get("rev") or 0)
+
+    @property
+    def health_notes(self):
+        return self.record.get("health_notes", "")
+
+    @property
+    def description(self):
+        return self.record.get("description", "")
+
+    @property
+    def image_path(self):
+        return self.record.get("image_path", "")
+
+    @property
+    def weight_lb(self):
+        weight = parse_weight(self.record.get("weight", ""))
+        return weight if isinstance(weight, float) else None
+
+    @property
+    def dob_ordinal(self):
+        dob = parse_dob(self.record.get("dob", ""))
+        return dob if isinstance(dob, int) else None
+
+    @property
+    def intake_ordinal(self):
+        intake = parse_dob(self.record.get("intake", ""))
+        return intake if isinstance(intake, int) else None
+
+    def hydrate(self):
+        """
+        Builds the full Animal (or subclass) object for this record.
+        """
+        return animal_from_dict(self.record)
+
+    def to_dict(self):
+        return self.hydrate().to_dict()
+
+    def __getattr__(self, attribute):
+        return getattr(self.hydrate(), attribute)
@@ -0,0 +1,244 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Fuzzy and Ranked Search
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Scoring pieces behind AnimalSearchIndex.ranked_search(), for staff
+        who type "rotweiler" or "domestic shorthair" and still expect the
+        Rottweiler Mix and the Domestic Short Hair.
+
+        - similar_values     : Distinct field values close to a query. Uses
+                               the trigram map the search index already
+                               keeps; a value that contains the query scores
+                               highest, others score by trigram overlap or,
+                               for near misses, a bounded edit distance
+        - bounded_levenshtein: Edit distance that gives up early once the
+                               limit cannot be met
+        - TextIndex          : BM25 over health notes and descriptions, with
+                               query words expanded to similar indexed words
+        - top_k, top_k_by_value : Best results kept in a heap, so only the
+                               returned rows are ever ordered
+
+    Dependencies:
+        - heapq, math, re    : Standard library
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import heapq
+import math
+import re
+
+MIN_SIMILARITY = 0.4  #lowest trigram / edit-distance similarity that still matches
+FUZZY_WEIGHT = 0.7  #fuzzy matches always rank below values that contain the query
+BM25_K1 = 1.2
+BM25_B = 0.75
+STOPWORDS = frozenset(("a", "an", "and", "at", "for", "in", "is", "of", "on", "or", "the", "to", "with"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# =============================================================================
+# String Similarity
+# =============================================================================
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def bounded_levenshtein(a, b, limit):
+    """
+    Edit distance between a and b, or limit + 1 as soon as it is clear the
+    distance exceeds limit (a whole row of the table is above the limit).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j - 1] + (char != other), previous[j] + 1, current[j - 1] + 1))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def edit_limit(text):
+    """
+    Typos tolerated in text: one per four characters, at least one.
+    """
+    return max(1, len(text) // 4)
+
+
+def similar_values(text, grams, values):
+    """
+    Scores the distinct values close to text.
+
+    Args:
+        text (str)      : Case-folded query
+        grams (dict)    : trigram -> set of values holding it
+        values          : Every distinct value (scanned for short queries only)
+    Returns:
+        Dict of value -> score. 1.0 is an exact match, values containing text
+        score 0.7-1.0 (closer in length is better) and fuzzy matches score
+        below 0.7 by trigram overlap or edit distance.
+    """
+    scores = {}
+    limit = edit_limit(text)
+    query_grams = _trigrams(text)
+    shared = {}
+    for gram in query_grams:
+        for value in grams.get(gram, ()):
+            shared[value] = shared.get(value, 0) + 1
+    #too few trigrams to find typos by; check edit distance against everything
+    candidates = values if len(query_grams) <= 2 else shared
+    for value in candidates:
+        if text in value:
+            scores[value] = FUZZY_WEIGHT + (1 - FUZZY_WEIGHT) * len(text) / len(value)
+            continue
+        common = shared.get(value, 0)
+        similarity = 0.0
+        if common:
+            value_grams = max(1, len(value) - 2)
+            #how much of the query the value holds, and how alike the two are overall
+            similarity = (common / len(query_grams) + common / (len(query_grams) + value_grams - common)) / 2
+        if similarity < MIN_SIMILARITY:
+            distance = bounded_levenshtein(text, value, limit)
+            if distance <= limit:
+                similarity = max(similarity, 1 - distance / max(len(text), len(value)))
+        if similarity >= MIN_SIMILARITY:
+            scores[value] = FUZZY_WEIGHT * similarity
+    return scores
+
+# =============================================================================
+# Full-Text Index — BM25 over health notes and descriptions
+# =============================================================================
+
+def tokenize(text):
+    """
+    Splits text into lower-case words, dropping stopwords.
+    """
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+class TextIndex:
+    """
+    Inverted index of words to the slots whose text holds them, scored with
+    BM25. Maintained incrementally like the search index it belongs to.
+    """
+    def __init__(self):
+        self.postings = {}   #word -> {slot: occurrences}
+        self._grams = {}     #trigram -> set of words
+        self._words = {}     #slot -> distinct words, for removal
+        self._lengths = {}   #slot -> number of words
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, slot, text):
+        words = tokenize(text)
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        for word, count in counts.items():
+            holders = self.postings.get(word)
+            if holders is None:
+                holders = self.postings[word] = {}
+                for gram in _trigrams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+            holders[slot] = count
+        self._words[slot] = tuple(counts)
+        self._lengths[slot] = len(words)
+        self._total_length += len(words)
+
+    def remove(self, slot):
+        for word in self._words.pop(slot):
+            holders = self.postings[word]
+            del holders[slot]
+            if not holders:
+                del self.postings[word]
+                for gram in _trigrams(word):
+                    words = self._grams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._grams[gram]
+        self._total_length -= self._lengths.pop(slot)
+
+    def scores(self, text):
+        """
+        BM25 score of every slot matching at least one word of text. Each
+        query word counts once per slot, through its best-matching indexed
+        word, weighted by how similar that word is.
+
+        Returns:
+            Dict of slot -> score
+        """
+        total = {}
+        if not self._lengths:
+            return total
+        count = len(self._lengths)
+        lengths = self._lengths
+        #BM25 length normalization, k1 * (1 - b + b * length / average), as base + scale * length
+        base = BM25_K1 * (1 - BM25_B)
+        scale = BM25_K1 * BM25_B * count / max(1, self._total_length)
+        for word in set(tokenize(text)):
+            best = {}
+            for match, weight in similar_values(word, self._grams, self.postings).items():
+                holders = self.postings[match]
+                weight *= math.log(1 + (count - len(holders) + 0.5) / (len(holders) + 0.5)) * (BM25_K1 + 1)
+                scores = {slot: weight * occurrences / (occurrences + base + scale * lengths[slot])
+                          for slot, occurrences in holders.items()}
+                if not best:
+                    best = scores
+                    continue
+                for slot, score in scores.items():
+                    if score > best.get(slot, 0.0):
+                        best[slot] = score
+            if not total:
+                total = best
+                continue
+            for slot, score in best.items():
+                total[slot] = total.get(slot, 0.0) + score
+        return total
+
+# =============================================================================
+# Top-k Selection
+# =============================================================================
+
+def top_k(slots, score, limit):
+    """
+    Returns the limit best slots by score(slot), best first; equal scores
+    keep insertion (slot) order. A heap of limit entries is kept, so the
+    cost is O(n log limit) rather than sorting every match.
+    """
+    return [-negated for _, negated in heapq.nlargest(limit, ((score(slot), -slot) for slot in slots))]
+
+
+def top_k_by_value(slots_of, scores, limit, allowed=None):
+    """
+    Same as top_k when every slot scores what its value in one field scores.
+    Walks the values from best to worst, so only the values needed to fill
+    limit are ever expanded into slots.
+
+    Args:
+        slots_of (dict) : value -> set of slots holding it
+        scores (dict)   : value -> score, for the values that match
+        limit (int)     : Most slots to return
+        allowed (set)   : Only these slots may be returned (None: any)
+    """
+    levels = {}
+    for value, score in scores.items():
+        levels.setdefault(score, []).append(value)
+    best = []
+    for score in sorted(levels, reverse=True):
+        if len(best) >= limit:
+            break
+        group = set().union(*(slots_of[value] for value in levels[score]))
+        if allowed is not None:
+            group &= allowed
+        best.extend(heapq.nsmallest(limit - len(best), group))
+    return best
@@ -0,0 +1,518 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Animal Repositories
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Query and mutation layer the GUI talks to instead of walking a list
+        of animals itself. A repository answers searches with the same
+        filter semantics as the original search form and persists changes
+        through its backend.
+
+        - AnimalRepository         : Interface shared by every backend
+        - search_predicate, narrows, iter_refined : Re-filtering an earlier
+                                     result list when a search only narrows
+        - ConflictError, resolve_update, check_delete : Optimistic concurrency;
+                                     edits carry the revision they started
+                                     from and are merged field by field when
+                                     another workstation saved in between
+        - InMemoryAnimalRepository : Animals held in memory behind a search
+                                     index, persisted through a storage
+                                     engine from storage.py
+        - SQLiteAnimalRepository   : Indexed on-disk queries (sqlite_repository.py)
+
+    Dependencies:
+        - models             : Animal classes and record conversion
+        - animal_table       : Columnar AnimalTable for bulk analytics
+        - search_index       : Incremental in-memory search index
+        - storage            : Streaming record access (iter_records)
+        - events             : Change events reported to watch_changes()
+===============================================================================
+"""
+# =============================================================================
+# Imports — Local modules
+# =============================================================================
+
+from .animal_table import AnimalTable
+from .binary_snapshot import MappedRecord
+from .events import LOCAL, RELOAD, REMOTE, ChangeEvent
+from .models import LazyAnimal, animal_from_dict, new_animal_id
+from .search_index import AnimalSearchIndex
+
+# =============================================================================
+# Filter Helpers — Shared filter semantics and incremental refinement
+# =============================================================================
+
+def normalize_filters(name="", gender="", animal_type="", breed="", microchip=""):
+    """
+    Case-folds filter values the way every search compares them.
+    """
+    return {"name": name.lower(), "gender": gender.upper(), "animal_type": animal_type.lower(),
+            "breed": breed.lower(), "microchip": microchip}
+
+
+def search_predicate(name="", gender="", animal_type="", breed="", microchip=""):
+    """
+    Returns a function testing one animal against the search form's filters.
+    """
+    name, gender, animal_type, breed = name.lower(), gender.upper(), animal_type.lower(), breed.lower()
+
+    def matches(animal):
+        return (name in animal.name.lower() and
+                (gender == "" or gender == animal.gender) and
+                animal_type in animal.animal_type.lower() and
+                breed in animal.breed.lower() and
+                microchip in animal.microchip_number)
+    return matches
+
+
+def narrows(old, new):
+    """
+    True when every animal matching the normalized filters new also matches
+    old, i.e. new can be answered by re-filtering old's results. Holds when
+    each substring filter still contains its old text (typing more letters)
+    and the gender filter is unchanged or newly set.
+    """
+    if old is None:
+        return False
+    for field in ("name", "animal_type", "breed", "microchip"):
+        if old[field] not in new[field]:
+            return False
+    return old["gender"] in ("", new["gender"])
+
+
+def iter_refined(candidates, filters, batch_size=500):
+    """
+    Re-filters an earlier result list, yielding the survivors in batches
+    (possibly empty) so the caller can spread the work over several turns.
+    """
+    matches = search_predicate(**filters)
+    for start in range(0, len(candidates), batch_size):
+        yield [animal for animal in candidates[start:start + batch_size] if matches(animal)]
+
+def record_of(animal):
+    """
+    Returns an animal's to_dict() record; a LazyAnimal's record is copied
+    as loaded instead of building the full Animal.
+    """
+    return dict(animal.record) if isinstance(animal, LazyAnimal) else animal.to_dict()
+
+# =============================================================================
+# Conflict Handling — Merge edits made from an older revision
+# =============================================================================
+
+class ConflictError(Exception):
+    """
+    Raised when a change collides with one saved elsewhere after the change
+    was started: both sides changed the same fields to different values, or
+    the animal was deleted.
+
+    Attributes:
+        animal_id (str) : Animal the change was for
+        fields (list)   : Record keys changed on both sides
+        current (dict)  : The stored record, or None if it was deleted
+    """
+    def __init__(self, animal_id, fields, current):
+        if current is None:
+            message = f"animal {animal_id} was deleted elsewhere"
+        else:
+            message = f"animal {animal_id} was changed elsewhere ({', '.join(fields)})"
+        super().__init__(message)
+        self.animal_id = animal_id
+        self.fields = fields
+        self.current = current
+
+
+def merge_changes(base, current, mine):
+    """
+    Three-way merge of one record. Fields this edit changed (mine differs
+    from base) take its value, every other field keeps current's.
+
+    Returns:
+        (merged record, list of fields current also changed to something else)
+    """
+    merged = dict(current)
+    conflicts = []
+    for field, value in mine.items():
+        if field in ("id", "rev") or value == base.get(field):
+            continue
+        if current.get(field) not in (base.get(field), value):
+            conflicts.append(field)
+        merged[field] = value
+    return merged, conflicts
+
+
+def resolve_update(current, mine, base=None, force=False):
+    """
+    Works out the record to store when mine is saved over current.
+
+    Args:
+        current (dict) : Stored record, as to_dict() writes it
+        mine (dict)    : Edited record
+        base (dict)    : Record the edit started from; None saves mine as is
+        force (bool)   : Keep mine's values for fields changed on both sides
+    Returns:
+        The record to store, with the next revision number
+    Raises:
+        ConflictError if both sides changed a field and force is not set
+    """
+    revision = int(current.get("rev") or 0)
+    if base is not None and revision != int(base.get("rev") or 0):
+        mine, conflicts = merge_changes(base, current, mine)
+        if conflicts and not force:
+            raise ConflictError(current.get("id", ""), conflicts, current)
+    return dict(mine, rev=revision + 1)
+
+
+def check_delete(current, base=None):
+    """
+    Raises ConflictError if current was updated after base was read.
+    """
+    if base is not None and int(current.get("rev") or 0) != int(base.get("rev") or 0):
+        changed = [field for field, value in current.items() if field != "rev" and base.get(field) != value]
+        raise ConflictError(current.get("id", ""), changed, current)
+
+# =============================================================================
+# Repository Interface — Shared by every backend
+# =============================================================================
+
+class AnimalRepository:
+    """
+    Base class for animal queries and persistence.
+
+    Search filters follow the search form: name, type and breed are
+    case-insensitive substring matches, microchip is a case-sensitive
+    substring match and gender is an exact M/F match; empty filters match
+    everything.
+    """
+    skipped_records = ()  #(element number, message) for records that could not be read
+    _ranked_index = None  #ranked_search() snapshot, for backends that query on disk
+    _on_change = None  #callback(ChangeEvent), see watch_changes()
+
+    def load(self):
+        """
+        Prepares the repository for queries.
+
+        Returns:
+            Number of animals available
+        """
+        raise NotImplementedError
+
+    def iter_load(self, batch_size=5000):
+        """
+        Loads in batches, yielding the running animal count after each batch
+        so a caller can keep a UI responsive. Defaults to a single load().
+        """
+        yield self.load()
+
+    def count(self):
+        raise NotImplementedError
+
+    def search(self, name="", gender="", animal_type="", breed="", microchip=""):
+        """
+        Returns the animals matching every filter, in insertion order.
+        """
+        raise NotImplementedError
+
+    def iter_search(self, name="", gender="", animal_type="", breed="", microchip="", batch_size=500):
+        """
+        Yields search() results in batches so a caller can display them
+        progressively. Backends that can produce rows lazily override this.
+        """
+        matches = self.search(name, gender, animal_type, breed, microchip)
+        for start in range(0, len(matches), batch_size):
+            yield matches[start:start + batch_size]
+
+    def ranked_search(self, name="", gender="", animal_type="", breed="", microchip="", text="", limit=100):
+        """
+        Fuzzy search in relevance order (see AnimalSearchIndex.ranked_search):
+        name, type and breed tolerate typos and spacing, text is matched
+        against health notes and descriptions.
+
+        Backends without an in-memory index rank over a copy of every animal,
+        built on first use and dropped whenever the data changes.
+
+        Returns:
+            Up to limit animals, best match first
+        """
+        if self._ranked_index is None:
+            self._ranked_index = AnimalSearchIndex(self.search())
+        return self._ranked_index.ranked_search(name, gender, animal_type, breed, microchip, text, limit)
+
+    def get(self, animal_id):
+        """
+        Returns the animal with this stable ID, or None.
+        """
+        raise NotImplementedError
+
+    def load_table(self):
+        """
+        Returns every animal as a columnar AnimalTable for bulk analytics.
+        """
+        raise NotImplementedError
+
+    def find_by_microchip(self, microchip):
+        """
+        Returns the first animal with exactly this microchip number, or None.
+        """
+        raise NotImplementedError
+
+    def add(self, animal):
+        raise NotImplementedError
+
+    def add_many(self, animals):
+        """
+        Adds several animals in one atomic write (all are saved or none are).
+
+        Returns:
+            Number of animals added
+        """
+        raise NotImplementedError
+
+    def update(self, animal, base=None, force=False):
+        """
+        Persists changes made to animal, matched by its animal_id.
+
+        Args:
+            animal (Animal) : The edited animal
+            base (dict)     : to_dict() of the animal the edit started from.
+                              If the stored record has moved on since, the
+                              edit is merged into it (see resolve_update)
+            force (bool)    : On a conflict keep this edit's values
+        Returns:
+            The saved Animal, with its new revision
+        Raises:
+            ConflictError if the edit collides with a change saved elsewhere
+            or the animal no longer exists
+        """
+        raise NotImplementedError
+
+    def delete(self, animal_id, base=None):
+        """
+        Deletes an animal; deleting one that is already gone does nothing.
+
+        Raises:
+            ConflictError if base is given and the animal was updated since
+        """
+        raise NotImplementedError
+
+    def refresh(self):
+        """
+        Picks up changes other processes saved since the last load, write or
+        refresh.
+
+        Returns:
+            List of changed animal IDs, or None if everything may have
+            changed (the data was reloaded)
+        """
+        return []
+
+    def watch_changes(self, callback):
+        """
+        Has callback(ChangeEvent) called for every insert, update and delete
+        right after the repository applied it, on the thread that made it:
+        this process's own changes (LOCAL) and those picked up from other
+        processes (REMOTE), or a RELOAD when everything was read again.
+        """
+        self._on_change = callback
+
+    def _changed(self, animal_id, before, after, origin=LOCAL):
+        """
+        Reports a change to the watch_changes() callback, if any.
+        """
+        if self._on_change is not None:
+            event = ChangeEvent.between(animal_id, before, after, origin)
+            if event is not None:
+                self._on_change(event)
+
+    def _reloaded(self):
+        if self._on_change is not None:
+            self._on_change(ChangeEvent(RELOAD, origin=REMOTE))
+
+    def watch_writes(self, callback):
+        """
+        Has callback(saved, rejected_ids, error) called on a background
+        thread each time queued changes are written (write-behind storage).
+        Backends that write before returning never call it.
+        """
+
+    def pending_writes(self):
+        """
+        Returns how many changes are queued but not yet written.
+        """
+        return 0
+
+    def flush(self):
+        """
+        Writes queued changes now. Raises OSError if they cannot be written.
+        """
+
+    def close(self):
+        """
+        Releases files and connections.
+        """
+
+# =============================================================================
+# In-Memory Backend — Animals held in a list, persisted via a storage engine
+# =============================================================================
+
+class InMemoryAnimalRepository(AnimalRepository):
+    """
+    Keeps every animal in memory and writes changes through storage
+    (a JournaledStorage or JsonFileStorage instance). Searches go through
+    an AnimalSearchIndex built at load and updated on every change.
+
+    Changes run inside a storage transaction: other processes' changes are
+    applied to the index first, so conflicts are checked against the
+    latest stored revision.
+    """
+    def __init__(self, storage):
+        self.storage = storage
+        self.index = AnimalSearchIndex()
+
+    def load(self):
+        count = 0
+        for count in self.iter_load():
+            pass
+        return count
+
+    def iter_load(self, batch_size=5000):
+        """
+        Streams records from storage into the index as LazyAnimal records;
+        full Animal objects are only built when get() asks for one.
+
+        Records saved before stable IDs existed are given one, and the data
+        is rewritten once so the IDs persist (unless some records could not
+        be read, in which case the file is left for a person to repair).
+        """
+        self.index = AnimalSearchIndex()
+        self.skipped_records = []
+        needs_ids = False
+        pending = 0
+        for record in self.storage.iter_records(on_error=lambda number, message:
+                                                self.skipped_records.append((number, message))):
+            if "id" not in record:
+                record = dict(record)  #a MappedRecord is read-only
+                record["id"] = new_animal_id()
+                needs_ids = True
+            self.index.add(record.lazy_animal() if type(record) is MappedRecord else LazyAnimal(record))
+            pending += 1
+            if pending == batch_size:
+                pending = 0
+                yield len(self.index)
+        if needs_ids and not self.skipped_records:
+            self.storage.write_all([animal.to_dict() for animal in self.index.animals()])
+        yield len(self.index)
+
+    @property
+    def animals(self):
+        return self.index.animals()
+
+    def count(self):
+        return len(self.index)
+
+    def search(self, name="", gender="", animal_type="", breed="", microchip=""):
+        return self.index.search(name, gender, animal_type, breed, microchip)
+
+    def ranked_search(self, name="", gender="", animal_type="", breed="", microchip="", text="", limit=100):
+        return self.index.ranked_search(name, gender, animal_type, breed, microchip, text, limit)
+
+    def get(self, animal_id):
+        return self.index.get(animal_id)
+
+    def load_table(self):
+        #lazy records are already in to_dict() form; only edited animals need converting
+        return AnimalTable.from_records(animal.record if isinstance(animal, LazyAnimal) else animal.to_dict()
+                                        for animal in self.index.animals())
+
+    def find_by_microchip(self, microchip):
+        return self.index.find_by_microchip(microchip)
+
+    def add(self, animal):
+        with self.storage.transaction() as changes:
+            self._apply(changes)
+            record = animal.to_dict()
+            self.storage.insert(animal.animal_id, record)
+            self.index.add(animal)  #only once it is stored, so a failed write leaves the index as on disk
+        self._changed(animal.animal_id, None, record)
+
+    def add_many(self, animals):
+        animals = list(animals)
+        with self.storage.transaction() as changes:
+            self._apply(changes)
+            items = [(animal.animal_id, animal.to_dict()) for animal in animals]
+            self.storage.insert_many(items)
+            for animal in animals:
+                self.index.add(animal)
+        for animal_id, record in items:
+            self._changed(animal_id, None, record)
+        return len(animals)
+
+    def update(self, animal, base=None, force=False):
+        with self.storage.transaction() as changes:
+            self._apply(changes)
+            current = self.index.get(animal.animal_id)
+            if current is None:
+                raise ConflictError(animal.animal_id, [], None)
+            before = current.to_dict()
+            record = resolve_update(before, animal.to_dict(), base, force)
+            saved = animal_from_dict(record)
+            self.storage.update(saved.animal_id, record)
+            self.index.update(saved)
+        self._changed(saved.animal_id, before, record)
+        return saved
+
+    def delete(self, animal_id, base=None):
+        with self.storage.transaction() as changes:
+            self._apply(changes)
+            current = self.index.get(animal_id)
+            if current is None:
+                return
+            before = current.to_dict()
+            check_delete(before, base)
+            self.storage.delete(animal_id)
+            self.index.remove(animal_id)
+        self._changed(animal_id, before, None)
+
+    def refresh(self):
+        return self._apply(self.storage.poll())
+
+    def watch_writes(self, callback):
+        self.storage.on_flush = callback
+
+    def pending_writes(self):
+        return self.storage.pending()
+
+    def flush(self):
+        self.storage.flush()
+
+    def _apply(self, changes):
+        """
+        Brings the index up to date with journal entries saved elsewhere.
+
+        Returns:
+            List of changed animal IDs, or None after a full reload
+        """
+        if changes is None:
+            self.load()
+            self._reloaded()
+            return None
+        changed = []
+        for entry in changes:
+            key = entry["key"]
+            current = self.index.get(key)
+            after = entry["record"] if entry.get("op") != "delete" else None
+            if after is None:
+                if current is not None:
+                    self.index.remove(key)
+            elif current is not None:
+                self.index.update(LazyAnimal(after))
+            else:
+                self.index.add(LazyAnimal(after))
+            changed.append(key)
+            if self._on_change is not None:
+                self._changed(key, None if current is None else record_of(current), after, REMOTE)
+        return changed
+
+    def close(self):
+        self.storage.close()
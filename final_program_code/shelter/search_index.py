@@ -0,0 +1,319 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — In-Memory Search Index
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Index over the search form's fields so a search only touches the
+        animals that can possibly match instead of re-lowercasing and
+        substring-testing every record on every search.
+
+        - Each animal occupies a slot number; slots keep insertion order
+        - Every text field maps its distinct values to the slots holding them
+          (a hash map, so exact microchip lookup is O(1))
+        - A trigram index over the distinct values narrows substring filters
+          of three or more characters to a few candidate values, which are
+          then confirmed with the same "in" test the search form has always
+          used, so results are identical to a linear scan
+        - Gender is a posting set per value
+        - ranked_search() matches name, type and breed fuzzily through the
+          same trigram maps and ranks health notes and descriptions with
+          BM25 (ranked_search.py); the notes index is built on the first
+          query that needs it
+
+    Dependencies:
+        - models             : LazyAnimal records are hydrated on get()
+        - ranked_search      : Similarity scoring, BM25 and top-k selection
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import heapq
+
+from .models import LazyAnimal
+from .ranked_search import TextIndex, similar_values, top_k, top_k_by_value
+
+# =============================================================================
+# Field Index — Distinct values, their slots and a trigram map
+# =============================================================================
+
+def trigrams(text):
+    """
+    Returns the set of three-character substrings of text.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _SubstringField:
+    """
+    Answers "filter in value" for one field across every indexed animal.
+    Values are stored already case-folded when the field is case-insensitive.
+    """
+    def __init__(self):
+        self.values = {}   #value -> set of slots
+        self._grams = {}   #trigram -> set of distinct values
+
+    def add(self, slot, value):
+        slots = self.values.get(value)
+        if slots is None:
+            slots = self.values[value] = set()
+            for gram in trigrams(value):
+                self._grams.setdefault(gram, set()).add(value)
+        slots.add(slot)
+
+    def remove(self, slot, value):
+        slots = self.values.get(value)
+        if slots is None:
+            return
+        slots.discard(slot)
+        if not slots:
+            del self.values[value]
+            for gram in trigrams(value):
+                holders = self._grams[gram]
+                holders.discard(value)
+                if not holders:
+                    del self._grams[gram]
+
+    def matching_values(self, text):
+        """
+        Returns the distinct values that contain text.
+        """
+        if len(text) < 3:
+            return [value for value in self.values if text in value]
+        candidates = None
+        for gram in sorted(trigrams(text), key=lambda g: len(self._grams.get(g, ()))):
+            holders = self._grams.get(gram)
+            if not holders:
+                return []
+            candidates = set(holders) if candidates is None else candidates & holders
+            if not candidates:
+                return []
+        return [value for value in candidates if text in value]
+
+    def similar_values(self, text):
+        """
+        Returns {value: score} for the distinct values close to text
+        (see ranked_search.similar_values).
+        """
+        return similar_values(text, self._grams, self.values)
+
+    def slots_containing(self, text):
+        """
+        Returns the set of slots whose value contains text.
+        """
+        matched = set()
+        for value in self.matching_values(text):
+            matched |= self.values[value]
+        return matched
+
+def _intersect(slot_sets):
+    """
+    Intersects sets of slots, smallest first so the work shrinks quickly.
+    """
+    slot_sets = sorted(slot_sets, key=len)
+    matched = set(slot_sets[0])
+    for other in slot_sets[1:]:
+        if not matched:
+            break
+        matched &= other
+    return matched
+
+# =============================================================================
+# Animal Search Index — Combines the per-field indexes
+# =============================================================================
+
+class AnimalSearchIndex:
+    """
+    Incrementally maintained index over a collection of Animal objects.
+
+    Call add/update/remove as animals change; update must be told about the
+    animal after its attributes were edited, the index remembers the values
+    it indexed before. Animals are tracked by their stable animal_id.
+
+    Slots may hold LazyAnimal records; searches return them as they are and
+    get() swaps in the hydrated Animal the first time one is looked up.
+    """
+    def __init__(self, animals=()):
+        self._slots = []        #slot -> animal (None once removed)
+        self._slot_of = {}      #animal_id -> slot
+        self._indexed = {}      #slot -> tuple of indexed values
+        self.name = _SubstringField()
+        self.animal_type = _SubstringField()
+        self.breed = _SubstringField()
+        self.microchip = _SubstringField()
+        self.gender = {}        #gender -> set of slots
+        self.text = None        #TextIndex over notes and descriptions, once needed
+        for animal in animals:
+            self.add(animal)
+
+    def __len__(self):
+        return len(self._indexed)
+
+    def __contains__(self, animal_id):
+        return animal_id in self._slot_of
+
+    def animals(self):
+        """
+        Returns every indexed animal in insertion order.
+        """
+        return [animal for animal in self._slots if animal is not None]
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    def add(self, animal):
+        slot = len(self._slots)
+        self._slots.append(animal)
+        self._slot_of[animal.animal_id] = slot
+        self._index(slot, animal)
+
+    def update(self, animal):
+        slot = self._slot_of[animal.animal_id]
+        self._unindex(slot)
+        self._slots[slot] = animal
+        self._index(slot, animal)
+
+    def remove(self, animal_id):
+        slot = self._slot_of.pop(animal_id)
+        self._unindex(slot)
+        self._slots[slot] = None
+
+    def _index(self, slot, animal):
+        values = (animal.name.lower(), animal.gender, animal.animal_type.lower(),
+                  animal.breed.lower(), animal.microchip_number)
+        self._indexed[slot] = values
+        name, gender, type_, breed, microchip = values
+        self.name.add(slot, name)
+        self.gender.setdefault(gender, set()).add(slot)
+        self.animal_type.add(slot, type_)
+        self.breed.add(slot, breed)
+        self.microchip.add(slot, microchip)
+        if self.text is not None:
+            self.text.add(slot, f"{animal.health_notes} {animal.description}")
+
+    def _unindex(self, slot):
+        name, gender, type_, breed, microchip = self._indexed.pop(slot)
+        self.name.remove(slot, name)
+        holders = self.gender[gender]
+        holders.discard(slot)
+        if not holders:
+            del self.gender[gender]
+        self.animal_type.remove(slot, type_)
+        self.breed.remove(slot, breed)
+        self.microchip.remove(slot, microchip)
+        if self.text is not None:
+            self.text.remove(slot)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def search(self, name="", gender="", animal_type="", breed="", microchip=""):
+        """
+        Same filter semantics as the search form; results in insertion order.
+        """
+        candidate_sets = []
+        gender = gender.upper()
+        if gender:
+            candidate_sets.append(self.gender.get(gender, set()))
+        for field, text in ((self.microchip, microchip), (self.name, name.lower()),
+                            (self.breed, breed.lower()), (self.animal_type, animal_type.lower())):
+            if text:
+                candidate_sets.append(field.slots_containing(text))
+
+        if not candidate_sets:
+            return self.animals()
+        return [self._slots[slot] for slot in sorted(_intersect(candidate_sets))]
+
+    def ranked_search(self, name="", gender="", animal_type="", breed="", microchip="", text="", limit=100):
+        """
+        Fuzzy search in relevance order.
+
+        Name, type and breed match values that contain them or are close to
+        them (typos, missing spaces); text is matched against health notes
+        and descriptions and ranked with BM25. An animal must match every
+        filter given; gender and microchip filter exactly as in search().
+        Its score is the sum of its field similarities plus its text score.
+
+        Returns:
+            Up to limit animals, best first (insertion order between ties)
+        """
+        required = []  #exact filters
+        gender = gender.upper()
+        if gender:
+            required.append(self.gender.get(gender, set()))
+        if microchip:
+            required.append(self.microchip.slots_containing(microchip))
+        fuzzy = []  #(position in _indexed, field, {value: score})
+        for position, field, query in ((0, self.name, name), (2, self.animal_type, animal_type),
+                                       (3, self.breed, breed)):
+            query = query.lower().strip()
+            if query:
+                fuzzy.append((position, field, field.similar_values(query)))
+        text_scores = self.text_index().scores(text) if text.strip() else None
+
+        if not fuzzy and text_scores is None:
+            if not required:
+                return self.animals()[:limit]
+            return [self._slots[slot] for slot in heapq.nsmallest(limit, _intersect(required))]
+        if len(fuzzy) == 1 and text_scores is None:
+            #one scored field: rank its distinct values instead of every animal
+            _, field, similar = fuzzy[0]
+            allowed = _intersect(required) if required else None
+            return [self._slots[slot] for slot in top_k_by_value(field.values, similar, limit, allowed)]
+
+        if not fuzzy:
+            #keywords only: the text score alone orders the matches
+            matched = _intersect(required + [text_scores.keys()]) if required else text_scores
+            return [self._slots[slot] for slot in top_k(matched, text_scores.__getitem__, limit)]
+
+        candidate_sets = list(required)
+        for _, field, similar in fuzzy:
+            candidate_sets.append(set().union(*(field.values[value] for value in similar)))
+        if text_scores is not None:
+            candidate_sets.append(text_scores.keys())
+        indexed = self._indexed
+
+        def score(slot):
+            values = indexed[slot]
+            total = sum(similar[values[position]] for position, _, similar in fuzzy)
+            if text_scores is not None:
+                bm25 = text_scores[slot]
+                total += bm25 / (1 + bm25)  #squashed into 0-1 like the field scores
+            return total
+
+        return [self._slots[slot] for slot in top_k(_intersect(candidate_sets), score, limit)]
+
+    def text_index(self):
+        """
+        Returns the notes and description index, building it on first use.
+        """
+        if self.text is None:
+            text = TextIndex()
+            for slot, animal in enumerate(self._slots):
+                if animal is not None:
+                    text.add(slot, f"{animal.health_notes} {animal.description}")
+            self.text = text
+        return self.text
+
+    def get(self, animal_id):
+        """
+        Returns the full Animal with this ID, or None.
+        """
+        slot = self._slot_of.get(animal_id)
+        if slot is None:
+            return None
+        animal = self._slots[slot]
+        if isinstance(animal, LazyAnimal):
+            animal = self._slots[slot] = animal.hydrate()
+        return animal
+
+    def find_by_microchip(self, microchip):
+        """
+        Returns the earliest animal with exactly this microchip number, or None.
+        """
+        slots = self.microchip.values.get(microchip)
+        return self._slots[min(slots)] if slots else None
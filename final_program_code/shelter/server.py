@@ -0,0 +1,479 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Local HTTP/JSON API
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        A small asyncio HTTP/1.1 server so kiosks and the public website can
+        read the inventory the portal manages, without sharing animals.json
+        between processes.
+
+            GET    /animals?name=&gender=&type=&breed=&microchip=&offset=&limit=
+            GET    /animals/<id>
+            GET    /animals/<id>/thumbnail
+            GET    /microchips/<number>
+            POST   /animals          (JSON fields, as the intake form)
+            PUT    /animals/<id>     (JSON fields to change, as the update form)
+            DELETE /animals/<id>
+
+        image_path in a request body must be an asset store reference (or
+        blank); file paths are rejected so clients cannot have server files
+        copied into the photo store.
+
+        Reads are answered on the event loop from a read-only search index,
+        so any number of connections are served concurrently. Writes queue on
+        a lock and run one at a time on a single writer thread that owns the
+        ShelterService. The read index only changes on the event loop, after a
+        write has been saved. GET responses carry an ETag; a request with a
+        matching If-None-Match gets a bodyless 304. A PUT can name the
+        version it was edited from, as If-Match with the ETag of
+        GET /animals/<id> (412 if the animal changed since) or as the
+        record's "rev" in the body (409 if it changed since); fields it
+        leaves out keep their current values. Changes other processes
+        (a portal workstation, the bulk tool) save to the same data are
+        picked up every REFRESH_SECONDS; a PUT that collides with one gets 409.
+
+        Usage (from the final_program_code folder):
+            python -m shelter.server --data ../animals.json --port 8220
+
+    Dependencies:
+        - asyncio            : Connections and the request loop
+        - service, search_index, thumbnails : Data access
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .assets import is_reference
+from .models import LazyAnimal, animal_from_dict
+from .repository import ConflictError, normalize_filters
+from .search_index import AnimalSearchIndex
+from .service import DATA_FILE, DATABASE_FILE, ShelterService
+from .thumbnails import ThumbnailCache
+from .validation import TEXT_FIELDS
+
+THUMBNAIL_DIR = ".thumbnails"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BODY_SIZE = 1 << 20
+RESPONSE_CACHE_SIZE = 256  #GET bodies kept per data version
+REFRESH_SECONDS = 2.0  #how often to look for changes saved by other processes
+
+# =============================================================================
+# HTTP Helpers
+# =============================================================================
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+async def read_line(reader, status):
+    """
+    Reads one line of the request head; a line longer than the reader's
+    limit (64 KiB) is answered with status rather than crashing the handler.
+    """
+    try:
+        return await reader.readline()
+    except ValueError:  #readline() turns LimitOverrunError into ValueError
+        raise HTTPError(status)
+
+
+async def read_request(reader):
+    """
+    Reads one request from a keep-alive connection.
+
+    Returns:
+        (method, target, headers, body), or None once the client hangs up
+    """
+    line = await read_line(reader, 400)
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await read_line(reader, 431)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "malformed Content-Length")
+    if length < 0:
+        raise HTTPError(400, "malformed Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def format_response(status, body=b"", content_type="application/json", etag=None, keep_alive=True):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+             f"Content-Length: {len(body)}",
+             "Connection: " + ("keep-alive" if keep_alive else "close")]
+    if body:
+        lines.append(f"Content-Type: {content_type}")
+    if etag:
+        lines.append(f"ETag: {etag}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def etag_of(body):
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def etag_matches(headers, etag):
+    """
+    True when the request's If-None-Match names etag (weak or strong) or "*".
+    """
+    tags = [tag.strip() for tag in headers.get("if-none-match", "").split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def if_match_fails(headers, etag):
+    """
+    True when the request has an If-Match that names neither etag nor "*"
+    (strong comparison, so weak tags never match).
+    """
+    if "if-match" not in headers:
+        return False
+    tags = [tag.strip() for tag in headers["if-match"].split(",")]
+    return "*" not in tags and etag not in tags
+
+
+def as_record(animal):
+    #LazyAnimal already holds its record; no need to build the Animal
+    return dict(animal.record) if isinstance(animal, LazyAnimal) else animal.to_dict()
+
+
+def _sniff_type(data):
+    return "image/png" if data.startswith(b"\x89PNG") else "image/jpeg"
+
+# =============================================================================
+# Shelter Server
+# =============================================================================
+
+class ShelterServer:
+    """
+    Serves one ShelterService over HTTP.
+
+    Args:
+        service (ShelterService) : Opened (not yet loaded) shelter data
+        thumbnails (ThumbnailCache) : Cache used for /thumbnail requests
+    """
+    def __init__(self, service, thumbnails):
+        self.service = service
+        self.thumbnails = thumbnails
+        self.index = AnimalSearchIndex()  #read side; only touched on the event loop
+        self.version = 0  #bumps on every write; part of every cached response
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shelter-writer")
+        self._write_lock = asyncio.Lock()
+        self._responses = OrderedDict()  #target -> (version, etag, body)
+
+    async def load(self):
+        """
+        Loads the data on the writer thread and builds the read index from it.
+        """
+        def load_all():
+            for _ in self.service.iter_load():
+                pass
+            return self.service.repository.search()
+
+        animals = await asyncio.get_running_loop().run_in_executor(self._writer, load_all)
+        self.index = AnimalSearchIndex(animals)
+
+    def close(self):
+        self._writer.submit(self.service.close).result()
+        self._writer.shutdown()
+
+    # -------------------------------------------------------------------------
+    # Connections
+    # -------------------------------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    response = await self.dispatch(method, target, headers, body)
+                except HTTPError as error:
+                    keep_alive = False  #the rest of the stream cannot be trusted
+                    response = self.error(error.status, str(error))
+                status, payload, content_type, etag = response
+                writer.write(format_response(status, payload, content_type, etag, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def json_response(status, data, etag=None):
+        return status, json.dumps(data).encode("utf-8"), "application/json", etag
+
+    def error(self, status, message):
+        return self.json_response(status, {"error": message})
+
+    async def dispatch(self, method, target, headers, body):
+        parts = urlsplit(target)
+        path = [unquote(part) for part in parts.path.strip("/").split("/") if part]
+        if path[:1] == ["animals"] and len(path) <= 3:
+            if len(path) == 1 and method == "GET":
+                return self.cached(target, headers, lambda: self.search(parse_qs(parts.query)))
+            if len(path) == 1 and method == "POST":
+                return await self.create(self.read_fields(body))
+            if len(path) == 2 and method == "GET":
+                return self.cached(target, headers, lambda: self.lookup(self.index.get(path[1])))
+            if len(path) == 2 and method == "PUT":
+                return await self.update(path[1], self.read_fields(body, ("rev",)), headers)
+            if len(path) == 2 and method == "DELETE":
+                return await self.delete(path[1])
+            if len(path) == 3 and path[2] == "thumbnail" and method == "GET":
+                return await self.thumbnail(path[1], headers)
+        if path[:1] == ["microchips"] and len(path) == 2 and method == "GET":
+            return self.cached(target, headers, lambda: self.lookup(self.index.find_by_microchip(path[1])))
+        return self.error(404 if method in ("GET", "POST", "PUT", "DELETE") else 405, "no such resource")
+
+    # -------------------------------------------------------------------------
+    # Reads — event loop only, answered from the read index
+    # -------------------------------------------------------------------------
+
+    def cached(self, target, headers, build):
+        """
+        Returns the response for a GET, reusing the body built for the same
+        target at the current data version, or a 304 if the client has it.
+        """
+        cached = self._responses.get(target)
+        if cached is None or cached[0] != self.version:
+            status, data = build()
+            if status != 200:
+                return self.json_response(status, data)
+            body = json.dumps(data).encode("utf-8")
+            cached = self.version, etag_of(body), body
+            self._responses[target] = cached
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        self._responses.move_to_end(target)
+        _, etag, body = cached
+        if etag_matches(headers, etag):
+            return 304, b"", None, etag
+        return 200, body, "application/json", etag
+
+    def search(self, query):
+        first = lambda key: query.get(key, [""])[0]
+        filters = normalize_filters(name=first("name"), gender=first("gender"), animal_type=first("type"),
+                                    breed=first("breed"), microchip=first("microchip"))
+        try:
+            offset = max(0, int(first("offset") or 0))
+            limit = min(MAX_PAGE_SIZE, max(0, int(first("limit") or DEFAULT_PAGE_SIZE)))
+        except ValueError:
+            return 400, {"error": "offset and limit must be integers"}
+        matches = self.index.search(**filters)
+        return 200, {"total": len(matches), "offset": offset,
+                     "animals": [as_record(animal) for animal in matches[offset:offset + limit]]}
+
+    @staticmethod
+    def lookup(animal):
+        return (200, as_record(animal)) if animal is not None else (404, {"error": "animal not found"})
+
+    async def thumbnail(self, animal_id, headers):
+        animal = self.index.get(animal_id)
+        source = self.service.photo_path(animal.image_path) if animal is not None else ""
+        if not source:
+            return self.error(404, "no photo")
+        loop = asyncio.get_running_loop()
+        try:
+            path = await loop.run_in_executor(None, self.thumbnails.thumbnail_path, source)
+        except (OSError, ValueError):
+            return self.error(404, "photo could not be opened")
+        etag = '"' + os.path.basename(path).split(".")[0] + '"'  #the source's content hash
+        if etag_matches(headers, etag):
+            return 304, b"", None, etag
+        data = await loop.run_in_executor(None, _read_bytes, path)
+        return 200, data, _sniff_type(data), etag
+
+    # -------------------------------------------------------------------------
+    # Writes — one at a time on the writer thread, then published to readers
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def read_fields(body, extra=()):
+        """
+        Returns the form fields (and any extra keys) of a JSON request body.
+        A photo must already be in the asset store: image_path is a reference
+        or blank, never a file path on this machine.
+        """
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        image_path = data.get("image_path")
+        if image_path and not (isinstance(image_path, str) and is_reference(image_path)):
+            raise HTTPError(400, "image_path must be a photo reference (sha256:<hash>.<ext>) or blank")
+        return {field: data[field] for field in TEXT_FIELDS + tuple(extra) if field in data}
+
+    async def write(self, func, *args, read=None):
+        """
+        Runs func(*args) on the writer thread. It returns (status, data,
+        publish); publish (if not None) then updates the read index here on
+        the event loop, before the response goes out.
+
+        read (if given) runs first, here on the event loop under the write
+        lock, and its result is passed to func ahead of args: the way for a
+        write to look at the read index, which func must not touch.
+        """
+        async with self._write_lock:
+            if read is not None:
+                args = (read(),) + args
+            status, data, publish = await asyncio.get_running_loop().run_in_executor(self._writer, func, *args)
+            if publish is not None:
+                publish()
+                self.version += 1
+        return self.json_response(status, data)
+
+    async def create(self, fields):
+        def create():
+            animal, errors = self.service.add_animal(fields)
+            if errors:
+                return 400, {"errors": errors}, None
+            record = animal.to_dict()
+            return 201, record, lambda: self.index.add(LazyAnimal(record))
+        return await self.write(create)
+
+    async def update(self, animal_id, fields, headers):
+        revision = fields.pop("rev", None)
+
+        def read():
+            animal = self.index.get(animal_id)
+            return as_record(animal) if animal is not None else None
+
+        def update(current):
+            if current is None:
+                return 404, {"error": "animal not found"}, None
+            if if_match_fails(headers, etag_of(json.dumps(current).encode("utf-8"))):
+                return 412, {"error": f"animal {animal_id} was changed since that version",
+                             "rev": current.get("rev", 0)}, None
+            if revision is not None and str(revision) != str(current.get("rev", 0)):
+                return 409, {"error": f"animal {animal_id} was changed since revision {revision}",
+                             "rev": current.get("rev", 0)}, None
+            merged = dict(current)
+            merged.update(fields)  #fields left out keep their current values
+            try:
+                #current is the version the client edited, so changes saved elsewhere since merge in
+                saved, errors = self.service.update_animal(animal_from_dict(current), merged)
+            except ConflictError as conflict:
+                #another process saved the same fields (or deleted the animal) first
+                return 409, {"error": str(conflict), "fields": conflict.fields}, None
+            if errors:
+                return 400, {"errors": errors}, None
+            record = saved.to_dict()
+            return 200, record, lambda: self.index.update(LazyAnimal(record))
+        return await self.write(update, read=read)
+
+    async def watch(self, interval=REFRESH_SECONDS):
+        """
+        Applies changes other processes saved, every interval seconds.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.write(self.refresh)
+
+    def refresh(self):
+        changed = self.service.refresh()
+        if changed is None:
+            animals = self.service.repository.search()
+            return 200, None, lambda: setattr(self, "index", AnimalSearchIndex(animals))
+        if not changed:
+            return 200, None, None
+        records = {}
+        for animal_id in changed:
+            animal = self.service.get(animal_id)
+            records[animal_id] = as_record(animal) if animal is not None else None
+        return 200, None, lambda: self._publish(records)
+
+    def _publish(self, records):
+        for animal_id, record in records.items():
+            if record is None:
+                if animal_id in self.index:
+                    self.index.remove(animal_id)
+            elif animal_id in self.index:
+                self.index.update(LazyAnimal(record))
+            else:
+                self.index.add(LazyAnimal(record))
+
+    async def delete(self, animal_id):
+        def delete():
+            if self.service.get(animal_id) is None:
+                return 404, {"error": "animal not found"}, None
+            self.service.delete_animal(animal_id)
+            return 200, {"deleted": animal_id}, lambda: self.index.remove(animal_id)
+        return await self.write(delete)
+
+
+def _read_bytes(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+# =============================================================================
+# Command Line Entry Point
+# =============================================================================
+
+async def serve(host, port, service, thumbnails):
+    server = ShelterServer(service, thumbnails)
+    await server.load()
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+    print(f"Serving {len(server.index):,} animals on http://{host}:{port}", flush=True)
+    watcher = asyncio.create_task(server.watch())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        watcher.cancel()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the shelter inventory over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8220)
+    parser.add_argument("--backend", choices=("journal", "sqlite"),
+                        default=os.environ.get("SHELTER_BACKEND", "journal"))
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--database", default=DATABASE_FILE)
+    parser.add_argument("--thumbnails", default=THUMBNAIL_DIR, help="thumbnail cache folder")
+    args = parser.parse_args()
+
+    service = ShelterService.open(args.backend, args.data, args.database)
+    try:
+        asyncio.run(serve(args.host, args.port, service, ThumbnailCache(args.thumbnails)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Shelter Service
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Everything the GUI does with animal data, without the GUI: choosing a
+        backend, loading, validating and saving form input, deleting, and
+        running (or refining) searches. The Tk portal, the bulk tool and any
+        other client call this instead of talking to the repository and the
+        validation rules themselves.
+
+        Several workstations may open the same data. Updates and deletes
+        carry the revision they started from (see repository.ConflictError)
+        and refresh() picks up what the others saved.
+
+        With "batched" durability changes return as soon as they are checked
+        and queued; a background thread writes them, and write_results()
+        reports how each write went.
+
+        Every change, made here or picked up by refresh(), is published on
+        self.changes (events.ChangeBus) as insert / update / delete events;
+        subscribers get them as one coalesced batch when the operation
+        returns, so they can update instead of recomputing.
+
+        report() builds population analytics (analytics.py, NumPy) on first
+        use and keeps them current from those change events.
+
+        Photos go through an AssetStore (assets.py) kept next to the data:
+        import_photo() copies an upload in once and flags photos that look
+        like ones already on file, and records refer to it by content hash.
+
+        Loading, saving, searching and reports are timed through metrics.py
+        (recorded only while metrics are enabled).
+
+    Dependencies:
+        - repository, sqlite_repository, storage : Animal store backends
+        - validation         : Form rules
+        - analytics          : Population reports (NumPy imported on first use)
+        - assets             : Content-addressed photo store
+        - events             : Change event bus
+        - metrics            : Timings and counters
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import functools
+import os
+import queue
+
+from . import metrics
+from .assets import AssetStore, find_moved, is_reference
+from .events import RELOAD, ChangeBus
+from .models import animal_from_dict
+from .repository import InMemoryAnimalRepository, iter_refined, narrows
+from .storage import JournaledStorage
+from .validation import TEXT_FIELDS, clean_record, stamp_intake, validation_errors
+
+DATA_FILE = "animals.json"
+DATABASE_FILE = "animals.db"
+PHOTO_DIR = "photos"  #asset store folder, next to the data file or database
+
+# =============================================================================
+# Change Delivery
+# =============================================================================
+
+def _delivers_changes(method):
+    """
+    Delivers the change events a ShelterService method caused once it
+    returns or raises (a failed save may still have picked up changes
+    saved elsewhere).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.changes.deliver()
+    return wrapper
+
+# =============================================================================
+# Repository Setup — Choose the data backend
+# =============================================================================
+
+def open_repository(backend="journal", data_file=DATA_FILE, database_file=DATABASE_FILE, durability="immediate",
+                    binary_snapshot=False):
+    """
+    Builds the "journal" or "sqlite" repository. The SQLite database is
+    seeded from data_file the first time it is created. durability
+    ("immediate" or "batched", see JournaledStorage) applies to the journal;
+    SQLite always commits before returning. binary_snapshot loads the
+    journal's snapshot from its memory-mapped binary copy when current.
+    """
+    if backend == "sqlite":
+        from .sqlite_repository import SQLiteAnimalRepository  #sqlite3 only when asked for
+
+        is_new = not os.path.exists(database_file)
+        repository = SQLiteAnimalRepository(database_file)
+        if is_new and os.path.exists(data_file):
+            repository.import_json_file(data_file)
+        return repository
+    return InMemoryAnimalRepository(JournaledStorage(data_file, durability=durability,
+                                                     binary_snapshot=binary_snapshot))
+
+
+def default_photo_dir(backend="journal", data_file=DATA_FILE, database_file=DATABASE_FILE):
+    """
+    Returns the photo store folder for a backend: beside the file holding the
+    records, so workstations sharing the data share the photos too.
+    """
+    location = database_file if backend == "sqlite" else data_file
+    return os.path.join(os.path.dirname(os.path.abspath(location)), PHOTO_DIR)
+
+# =============================================================================
+# Shelter Service — Data operations behind the intake, update and search forms
+# =============================================================================
+
+class ShelterService:
+    """
+    Headless front end to an AnimalRepository.
+
+    Args:
+        repository (AnimalRepository) : Store to work on (see open_repository)
+        assets (AssetStore)           : Photo store (default: photos/ in the working folder)
+    """
+    def __init__(self, repository, assets=None):
+        self.repository = repository
+        self.assets = assets or AssetStore(PHOTO_DIR)
+        self._analytics = None  #ShelterAnalytics, once a report was asked for
+        self._write_results = queue.Queue()
+        self.changes = ChangeBus()
+        repository.watch_writes(lambda *result: self._write_results.put(result))
+        repository.watch_changes(self.changes.publish)
+
+    @classmethod
+    def open(cls, backend="journal", data_file=DATA_FILE, database_file=DATABASE_FILE, durability="immediate",
+             photo_dir=None, binary_snapshot=False):
+        photo_dir = photo_dir or default_photo_dir(backend, data_file, database_file)
+        return cls(open_repository(backend, data_file, database_file, durability, binary_snapshot),
+                   AssetStore(photo_dir))
+
+    # -------------------------------------------------------------------------
+    # Loading and lookups
+    # -------------------------------------------------------------------------
+
+    def iter_load(self, batch_size=5000):
+        """
+        Loads the stored animals, yielding the running count after each batch.
+        """
+        loaded = 0
+        for loaded in metrics.timed_iter("load", self.repository.iter_load(batch_size)):
+            yield loaded
+        metrics.count("load.records", loaded)
+
+    def count(self):
+        return self.repository.count()
+
+    @property
+    def skipped_records(self):
+        """
+        (record number, message) for each stored record that could not be read.
+        """
+        return getattr(self.repository, "skipped_records", [])
+
+    def get(self, animal_id):
+        return self.repository.get(animal_id)
+
+    @_delivers_changes
+    @metrics.timed("refresh")
+    def refresh(self):
+        """
+        Applies changes saved by other workstations since the last refresh.
+
+        Returns:
+            List of changed animal IDs, or None if everything was reloaded
+        """
+        return self.repository.refresh()
+
+    # -------------------------------------------------------------------------
+    # Changes
+    # -------------------------------------------------------------------------
+
+    @_delivers_changes
+    @metrics.timed("save.add")
+    def add_animal(self, fields):
+        """
+        Validates intake form fields (Animal.to_dict() keys) and saves a new animal.
+
+        Returns:
+            (new Animal, []) on success, or (None, list of error messages)
+        """
+        record = stamp_intake(clean_record(fields))
+        errors = validation_errors(record) or self.store_photo(record)
+        if errors:
+            return None, errors
+        animal = animal_from_dict(record)
+        self.repository.add(animal)
+        return animal, []
+
+    @_delivers_changes
+    @metrics.timed("save.add_many")
+    def add_animals(self, records):
+        """
+        Saves already validated records (a bulk import) in one atomic write.
+        Call store_photo() on each first so photo paths become references.
+
+        Returns:
+            Number of animals added
+        """
+        return self.repository.add_many([animal_from_dict(record) for record in records])
+
+    @_delivers_changes
+    @metrics.timed("save.update")
+    def update_animal(self, animal, fields, force=False):
+        """
+        Validates update form fields and saves them over animal, the copy the
+        form was filled from (it is left unchanged).
+
+        If another workstation saved the animal in the meantime, fields only
+        one side changed are merged. Fields both sides changed raise
+        ConflictError, unless force is set, in which case this form wins.
+
+        Returns:
+            (saved Animal, []) on success, or (None, list of error messages)
+        Raises:
+            ConflictError on a conflicting edit, or if the animal was deleted
+        """
+        record = clean_record(fields)
+        errors = validation_errors(record, new=False)
+        if not errors and "image_path" in fields:
+            errors = self.store_photo(record)
+        if errors:
+            return None, errors
+        base = animal.to_dict()
+        edited = dict(base)
+        for field in TEXT_FIELDS:
+            if field != "image_path" or "image_path" in fields:
+                edited[field] = record[field]
+        saved = self.repository.update(animal_from_dict(edited), base, force)
+        return saved, []
+
+    @_delivers_changes
+    @metrics.timed("save.delete")
+    def delete_animal(self, animal_id, base=None):
+        """
+        Deletes an animal. With base (the to_dict() the user was shown),
+        ConflictError is raised if it was updated elsewhere since.
+        """
+        self.repository.delete(animal_id, base)
+
+    # -------------------------------------------------------------------------
+    # Photos
+    # -------------------------------------------------------------------------
+
+    @metrics.timed("photo.import")
+    def import_photo(self, path, animal_id=None):
+        """
+        Copies an uploaded photo into the photo store (once per distinct
+        content) and looks for animals already using it or a near-duplicate.
+
+        Args:
+            path (str)      : File the user picked
+            animal_id (str) : Animal the photo is for, left out of the matches
+        Returns:
+            (reference to save as image_path, list of animals with a similar photo)
+        Raises:
+            OSError if the photo cannot be read or stored
+        """
+        reference, _ = self.assets.put(path)
+        similar = {reference, *self.assets.near_duplicates(reference)}
+        matches = [animal for animal in self.repository.search()
+                   if animal.image_path in similar and animal.animal_id != animal_id]
+        return reference, matches
+
+    def photo_path(self, image_path):
+        """
+        Returns the file to display for an animal's image_path, or "" if the
+        photo is missing (see AssetStore.resolve).
+        """
+        return self.assets.resolve(image_path)
+
+    def photo_references(self):
+        """
+        Returns the set of image_path values in use by any animal.
+        """
+        return {animal.image_path for animal in self.repository.search() if animal.image_path}
+
+    def collect_photos(self):
+        """
+        Deletes unused photos from the store on a background thread. The
+        references in use are gathered first, on the calling thread.
+
+        Nothing is deleted when some stored records could not be read: the
+        photos only they use would look unused.
+
+        Returns:
+            The started threading.Thread, or None if collection was skipped
+        """
+        if self.skipped_records:
+            return None
+        return self.assets.collect_in_background(self.photo_references())
+
+    @_delivers_changes
+    def migrate_photos(self, search_dirs=()):
+        """
+        Moves records that still hold a file path over to the photo store.
+        A photo missing from its old path is looked for by file name in
+        search_dirs (see assets.find_moved).
+
+        Returns:
+            (number of records migrated, animals whose photo was not found)
+        """
+        migrated, missing = 0, []
+        for animal in self.repository.search():
+            path = animal.image_path
+            if not path or is_reference(path):
+                continue
+            source = path if os.path.isfile(path) else find_moved(path, search_dirs)
+            if source is None:
+                missing.append(animal)
+                continue
+            base = animal.to_dict()
+            reference, _ = self.assets.put(source)
+            self.repository.update(animal_from_dict(dict(base, image_path=reference)), base)
+            migrated += 1
+        return migrated, missing
+
+    def store_photo(self, record):
+        """
+        Swaps a file path in record["image_path"] for an asset reference, so
+        trusted callers that save a path directly (the GUI, bulk import) are
+        stored the same way as uploads. Paths that do not exist are kept as
+        given. Untrusted input (the HTTP API) must be checked first: this
+        copies whatever local file the path names.
+
+        Returns:
+            [] on success, or a list with one error message
+        """
+        path = record.get("image_path", "")
+        if not path or is_reference(path) or not os.path.isfile(path):
+            return []
+        try:
+            record["image_path"], _ = self.assets.put(path)
+        except OSError as error:
+            return [f"Photo could not be stored: {error}"]
+        return []
+
+    # -------------------------------------------------------------------------
+    # Searching
+    # -------------------------------------------------------------------------
+
+    def search_batches(self, filters, previous_filters=None, previous_results=None, batch_size=500):
+        """
+        Returns an iterator of result batches for normalized filters.
+
+        When previous_results are the complete matches for previous_filters
+        and the new filters only narrow them, those results are re-filtered
+        instead of searching every animal again.
+        """
+        if previous_results is not None and narrows(previous_filters, filters):
+            metrics.count("search.scanned", len(previous_results))
+            return metrics.timed_iter("search.refine", iter_refined(previous_results, filters, batch_size),
+                                      "search.matches")
+        metrics.count("search.scanned", self.count())
+        return metrics.timed_iter("search", self.repository.iter_search(**filters, batch_size=batch_size),
+                                  "search.matches")
+
+    def ranked_search(self, filters, text="", limit=100):
+        """
+        Fuzzy search for normalized filters, plus text matched against health
+        notes and descriptions (see AnimalRepository.ranked_search).
+
+        Returns:
+            Up to limit animals, best match first
+        """
+        with metrics.timer("search.ranked"):
+            matches = self.repository.ranked_search(**filters, text=text, limit=limit)
+        metrics.count("search.matches", len(matches))
+        return matches
+
+    # -------------------------------------------------------------------------
+    # Reports
+    # -------------------------------------------------------------------------
+
+    def analytics(self):
+        """
+        Returns the ShelterAnalytics over every animal, building its columns
+        from the repository the first time.
+
+        Raises:
+            ImportError if NumPy is not installed
+        """
+        if self._analytics is None:
+            from .analytics import ShelterAnalytics  #NumPy only when reports are used
+
+            self._analytics = ShelterAnalytics.from_table(self.repository.load_table())
+            self.changes.subscribe(self._update_analytics)
+        return self._analytics
+
+    @metrics.timed("report")
+    def report(self, today=None):
+        """
+        Population report (see ShelterAnalytics.report) as a JSON-ready dictionary.
+        """
+        return self.analytics().report(today)
+
+    def _update_analytics(self, events):
+        """
+        Change subscriber keeping the analytics columns current; a RELOAD
+        drops them so the next report rebuilds them.
+        """
+        for event in events:
+            if event.kind == RELOAD:
+                self.changes.unsubscribe(self._update_analytics)
+                self._analytics = None
+                return
+            if event.after is None:
+                self._analytics.remove(event.animal_id)
+            else:
+                self._analytics.update(event.after)
+
+    # -------------------------------------------------------------------------
+    # Write-behind
+    # -------------------------------------------------------------------------
+
+    def pending_writes(self):
+        return self.repository.pending_writes()
+
+    def write_results(self):
+        """
+        Returns what happened to queued changes since the last call: one
+        (saved count, rejected animal IDs, OSError or None) per write.
+        Safe to call from the GUI thread; the writes report from their own.
+        """
+        results = []
+        while True:
+            try:
+                results.append(self._write_results.get_nowait())
+            except queue.Empty:
+                break
+        return results
+
+    def flush(self):
+        self.repository.flush()
+
+    def close(self):
+        """
+        Writes queued changes and closes the data.
+
+        Raises:
+            OSError if queued changes could not be written
+        """
+        self.repository.close()
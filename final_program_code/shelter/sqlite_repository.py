@@ -0,0 +1,328 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — SQLite Repository
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Stores animals in a SQLite database and answers searches with SQL,
+        so only the matching rows are ever turned into Animal objects.
+        The schema mirrors Animal.to_dict(); microchip, type, gender and
+        breed are indexed and an FTS5 table covers name, health notes and
+        description for full-text lookups. Each row carries a revision
+        number so edits from two workstations are merged, not overwritten.
+
+        Usage (one-shot import of an existing animals.json):
+            python -m shelter.sqlite_repository animals.json animals.db
+
+    Dependencies:
+        - sqlite3            : Standard library database driver
+        - models, animal_table, repository, storage : Local modules
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import sqlite3
+import sys
+
+from .animal_table import AnimalTable
+from .models import RECORD_FIELDS, animal_from_dict, new_animal_id
+from .repository import AnimalRepository, ConflictError, check_delete, resolve_update
+from .storage import JournaledStorage
+
+# =============================================================================
+# Schema — Columns follow the keys produced by Animal.to_dict()
+# =============================================================================
+
+#the record's stable "id" lives in animal_id; the integer id is SQLite's rowid
+COLUMNS = tuple("animal_id" if field == "id" else field for field in RECORD_FIELDS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS animals (
+    id           INTEGER PRIMARY KEY,
+    animal_id    TEXT,
+    type         TEXT NOT NULL DEFAULT 'animal',
+    name         TEXT NOT NULL,
+    gender       TEXT NOT NULL DEFAULT '',
+    breed        TEXT NOT NULL DEFAULT '',
+    weight       TEXT NOT NULL DEFAULT '',
+    dob          TEXT NOT NULL DEFAULT '',
+    microchip    TEXT NOT NULL DEFAULT '',
+    health_notes TEXT NOT NULL DEFAULT '',
+    description  TEXT NOT NULL DEFAULT '',
+    image_path   TEXT NOT NULL DEFAULT '',
+    intake       TEXT NOT NULL DEFAULT '',
+    rev          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_animals_microchip ON animals (microchip);
+CREATE INDEX IF NOT EXISTS idx_animals_type      ON animals (type);
+CREATE INDEX IF NOT EXISTS idx_animals_gender    ON animals (gender);
+CREATE INDEX IF NOT EXISTS idx_animals_breed     ON animals (breed);
+"""
+
+ID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_animals_animal_id ON animals (animal_id);"
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS animals_fts USING fts5 (
+    name, health_notes, description, content='animals', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS animals_fts_insert AFTER INSERT ON animals BEGIN
+    INSERT INTO animals_fts (rowid, name, health_notes, description)
+    VALUES (new.id, new.name, new.health_notes, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS animals_fts_delete AFTER DELETE ON animals BEGIN
+    INSERT INTO animals_fts (animals_fts, rowid, name, health_notes, description)
+    VALUES ('delete', old.id, old.name, old.health_notes, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS animals_fts_update AFTER UPDATE ON animals BEGIN
+    INSERT INTO animals_fts (animals_fts, rowid, name, health_notes, description)
+    VALUES ('delete', old.id, old.name, old.health_notes, old.description);
+    INSERT INTO animals_fts (rowid, name, health_notes, description)
+    VALUES (new.id, new.name, new.health_notes, new.description);
+END;
+"""
+
+_INSERT = f"INSERT INTO animals ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def _record(row):
+    """
+    Converts a database row back into an Animal.to_dict() record.
+    """
+    return {field: row[column] for field, column in zip(RECORD_FIELDS, COLUMNS)}
+
+
+def _row_values(record):
+    """
+    Orders a record's values to match COLUMNS, filling gaps like the JSON loader.
+    """
+    values = [record.get(field) or "" for field in RECORD_FIELDS]
+    values[0] = values[0] or new_animal_id()
+    values[1] = values[1] or "animal"
+    values[-1] = int(record.get("rev") or 0)
+    return values
+
+# =============================================================================
+# SQLite Backend — Indexed queries over an on-disk database
+# =============================================================================
+
+class SQLiteAnimalRepository(AnimalRepository):
+    """
+    Repository backed by a SQLite database file.
+
+    Substring filters on the indexed categorical columns (type, breed,
+    microchip) are answered by first scanning the small set of distinct
+    values in the index, then fetching matching rows through the index.
+    Case folding uses Python's str.lower so results match the in-memory
+    search exactly, including for non-ASCII names.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.create_function("py_lower", 1, lambda value: value.lower(), deterministic=True)
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        has_fts_table = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'animals_fts'").fetchone() is not None
+        try:
+            self.connection.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False  #SQLite built without FTS5
+        if self.has_fts and not has_fts_table:
+            #index rows that existed before the full-text table was added
+            self.connection.execute("INSERT INTO animals_fts (animals_fts) VALUES ('rebuild')")
+        self.connection.commit()
+
+    def _migrate(self):
+        """
+        Adds the animal_id, rev and intake columns to databases created before
+        stable IDs, revisions and intake dates, and gives every existing row
+        an ID.
+        """
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(animals)")}
+        with self.connection:
+            if "rev" not in columns:
+                self.connection.execute("ALTER TABLE animals ADD COLUMN rev INTEGER NOT NULL DEFAULT 0")
+            if "intake" not in columns:
+                self.connection.execute("ALTER TABLE animals ADD COLUMN intake TEXT NOT NULL DEFAULT ''")
+            if "animal_id" not in columns:
+                self.connection.execute("ALTER TABLE animals ADD COLUMN animal_id TEXT")
+            missing = self.connection.execute("SELECT id FROM animals WHERE animal_id IS NULL").fetchall()
+            self.connection.executemany("UPDATE animals SET animal_id = ? WHERE id = ?",
+                                        [(new_animal_id(), row["id"]) for row in missing])
+            self.connection.execute(ID_INDEX)
+        self._data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self):
+        return self.count()
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM animals").fetchone()[0]
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def search(self, name="", gender="", animal_type="", breed="", microchip=""):
+        return [animal for batch in self.iter_search(name, gender, animal_type, breed, microchip) for animal in batch]
+
+    def iter_search(self, name="", gender="", animal_type="", breed="", microchip="", batch_size=500):
+        """
+        Runs the query once and fetches matching rows batch by batch, so the
+        scan itself is spread across the caller's batches.
+        """
+        clauses = []
+        params = []
+        if name:
+            clauses.append("instr(py_lower(name), ?) > 0")
+            params.append(name.lower())
+        if gender:
+            clauses.append("gender = ?")
+            params.append(gender.upper())
+        for column, value in (("type", animal_type.lower()), ("breed", breed.lower())):
+            if value:
+                clauses.append(f"{column} IN (SELECT {column} FROM (SELECT DISTINCT {column} FROM animals)"
+                               f" WHERE instr(py_lower({column}), ?) > 0)")
+                params.append(value)
+        if microchip:
+            clauses.append("microchip IN (SELECT microchip FROM (SELECT DISTINCT microchip FROM animals)"
+                           " WHERE instr(microchip, ?) > 0)")
+            params.append(microchip)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        cursor = self.connection.execute(f"SELECT * FROM animals{where} ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [animal_from_dict(_record(row)) for row in rows]
+
+    def get(self, animal_id):
+        row = self.connection.execute("SELECT * FROM animals WHERE animal_id = ?", (animal_id,)).fetchone()
+        return animal_from_dict(_record(row)) if row else None
+
+    def load_table(self):
+        rows = self.connection.execute("SELECT * FROM animals ORDER BY id")
+        return AnimalTable.from_records(_record(row) for row in rows)
+
+    def find_by_microchip(self, microchip):
+        row = self.connection.execute("SELECT * FROM animals WHERE microchip = ? ORDER BY id LIMIT 1",
+                                      (microchip,)).fetchone()
+        return animal_from_dict(_record(row)) if row else None
+
+    def text_search(self, query, limit=50):
+        """
+        Full-text search over name, health notes and description, best match first.
+        """
+        if not self.has_fts:
+            raise RuntimeError("This SQLite build does not include FTS5.")
+        rows = self.connection.execute(
+            "SELECT animals.* FROM animals_fts JOIN animals ON animals.id = animals_fts.rowid"
+            " WHERE animals_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit))
+        return [animal_from_dict(_record(row)) for row in rows]
+
+    # -------------------------------------------------------------------------
+    # Mutations
+    # -------------------------------------------------------------------------
+
+    def add(self, animal):
+        self._ranked_index = None
+        record = animal.to_dict()
+        with self.connection:
+            self.connection.execute(_INSERT, _row_values(record))
+        self._changed(animal.animal_id, None, record)
+
+    def add_many(self, animals):
+        records = [animal.to_dict() for animal in animals]
+        count = self.import_records(records)
+        for record in records:
+            self._changed(record["id"], None, record)
+        return count
+
+    def update(self, animal, base=None, force=False):
+        self._ranked_index = None
+        assignments = ", ".join(f"{column} = ?" for column in COLUMNS[1:])
+        with self.connection:
+            #take the write lock before reading, so nobody saves in between
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute("SELECT * FROM animals WHERE animal_id = ?",
+                                          (animal.animal_id,)).fetchone()
+            if row is None:
+                raise ConflictError(animal.animal_id, [], None)
+            before = _record(row)
+            record = resolve_update(before, animal.to_dict(), base, force)
+            values = _row_values(record)
+            self.connection.execute(f"UPDATE animals SET {assignments} WHERE animal_id = ?",
+                                    values[1:] + values[:1])
+        self._changed(animal.animal_id, before, record)
+        return animal_from_dict(record)
+
+    def delete(self, animal_id, base=None):
+        self._ranked_index = None
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute("SELECT * FROM animals WHERE animal_id = ?", (animal_id,)).fetchone()
+            if row is None:
+                return
+            before = _record(row)
+            check_delete(before, base)
+            self.connection.execute("DELETE FROM animals WHERE animal_id = ?", (animal_id,))
+        self._changed(animal_id, before, None)
+
+    def refresh(self):
+        """
+        Queries always read the database, so this only reports whether
+        another connection has committed since the last call (as a RELOAD
+        change event, since which rows changed is not known).
+        """
+        version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return []
+        self._data_version = version
+        self._ranked_index = None
+        self._reloaded()
+        return None
+
+    def close(self):
+        self.connection.close()
+
+    # -------------------------------------------------------------------------
+    # Import — One-shot migration from the JSON format
+    # -------------------------------------------------------------------------
+
+    def import_records(self, records):
+        """
+        Inserts record dictionaries (Animal.to_dict() format) in one transaction.
+
+        Returns:
+            Number of records imported
+        """
+        self._ranked_index = None
+        with self.connection:
+            cursor = self.connection.executemany(_INSERT, (_row_values(record) for record in records))
+        return cursor.rowcount
+
+    def import_json_file(self, json_path):
+        """
+        Imports an animals.json snapshot together with any pending journal entries.
+        """
+        storage = JournaledStorage(json_path)
+        try:
+            return self.import_records(storage.load())
+        finally:
+            storage.close()
+
+# =============================================================================
+# Command Line Entry Point — One-shot importer
+# =============================================================================
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python -m shelter.sqlite_repository <animals.json> <animals.db>")
+        sys.exit(2)
+    repository = SQLiteAnimalRepository(sys.argv[2])
+    imported = repository.import_json_file(sys.argv[1])
+    repository.close()
+    print(f"Imported {imported} animals into {sys.argv[2]}")
@@ -0,0 +1,989 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Storage Engines
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Pluggable persistence backends for animal records. Every backend
+        exchanges plain dictionaries in the Animal.to_dict() format, so the
+        GUI keeps ownership of turning records into Cat/Dog/Exotic objects.
+
+        - JsonFileStorage   : rewrites the whole JSON file on every change
+                              (the original behaviour, now written atomically)
+        - JournaledStorage  : keeps animals.json as a snapshot and appends
+                              single-record changes to a JSON Lines journal,
+                              folding the journal back into the snapshot with
+                              a background compaction. Several processes may
+                              share one file: changes are made under a lock
+                              file and each process picks up the others'
+                              journal lines as they appear. In "batched"
+                              durability a background thread writes changes
+                              behind the caller, a burst per journal line.
+                              With binary_snapshot, iter_records() reads a
+                              memory-mapped binary copy of the snapshot
+                              (binary_snapshot.py) instead of parsing it
+
+    Dependencies:
+        - json, os, hashlib, threading, contextlib : Standard library only
+        - filelock           : Cross-process lock around journal changes
+        - metrics            : Write timings and bytes written
+        - loader             : Streaming reader for the JSON snapshot
+        - binary_snapshot    : Memory-mapped copy of the snapshot for fast loads
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+
+from . import metrics
+from .binary_snapshot import BINARY_SUFFIX, BinarySnapshot, write_binary_snapshot
+from .filelock import FileLock
+from .loader import iter_json_records
+
+DURABILITY_MODES = ("immediate", "batched")
+RETRY_DELAY = 2.0  #seconds before retrying a write-behind flush that failed
+
+# =============================================================================
+# File Helpers — Atomic writes and snapshot access
+# =============================================================================
+
+def atomic_write_bytes(path, data):
+    """
+    Writes bytes to a temporary file beside the target, flushes it to disk and
+    renames it over the target, so readers only ever see a complete file.
+    """
+    temp_path = path + ".tmp"
+    with metrics.timer("storage.write_file"):
+        with open(temp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    metrics.count("storage.bytes_written", len(data))
+
+
+def encode_snapshot(records):
+    """
+    Serializes records in the same indented layout as the original animals.json.
+    """
+    return json.dumps(records, indent=2).encode("utf-8")
+
+
+def read_snapshot_bytes(path):
+    """
+    Returns (exists, raw bytes) for a snapshot file without parsing it.
+    """
+    try:
+        with open(path, "rb") as file:
+            return True, file.read()
+    except FileNotFoundError:
+        return False, b""
+
+
+def read_snapshot(path):
+    """
+    Reads a JSON snapshot file.
+
+    Returns:
+        Tuple of (list of record dicts, raw file bytes); missing files are empty.
+    Raises:
+        json.JSONDecodeError if the snapshot exists but is not valid JSON.
+    """
+    _, raw = read_snapshot_bytes(path)
+    if not raw.strip():
+        return [], raw
+    return json.loads(raw.decode("utf-8")), raw
+
+
+def parse_journal(raw):
+    """
+    Splits journal bytes into its header and its change lines.
+
+    Returns:
+        (header dict or None, list of changes, bytes used). Each change is the
+        list of entries one line holds (a batch line holds several; a line
+        that cannot be read holds none). A torn final line without its
+        newline is not used.
+    """
+    used = raw.rfind(b"\n") + 1
+    header = None
+    changes = []
+    for line in raw[:used].splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            changes.append([])  #damaged line; it still counts as one change
+            continue
+        if entry.get("op") == "base":
+            header = entry
+        elif entry.get("op") == "batch":
+            changes.append(entry["entries"])
+        else:
+            changes.append([entry])
+    return header, changes, used
+
+
+def coalesce_entries(entries):
+    """
+    Folds a run of journal entries so every key appears once, in the order
+    keys first appeared, with its final state: an insert followed by updates
+    becomes one insert, an insert followed by a delete disappears.
+    """
+    folded = {}
+    for entry in entries:
+        key = entry["key"]
+        previous = folded.get(key)
+        if previous is None:
+            folded[key] = entry
+        elif previous["op"] == "insert":
+            if entry["op"] == "delete":
+                del folded[key]
+            else:
+                folded[key] = {"op": "insert", "key": key, "record": entry["record"]}
+        elif entry["op"] == "insert":
+            folded[key] = {"op": "update", "key": key, "record": entry["record"]}  #deleted, then re-added
+        else:
+            folded[key] = entry
+    return list(folded.values())
+
+
+def _file_identity(stat):
+    return stat.st_dev, stat.st_ino
+
+
+def _snapshot_signature(path):
+    """
+    Returns what changes when a snapshot file is replaced or rewritten.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+# =============================================================================
+# Record Set — Ordered records addressable by key
+# =============================================================================
+
+class _RecordSet:
+    """
+    Keeps records in insertion order with a key -> positions map so that
+    journal operations are applied in O(1). Keys are normally unique record
+    IDs; if several records share a key (e.g. legacy records without an ID)
+    operations address the first one.
+    """
+    def __init__(self, key_field, records=()):
+        self.key_field = key_field
+        self._slots = []
+        self._positions = {}
+        for record in records:
+            self.insert(record.get(key_field, ""), record)
+
+    def insert(self, key, record):
+        self._positions.setdefault(key, []).append(len(self._slots))
+        self._slots.append(record)
+
+    def update(self, key, record):
+        positions = self._positions.get(key)
+        if not positions:
+            self.insert(record.get(self.key_field, ""), record)
+            return
+        position = positions[0]
+        self._slots[position] = record
+        new_key = record.get(self.key_field, "")
+        if new_key != key:
+            #re-file the record under its new key, keeping positions ordered
+            positions.pop(0)
+            if not positions:
+                del self._positions[key]
+            moved = self._positions.setdefault(new_key, [])
+            moved.append(position)
+            moved.sort()
+
+    def delete(self, key):
+        positions = self._positions.get(key)
+        if not positions:
+            return
+        self._slots[positions.pop(0)] = None
+        if not positions:
+            del self._positions[key]
+
+    def apply(self, entry):
+        """
+        Applies one journal entry ({"op", "key", "record"}) to the set.
+        """
+        op = entry.get("op")
+        if op == "insert":
+            self.insert(entry["key"], entry["record"])
+        elif op == "update":
+            self.update(entry["key"], entry["record"])
+        elif op == "delete":
+            self.delete(entry["key"])
+
+    def records(self):
+        return [record for record in self._slots if record is not None]
+
+# =============================================================================
+# Storage Interface — Shared by every backend
+# =============================================================================
+
+class AnimalStorage:
+    """
+    Base class for animal record persistence.
+
+    Records are dictionaries in the Animal.to_dict() format and are addressed
+    by the value of key_field (the stable record ID by default).
+    """
+    def __init__(self, path, key_field="id"):
+        self.path = path
+        self.key_field = key_field
+
+    def load(self):
+        """
+        Returns the current list of record dictionaries.
+        """
+        raise NotImplementedError
+
+    def iter_records(self, on_error=None):
+        """
+        Yields the current records one at a time. Backends that can stream
+        override this; by default it is load() in one piece.
+        """
+        return iter(self.load())
+
+    def insert(self, key, record):
+        raise NotImplementedError
+
+    def insert_many(self, items):
+        """
+        Inserts (key, record) pairs in one atomic write: after a crash either
+        all of them are stored or none are. Backends override this with
+        something cheaper than rewriting everything.
+        """
+        self.write_all(self.load() + [record for _, record in items])
+
+    def update(self, key, record):
+        """
+        Replaces the record stored under key (its previous key, if the
+        update changed it) with record.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def write_all(self, records):
+        """
+        Replaces the stored data with records in one write.
+        """
+        raise NotImplementedError
+
+    def poll(self):
+        """
+        Returns the changes other processes saved since this storage last
+        loaded, wrote or polled: a list of {"op", "key", "record"} entries in
+        the order they were made, or None when the data was replaced
+        wholesale and has to be loaded again. Backends that cannot tell
+        report no changes.
+        """
+        return []
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Holds the storage's write lock around a read-check-write sequence,
+        so no other process can save in between. Yields what poll() would
+        return, letting the caller catch up before it checks anything.
+        """
+        yield []
+
+    def pending(self):
+        """
+        Returns how many changes are queued but not yet written.
+        """
+        return 0
+
+    def flush(self):
+        """
+        Writes queued changes now. Raises OSError if they cannot be written.
+        """
+
+    def close(self):
+        """
+        Releases files and waits for background work to finish.
+        """
+
+# =============================================================================
+# Full Rewrite Backend — One JSON document rewritten per change
+# =============================================================================
+
+class JsonFileStorage(AnimalStorage):
+    """
+    Stores records in a single JSON file that is rewritten on every change.
+    Writes go through a temporary file and rename, so a crash leaves either
+    the old or the new file intact.
+    """
+    def __init__(self, path, key_field="id"):
+        super().__init__(path, key_field)
+        self._records = _RecordSet(key_field)
+
+    def load(self):
+        records, _ = read_snapshot(self.path)
+        self._records = _RecordSet(self.key_field, records)
+        return self._records.records()
+
+    def insert(self, key, record):
+        self._records.insert(key, record)
+        self._flush()
+
+    def insert_many(self, items):
+        for key, record in items:
+            self._records.insert(key, record)
+        self._flush()
+
+    def update(self, key, record):
+        self._records.update(key, record)
+        self._flush()
+
+    def delete(self, key):
+        self._records.delete(key)
+        self._flush()
+
+    def write_all(self, records):
+        self._records = _RecordSet(self.key_field, records)
+        self._flush()
+
+    def _flush(self):
+        atomic_write_bytes(self.path, encode_snapshot(self._records.records()))
+
+# =============================================================================
+# Journaled Backend — Snapshot plus append-only change log
+# =============================================================================
+
+class JournaledStorage(AnimalStorage):
+    """
+    Keeps animals.json as a snapshot and records each insert, update or delete
+    as one JSON line appended to a journal file (animals.json.journal).
+
+    Each append is a single write followed by fsync, so a crash can at worst
+    leave a torn final line, which is ignored on replay. Bulk inserts are
+    written as one "batch" line so they are all-or-nothing too. Once the journal holds
+    compact_threshold entries a background thread folds it into a new snapshot.
+
+    Compaction protocol: the new snapshot is written to a temp file, then the
+    replacement journal (any entries appended during compaction) is written to
+    a ".next" file headed by the SHA-1 of the new snapshot, then the snapshot
+    and journal are renamed into place. If a crash interrupts the renames, the
+    header tells load() whether the ".next" journal belongs to the snapshot on
+    disk, so entries are never lost or applied twice.
+
+    Sharing: appends, compactions and rewrites happen under an advisory lock
+    on animals.json.lock, so several processes can open the same file. The
+    data carries a generation counter: the journal header stores the
+    generation of its snapshot and every journal line adds one. Each process
+    remembers the generation and journal position it has seen; poll() reads
+    only the lines appended since, and after another process compacts, the
+    header's generation says how many lines of the new journal are already
+    known. Anything else (a rewrite, a restore) reports that a reload is due.
+
+    Durability: "immediate" writes and fsyncs each change before returning.
+    "batched" queues it and returns; a writer thread waits flush_delay for
+    more changes, folds the burst together (coalesce_entries) and writes it
+    as one line with one fsync, then calls on_flush(saved, rejected_keys,
+    error) from that thread. A failed write keeps the changes queued and is
+    retried. If another process changed a queued record after this one
+    checked it, the queued change is dropped and its key reported in
+    rejected_keys rather than silently overwriting the other change.
+
+    Binary snapshot: with binary_snapshot set, iter_records() maps
+    animals.json.bin when it was made from the animals.json on disk (same
+    size and mtime) and hands out its records without parsing anything.
+    Otherwise the JSON is parsed as usual and the binary copy is rebuilt
+    from it on a background thread, ready for the next load. Only the JSON
+    is ever written by changes and compactions.
+    """
+    def __init__(self, path, key_field="id", journal_path=None, compact_threshold=1000,
+                 durability="immediate", flush_delay=0.25, binary_snapshot=False):
+        super().__init__(path, key_field)
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}")
+        self.journal_path = journal_path or path + ".journal"
+        self.next_journal_path = self.journal_path + ".next"
+        self.compact_threshold = compact_threshold
+        self.durability = durability
+        self.flush_delay = flush_delay
+        self.binary_snapshot = binary_snapshot
+        self.binary_path = path + BINARY_SUFFIX
+        self.on_flush = None
+        self._lock = FileLock(path + ".lock")  #also serializes this process's threads
+        self._journal = None
+        self._entries = 0
+        self._compactor = None
+        self.compaction_error = None
+        #what this process has seen of the files, to spot other writers' changes
+        self.generation = 0
+        self._journal_identity = None   #(device, inode) of the journal last read
+        self._journal_offset = 0        #bytes of it read or written so far
+        self._snapshot_signature = None
+        self._external = []             #other processes' entries not yet handed out
+        self._needs_reload = False
+        #write-behind queue ("batched" durability)
+        self._queued = []
+        self._rejected = []             #queued keys dropped after colliding with another process
+        self._in_flight = 0             #changes taken off the queue, not yet reported
+        self._queue_changed = threading.Condition()
+        self._writer = None
+        self._closing = False
+
+    # -------------------------------------------------------------------------
+
+    def load(self):
+        """
+        Replays the journal on top of the snapshot.
+
+        Raises:
+            json.JSONDecodeError if the snapshot itself is corrupt; the journal
+            is left untouched so no compaction can overwrite the bad snapshot.
+        """
+        self.flush()
+        with self._lock:
+            self._recover()
+            self._repair_tail()
+            records, _ = read_snapshot(self.path)
+            record_set = _RecordSet(self.key_field, records)
+            for change in self._read_all():
+                for entry in change:
+                    record_set.apply(entry)
+            self.compaction_error = None
+            return record_set.records()
+
+    def iter_records(self, on_error=None):
+        """
+        Streams the snapshot record by record with the journal applied.
+
+        The journal is read first and reduced to the final state of every key
+        it touches; snapshot records are then yielded as they are parsed,
+        replaced or dropped according to that state, and records inserted by
+        the journal follow at the end. A malformed snapshot record is skipped
+        and reported through on_error(element_number, message).
+
+        With binary_snapshot, records come from the binary copy as read-only
+        MappedRecord mappings when it is current.
+        """
+        self.flush()
+        mapped = None
+        with self._lock:
+            self._recover()
+            self._repair_tail()
+            changes = self._read_all()
+            self.compaction_error = None
+            try:
+                #opened under the lock so a compaction elsewhere cannot swap it mid-read
+                snapshot = open(self.path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                snapshot = None
+            if snapshot is not None and self.binary_snapshot:
+                stat = os.fstat(snapshot.fileno())
+                mapped = BinarySnapshot.open(self.binary_path, stat.st_size, stat.st_mtime_ns)
+
+        pending = {}  #key -> latest record, or None once deleted
+        for change in changes:
+            for entry in change:
+                pending[entry["key"]] = entry.get("record") if entry.get("op") != "delete" else None
+
+        if mapped is not None:
+            snapshot.close()
+            records = iter(mapped)
+        elif snapshot is not None and self.binary_snapshot:
+            records = self._parse_and_rebuild(snapshot, stat, on_error)
+        elif snapshot is not None:
+            records = iter_json_records(snapshot, on_error)
+        if snapshot is not None:
+            for record in records:
+                key = record.get(self.key_field, "")
+                if key in pending:
+                    record = pending.pop(key)
+                    if record is None:
+                        continue
+                yield record
+        for record in pending.values():
+            if record is not None:
+                yield record
+
+    def _parse_and_rebuild(self, snapshot, stat, on_error):
+        """
+        Parses the JSON snapshot, then writes its records to the binary copy
+        on a background thread (unless some could not be read, so the next
+        load reports them again).
+        """
+        parsed = []
+        failed = []
+
+        def note_error(number, message):
+            failed.append(number)
+            if on_error is not None:
+                on_error(number, message)
+
+        for record in iter_json_records(snapshot, note_error):
+            parsed.append(record)
+            yield record
+        if not failed:
+            threading.Thread(target=self._write_binary, args=(parsed, stat.st_size, stat.st_mtime_ns),
+                             name="binary-snapshot", daemon=True).start()
+
+    @metrics.timed("storage.write_binary")
+    def _write_binary(self, records, source_size, source_mtime_ns):
+        try:
+            written = write_binary_snapshot(self.binary_path, records, source_size, source_mtime_ns)
+        except OSError:
+            return  #only a cache (e.g. the file is mapped elsewhere on Windows); the JSON is used next time
+        metrics.count("storage.bytes_written", written)
+
+    def insert(self, key, record):
+        self._append({"op": "insert", "key": key, "record": record})
+
+    def insert_many(self, items):
+        """
+        Appends every insert as one "batch" journal line, so a torn write
+        drops the whole batch rather than leaving part of it.
+        """
+        entries = [{"op": "insert", "key": key, "record": record} for key, record in items]
+        if entries:
+            self._append({"op": "batch", "entries": entries}, len(entries))
+
+    def update(self, key, record):
+        self._append({"op": "update", "key": key, "record": record})
+
+    def delete(self, key):
+        self._append({"op": "delete", "key": key})
+
+    def write_all(self, records):
+        """
+        Writes records as a fresh snapshot and starts an empty journal. The
+        generation moves past every change made so far, so other processes
+        sharing the file reload it. A compaction still running notices the
+        swap and drops its result.
+        """
+        data = encode_snapshot(records)
+        with self._lock:
+            with self._queue_changed:
+                self._queued = []  #records already include anything still queued
+            self._sync()
+            self.generation += 1
+            self._swap_in(data, b"", self.generation)
+            self._entries = 0
+            self._external = []  #superseded by records
+            self._needs_reload = False
+
+    def poll(self):
+        """
+        Returns the changes other processes saved since this storage last
+        loaded, wrote or polled (see AnimalStorage.poll). Costs two stat
+        calls when nothing changed; otherwise only new journal lines are read.
+        In "batched" durability it never waits for a write in progress; it
+        reports nothing and the changes are picked up on the next poll.
+        """
+        if not self._lock.acquire(blocking=self.durability != "batched"):
+            return []
+        try:
+            self._sync()
+            return self._take_external()
+        finally:
+            self._lock.release()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        See AnimalStorage.transaction. In "batched" durability the caller does
+        not wait for a write in progress: it checks against what it already
+        knows, and a collision with a change it missed is caught when the
+        queue is written (the queued change is rejected).
+        """
+        if not self._lock.acquire(blocking=self.durability != "batched"):
+            yield []
+            return
+        try:
+            self._sync()
+            yield self._take_external()
+        finally:
+            self._lock.release()
+
+    def close(self):
+        """
+        Writes any queued changes, then releases the files.
+
+        Raises:
+            OSError if queued changes could not be written; the files are
+            still released
+        """
+        try:
+            self._stop_writer()
+            self.flush()
+        finally:
+            self._wait_for_compaction()
+            with self._lock:
+                self._close_journal()
+            self._lock.close()
+
+    # -------------------------------------------------------------------------
+
+    def _append(self, entry, count=1):
+        if self.durability == "batched":
+            self._enqueue(entry["entries"] if entry["op"] == "batch" else [entry])
+        elif self._write_line(entry, count):
+            self.compact_in_background()
+
+    def _write_line(self, entry, count):
+        """
+        Appends one journal line and fsyncs it.
+
+        Returns:
+            True when the journal has grown enough to be compacted
+        """
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._sync()
+            if self._journal is None:
+                self._journal = open(self.journal_path, "ab")
+            with metrics.timer("storage.journal_write"):
+                self._journal.write(line)
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            metrics.count("storage.bytes_written", len(line))
+            self._journal_identity = _file_identity(os.fstat(self._journal.fileno()))
+            self._journal_offset += len(line)
+            self.generation += 1
+            self._entries += count
+            return self._entries >= self.compact_threshold
+
+    def _read_changes(self, offset=0):
+        """
+        Reads the journal from byte offset on.
+
+        Returns:
+            (header, changes, end offset, file identity) as parse_journal()
+            splits them; a missing journal has no header and no changes.
+        """
+        try:
+            with open(self.journal_path, "rb") as file:
+                identity = _file_identity(os.fstat(file.fileno()))
+                file.seek(offset)
+                raw = file.read()
+        except FileNotFoundError:
+            return None, [], 0, None
+        header, changes, used = parse_journal(raw)
+        return header, changes, offset + used, identity
+
+    def _read_all(self):
+        """
+        Reads the whole journal and marks it as seen. Must be called with the
+        lock held.
+
+        Returns:
+            The journal's changes (lists of entries, one per line)
+        """
+        header, changes, end, identity = self._read_changes()
+        self._journal_identity = identity
+        self._journal_offset = end
+        self._snapshot_signature = _snapshot_signature(self.path)
+        self.generation = (header or {}).get("generation", 0) + len(changes)
+        self._entries = sum(len(change) for change in changes)
+        self._external = []
+        self._needs_reload = False
+        return changes
+
+    def _sync(self):
+        """
+        Catches up with whatever other processes did to the files since this
+        one last looked, queueing their entries for poll() and transaction().
+        Must be called with the lock held.
+        """
+        try:
+            stat = os.stat(self.journal_path)
+            identity = _file_identity(stat)
+        except FileNotFoundError:
+            stat, identity = None, None
+        signature = _snapshot_signature(self.path)
+        if identity == self._journal_identity and signature == self._snapshot_signature:
+            size = stat.st_size if stat is not None else 0
+            if size == self._journal_offset:
+                return  #nothing new
+            if size > self._journal_offset:
+                _, changes, end, _ = self._read_changes(self._journal_offset)
+                if end < size:
+                    #a writer crashed mid-line; nobody else can be writing now
+                    with open(self.journal_path, "rb+") as file:
+                        file.truncate(end)
+                self._journal_offset = end
+                self.generation += len(changes)
+                self._entries += sum(len(change) for change in changes)
+                self._take_in([entry for change in changes for entry in change])
+                return
+
+        #the journal or snapshot was replaced: usually another process compacted
+        self._close_journal()  #the append handle may point at the old journal
+        header, changes, end, new_identity = self._read_changes()
+        known = self.generation - (header or {}).get("generation", 0)
+        compacted = new_identity != self._journal_identity and 0 <= known <= len(changes)
+        self._journal_identity = new_identity
+        self._journal_offset = end
+        self._snapshot_signature = signature
+        self.generation = (header or {}).get("generation", 0) + len(changes)
+        self._entries = sum(len(change) for change in changes)
+        if compacted:
+            self._take_in([entry for change in changes[known:] for entry in change])
+        else:
+            self._needs_reload = True  #rewritten or restored: the lines do not follow on
+
+    def _take_in(self, entries):
+        """
+        Queues other processes' entries for the caller and drops any queued
+        write-behind change to a record they touched (see _flush_queued).
+        """
+        self._external.extend(entries)
+        with self._queue_changed:
+            if not self._queued or not entries:
+                return
+            touched = {entry["key"] for entry in entries}
+            kept = []
+            for entry in self._queued:
+                if entry["op"] != "insert" and entry["key"] in touched:
+                    self._rejected.append(entry["key"])
+                else:
+                    kept.append(entry)
+            self._queued = kept
+
+    def _take_external(self):
+        """
+        Hands out queued external changes (None if a reload is due).
+        """
+        if self._needs_reload:
+            self._needs_reload = False
+            self._external = []
+            return None
+        changes, self._external = self._external, []
+        return changes
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _recover(self):
+        """
+        Finishes or discards a compaction that was interrupted by a crash.
+        """
+        if not os.path.exists(self.next_journal_path):
+            return
+        with open(self.next_journal_path, "rb") as file:
+            header_line = file.readline()
+        try:
+            header = json.loads(header_line)
+        except ValueError:
+            header = {}
+        _, raw = read_snapshot_bytes(self.path)
+        if header.get("snapshot") == hashlib.sha1(raw).hexdigest():
+            os.replace(self.next_journal_path, self.journal_path)
+        else:
+            os.remove(self.next_journal_path)
+
+    def _repair_tail(self):
+        """
+        Cuts off a torn final line left by a crash so later appends start on a
+        fresh line instead of being glued to the broken one.
+        """
+        try:
+            with open(self.journal_path, "rb+") as file:
+                raw = file.read()
+                if raw and not raw.endswith(b"\n"):
+                    file.truncate(raw.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def _swap_in(self, snapshot_data, journal_tail, generation):
+        """
+        Installs a new snapshot, whose contents are at generation, and journal
+        following the compaction protocol. Must be called with the lock held.
+        """
+        self._close_journal()
+        header = {"op": "base", "snapshot": hashlib.sha1(snapshot_data).hexdigest(), "generation": generation}
+        header_line = json.dumps(header).encode("utf-8") + b"\n"
+        temp_snapshot = self.path + ".tmp"
+        with open(temp_snapshot, "wb") as file:
+            file.write(snapshot_data)
+            file.flush()
+            os.fsync(file.fileno())
+        metrics.count("storage.bytes_written", len(snapshot_data))
+        atomic_write_bytes(self.next_journal_path, header_line + journal_tail)
+        os.replace(temp_snapshot, self.path)
+        os.replace(self.next_journal_path, self.journal_path)
+        self._journal_identity = _file_identity(os.stat(self.journal_path))
+        self._journal_offset = len(header_line) + len(journal_tail)
+        self._snapshot_signature = _snapshot_signature(self.path)
+
+    # -------------------------------------------------------------------------
+    # Write-behind — "batched" durability
+    # -------------------------------------------------------------------------
+
+    def pending(self):
+        with self._queue_changed:
+            return len(self._queued) + self._in_flight
+
+    def flush(self):
+        """
+        Writes queued changes now, on the calling thread.
+
+        Raises:
+            OSError if they could not be written (they stay queued)
+        """
+        error = self._flush_queued()
+        if error is not None:
+            raise error
+
+    def _enqueue(self, entries):
+        with self._queue_changed:
+            self._queued.extend(entries)
+            if self._writer is None:
+                self._closing = False
+                self._writer = threading.Thread(target=self._write_behind, name="journal-writer", daemon=True)
+                self._writer.start()
+            self._queue_changed.notify()
+
+    def _write_behind(self):
+        delay = self.flush_delay
+        while True:
+            with self._queue_changed:
+                self._queue_changed.wait_for(lambda: self._queued or self._closing)
+                if self._closing:
+                    return  #close() writes what is left
+                #let the rest of a burst of edits arrive, unless closing
+                self._queue_changed.wait_for(lambda: self._closing, timeout=delay)
+            error = self._flush_queued()
+            delay = self.flush_delay if error is None else RETRY_DELAY
+
+    def _stop_writer(self):
+        with self._queue_changed:
+            writer = self._writer
+            self._closing = True
+            self._queue_changed.notify()
+        if writer is not None:
+            writer.join()
+        self._writer = None
+
+    def _flush_queued(self):
+        """
+        Writes the queue as one journal line and reports the outcome through
+        on_flush. Returns the OSError that stopped the write, or None.
+        """
+        due = False
+        with self._lock:
+            #catching up first rejects queued changes that collide with another process's
+            self._sync()
+            with self._queue_changed:
+                entries, self._queued = coalesce_entries(self._queued), []
+                rejected, self._rejected = self._rejected, []
+                self._in_flight = len(entries) + len(rejected)
+            if not entries and not rejected:
+                return None
+            try:
+                if entries:
+                    line = entries[0] if len(entries) == 1 else {"op": "batch", "entries": entries}
+                    due = self._write_line(line, len(entries))
+            except OSError as error:
+                with self._queue_changed:
+                    self._queued[:0] = entries  #keep them, in order, for the retry
+                    self._in_flight = 0
+                self._report(0, rejected, error)
+                return error
+        self._report(len(entries), rejected, None)
+        with self._queue_changed:
+            self._in_flight = 0
+        if due:
+            self.compact_in_background()
+        return None
+
+    def _report(self, saved, rejected, error):
+        if self.on_flush is not None:
+            self.on_flush(saved, rejected, error)
+
+    # -------------------------------------------------------------------------
+    # Compaction — fold the journal into a new snapshot
+    # -------------------------------------------------------------------------
+
+    def compact_in_background(self):
+        """
+        Starts a compaction thread unless one is already running.
+        """
+        with self._lock:
+            if self.compaction_error is not None:
+                return  #the snapshot is unreadable; leave it for a person to repair
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self._compact_safely, name="journal-compaction", daemon=True)
+            self._compactor.start()
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except ValueError as error:
+            #corrupt snapshot: never overwrite it, keep appending to the journal
+            self.compaction_error = error
+        except OSError:
+            pass  #e.g. the snapshot is open elsewhere; retried on the next append
+
+    @metrics.timed("storage.compact")
+    def compact(self):
+        """
+        Rewrites the snapshot to include every journal entry written so far.
+        Appends may continue while the new snapshot is being built; they are
+        carried over into the replacement journal. If another process swaps
+        in its own compaction meanwhile, this one is dropped.
+        """
+        with self._lock:
+            self._recover()
+            try:
+                journal = open(self.journal_path, "rb")
+            except FileNotFoundError:
+                return
+            try:
+                snapshot = open(self.path, "rb")
+            except FileNotFoundError:
+                snapshot = None
+            identity = _file_identity(os.fstat(journal.fileno()))
+            signature = _snapshot_signature(self.path)
+
+        #build from the files as they were at the cut, without holding the lock
+        with journal:
+            header, changes, cut = parse_journal(journal.read())
+        raw = b""
+        if snapshot is not None:
+            with snapshot:
+                raw = snapshot.read()
+        record_set = _RecordSet(self.key_field, json.loads(raw.decode("utf-8")) if raw.strip() else [])
+        for change in changes:
+            for entry in change:
+                record_set.apply(entry)
+        data = encode_snapshot(record_set.records())
+
+        with self._lock:
+            self._sync()
+            if (self._journal_identity, self._snapshot_signature) != (identity, signature):
+                return  #another process compacted or rewrote the data first
+            with open(self.journal_path, "rb") as file:
+                file.seek(cut)
+                tail = file.read()
+            self._swap_in(data, tail, (header or {}).get("generation", 0) + len(changes))
+            self._entries = sum(len(change) for change in parse_journal(tail)[1])
+
+    def _wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
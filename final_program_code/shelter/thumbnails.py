@@ -0,0 +1,269 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Thumbnail Cache
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Keeps profile photos off the Tk main thread.
+
+        - ThumbnailCache  : Small on-disk thumbnails named by the SHA-256 of
+                            the source image's content. A source is only
+                            re-hashed when its mtime or size changes. JPEGs
+                            are decoded at reduced scale with Image.draft().
+        - ThumbnailLoader : Decodes thumbnails on worker threads and hands
+                            them to the GUI as PhotoImages through root.after,
+                            keeping the most recent ones in a bounded LRU.
+
+        Pillow (and, for ThumbnailLoader, tkinter) is imported on first use,
+        so importing this module costs nothing for headless callers.
+
+    Dependencies:
+        - Pillow (PIL)       : Image decoding, scaling and Tk conversion
+        - concurrent.futures : Worker threads for decoding
+        - assets             : Hashes of photos already in the asset store
+        - metrics            : Decode timings
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import hashlib
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .assets import HASH_CHUNK_SIZE, digest_of
+
+THUMBNAIL_SIZE = (300, 300)
+
+# =============================================================================
+# Helpers — Content hashing and thumbnail rendering
+# =============================================================================
+
+def file_signature(path):
+    """
+    Returns (absolute path, mtime_ns, size): changes whenever the file does.
+    """
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def hash_file(path):
+    """
+    SHA-256 of a file's content, read in chunks so large photos are never
+    held in memory whole.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@metrics.timed("thumbnail.render")
+def render_thumbnail(source, size=THUMBNAIL_SIZE):
+    """
+    Decodes source scaled down to fit within size. For JPEGs, draft() makes
+    the decoder itself downscale by up to 8x, so a 12-megapixel photo never
+    has to be fully decoded.
+    """
+    from PIL import Image, ImageOps  # Requires Pillow library
+
+    with Image.open(source) as img:
+        img.draft("RGB", size)
+        img = ImageOps.exif_transpose(img)  #phone photos store rotation in EXIF
+        img.thumbnail(size)
+        img.load()
+        return img
+
+# =============================================================================
+# Thumbnail Cache — Content-addressed thumbnails on disk
+# =============================================================================
+
+class ThumbnailCache:
+    """
+    On-disk thumbnail cache.
+
+    Thumbnails are stored as <sha256 of source>.thumb (PNG when the image has
+    transparency, JPEG otherwise), so the same photo uploaded for several
+    animals is only thumbnailed once. index.json remembers which content hash
+    each source path had at a given mtime and size, so unchanged sources are
+    not re-hashed.
+    """
+    def __init__(self, cache_dir, size=THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as file:
+                    self._index = json.load(file)
+            except (FileNotFoundError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._index, file)
+        os.replace(temp_path, self.index_path)
+
+    def content_hash(self, source):
+        """
+        Returns the content hash for source, re-hashing only when its mtime or
+        size differ from what the index recorded. Photos in the asset store
+        are named by their hash, so they are never read here.
+        """
+        known = digest_of(source)
+        if known:
+            return known
+        path, mtime_ns, size = file_signature(source)
+        with self._lock:
+            known = self._load_index().get(path)
+        if known and known["mtime_ns"] == mtime_ns and known["size"] == size:
+            return known["hash"]
+        digest = hash_file(source)
+        with self._lock:
+            self._load_index()[path] = {"mtime_ns": mtime_ns, "size": size, "hash": digest}
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._save_index()
+        return digest
+
+    def thumbnail_path(self, source):
+        """
+        Returns the cached thumbnail file for source, creating it if needed.
+        Safe to call from worker threads.
+        """
+        target = os.path.join(self.cache_dir, self.content_hash(source) + ".thumb")
+        if not os.path.exists(target):
+            img = render_thumbnail(source, self.size)
+            has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+            os.makedirs(self.cache_dir, exist_ok=True)  #content_hash() skips it for asset store photos
+            temp_path = f"{target}.{threading.get_ident()}.tmp"
+            if has_alpha:
+                img.save(temp_path, "PNG")
+            else:
+                img.convert("RGB").save(temp_path, "JPEG", quality=85)
+            os.replace(temp_path, target)
+        return target
+
+    @metrics.timed("thumbnail.decode")
+    def load(self, source):
+        """
+        Returns the decoded thumbnail image for source.
+        """
+        from PIL import Image  # Requires Pillow library
+
+        with Image.open(self.thumbnail_path(source)) as img:
+            img.load()
+            return img
+
+# =============================================================================
+# Thumbnail Loader — Background decoding with an LRU of PhotoImages
+# =============================================================================
+
+class ThumbnailLoader:
+    """
+    Delivers thumbnails to the GUI without blocking the event loop.
+
+    request() returns at once; the image is read on a worker thread and the
+    callback receives an ImageTk.PhotoImage (or None on failure) on the Tk
+    thread. PhotoImages must be created on the Tk thread, so workers only
+    produce PIL images and the conversion happens in poll().
+    """
+    def __init__(self, root, cache, max_photos=64, workers=2, poll_ms=30):
+        self.root = root
+        self.cache = cache
+        self.max_photos = max_photos
+        self.poll_ms = poll_ms
+        self._photos = OrderedDict()  #file signature -> PhotoImage
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self._polling = False
+        self._pending = 0  #decodes submitted but not yet delivered
+
+    def request(self, source, callback):
+        """
+        Calls callback(photo) on the Tk thread once the thumbnail is ready.
+        """
+        try:
+            key = file_signature(source)
+        except OSError:
+            callback(None)
+            return
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            callback(photo)
+            return
+        self._pending += 1
+        self._executor.submit(self._decode, key, source, callback)
+        self._start_polling()
+
+    def prefetch(self, source):
+        """
+        Builds the on-disk thumbnail in the background (e.g. right after upload).
+        """
+        self._executor.submit(self._prefetch, source)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -------------------------------------------------------------------------
+
+    def _prefetch(self, source):
+        try:
+            self.cache.thumbnail_path(source)
+        except Exception:
+            pass  #unreadable images are reported when they are displayed
+
+    def _decode(self, key, source, callback):
+        try:
+            img = self.cache.load(source)
+        except Exception:
+            img = None  #any failure (decompression bomb, corrupt file) must still post, or poll() never drains
+        self._results.put((key, img, callback))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        """
+        Converts finished decodes to PhotoImages and runs their callbacks.
+        """
+        from PIL import ImageTk  #imports tkinter, so only once a GUI is running
+
+        while True:
+            try:
+                key, img, callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            photo = None
+            if img is not None:
+                try:
+                    with metrics.timer("thumbnail.to_tk"):
+                        photo = ImageTk.PhotoImage(img)
+                except Exception:
+                    pass  #shown like an unreadable file
+            if photo is not None:
+                self._photos[key] = photo
+                self._photos.move_to_end(key)
+                while len(self._photos) > self.max_photos:
+                    self._photos.popitem(last=False)
+            self._pending -= 1
+            callback(photo)
+        if self._pending:
+            self.root.after(self.poll_ms, self.poll)
+        else:
+            self._polling = False
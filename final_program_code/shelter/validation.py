@@ -0,0 +1,97 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Record Validation
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        The rules the intake and update forms apply before saving an animal,
+        kept free of tkinter so the same checks run in the GUI, in the bulk
+        import tool and in worker processes.
+
+        Records use the Animal.to_dict() keys ("name", "gender", "type", ...).
+        The intake date is not a form field: new animals are stamped with
+        today's date unless the input (e.g. a bulk import) supplies one.
+
+    Dependencies:
+        - datetime           : DOB format check
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import datetime
+
+TEXT_FIELDS = ("type", "name", "gender", "breed", "weight", "dob",
+               "microchip", "health_notes", "description", "image_path")
+
+# =============================================================================
+# Cleaning and Validation
+# =============================================================================
+
+def clean_record(fields):
+    """
+    Returns a copy of fields with every text field stripped (missing ones
+    blank), gender upper-cased and type lower-cased, as the forms do.
+    """
+    record = dict(fields)
+    for field in TEXT_FIELDS + ("intake",):
+        value = record.get(field)
+        record[field] = "" if value is None else str(value).strip()
+    record["gender"] = record["gender"].upper()
+    record["type"] = record["type"].lower()
+    return record
+
+
+def validation_errors(record, new=True):
+    """
+    Checks a cleaned record against the form rules.
+
+    Args:
+        record (dict) : Output of clean_record()
+        new (bool)    : Intake rules (type and breed required) rather than
+                        the looser rules for updating an existing animal
+    Returns:
+        List of error messages; empty when the record is valid
+    """
+    errors = []
+    if not record["name"]:
+        errors.append("Name is required.")
+    if record["gender"] not in ("M", "F"):
+        errors.append("Gender must be M or F.")
+    if new and not record["type"]:
+        errors.append("Type is required.")
+    if new and not record["breed"]:
+        errors.append("Breed is required.")
+    for field, label in (("dob", "DOB"), ("intake", "Intake date")):
+        if record.get(field):
+            try:
+                datetime.datetime.strptime(record[field], "%Y-%m-%d")
+            except ValueError:
+                errors.append(f"{label} must be in YYYY-MM-DD format.")
+    return errors
+
+
+def stamp_intake(record, today=None):
+    """
+    Dates a new animal's intake today (or today, a datetime.date) unless the
+    record already has an intake date.
+    """
+    if not record.get("intake"):
+        record["intake"] = (today or datetime.date.today()).isoformat()
+    return record
+
+
+def validate_rows(rows):
+    """
+    Cleans and validates a chunk of (row_number, fields) pairs. Kept at module
+    level so it can be sent to a ProcessPoolExecutor.
+
+    Returns:
+        List of (row_number, cleaned record, error messages)
+    """
+    results = []
+    for number, fields in rows:
+        record = stamp_intake(clean_record(fields))
+        results.append((number, record, validation_errors(record)))
+    return results
@@ -0,0 +1,96 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Tests: Binary Snapshot
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Records written to animals.json.bin must read back exactly as they
+        were written, including weights and dates the fixed columns cannot
+        hold (kept in the extras), and a stale copy must not be used.
+
+        Usage (from the final_program_code folder):
+            python -m unittest discover tests
+
+    Dependencies:
+        - unittest, tempfile : Standard library only
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import os
+import sys
+import tempfile
+import unittest
+
+from shelter.binary_snapshot import BINARY_SUFFIX, BinarySnapshot, MappedRecord, write_binary_snapshot
+from shelter.storage import JournaledStorage, atomic_write_bytes, encode_snapshot
+
+WEIGHTS = ["", "9", "9.5", "9.50", "09", "10.0", " 7", "nan", "NaN", "inf", "-0", "1e3", "heavy", 12, 3.5]
+DATES = ["", "2020-01-05", "2020-1-5", "0001-01-01", "9999-12-31", "2020-02-30", "sometime", " 2020-01-05"]
+
+
+def record(number, **fields):
+    result = {"id": f"a{number}", "type": "dog", "name": f"Rex {number}", "gender": "M", "breed": "Lab",
+              "weight": "10", "dob": "2020-01-01", "microchip": "", "health_notes": "", "description": "",
+              "image_path": "", "intake": "2024-05-01", "rev": 0}
+    result.update(fields)
+    return result
+
+
+@unittest.skipIf(sys.byteorder != "little", "binary snapshots are only mapped on little-endian machines")
+class BinarySnapshotRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "animals.json.bin")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def round_trip(self, records):
+        write_binary_snapshot(self.path, records)
+        snapshot = BinarySnapshot.open(self.path)
+        self.assertIsNotNone(snapshot)
+        self.addCleanup(snapshot.close)
+        return [dict(MappedRecord(snapshot, row)) for row in range(len(snapshot))]
+
+    def test_weights_read_back_as_written(self):
+        records = [record(number, weight=weight) for number, weight in enumerate(WEIGHTS)]
+        for written, read in zip(records, self.round_trip(records)):
+            self.assertEqual(read, written, f"weight {written['weight']!r}")
+
+    def test_dates_read_back_as_written(self):
+        records = [record(number, dob=date, intake=date) for number, date in enumerate(DATES)]
+        for written, read in zip(records, self.round_trip(records)):
+            self.assertEqual(read, written, f"date {written['dob']!r}")
+
+    def test_odd_records_read_back_as_written(self):
+        records = [record(0, rev=2 ** 40),                   #too big for the revision column
+                   record(1, colour="brown"),                #key the columns do not know
+                   {"id": "a2", "name": "Only a name"},      #keys missing
+                   record(3, name="Rëx 🐕", health_notes="line\nbreak\x00nul")]
+        self.assertEqual(self.round_trip(records), records)
+
+    def test_stale_copy_is_not_used(self):
+        write_binary_snapshot(self.path, [record(0)], source_size=100, source_mtime_ns=5)
+        self.assertIsNone(BinarySnapshot.open(self.path, 101, 5))
+        snapshot = BinarySnapshot.open(self.path, 100, 5)
+        self.assertIsNotNone(snapshot)
+        snapshot.close()
+
+    def test_storage_reads_the_same_records_from_either_copy(self):
+        json_path = os.path.join(self.workdir.name, "animals.json")
+        records = [record(number, weight=weight) for number, weight in enumerate(WEIGHTS)]
+        atomic_write_bytes(json_path, encode_snapshot(records))
+        stat = os.stat(json_path)
+        write_binary_snapshot(json_path + BINARY_SUFFIX, records, stat.st_size, stat.st_mtime_ns)
+        storage = JournaledStorage(json_path, binary_snapshot=True)
+        self.addCleanup(storage.close)
+        mapped = list(storage.iter_records())
+        self.assertIsInstance(mapped[0], MappedRecord)
+        self.assertEqual([dict(item) for item in mapped], records)
+
+
+if __name__ == '__main__':
+    unittest.main()
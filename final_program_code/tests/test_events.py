@@ -0,0 +1,148 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Tests: Change Events
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        coalesce() merging (kinds, LOCAL / REMOTE origin, RELOAD), ChangeBus
+        batching, and the ChangeFeed only recording this process's changes.
+
+        Usage (from the final_program_code folder):
+            python -m unittest discover tests
+
+    Dependencies:
+        - unittest, tempfile : Standard library only
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import os
+import tempfile
+import unittest
+
+from shelter.events import (DELETE, INSERT, LOCAL, RELOAD, REMOTE, UPDATE, ChangeBus, ChangeEvent,
+                            ChangeFeed, coalesce, read_feed)
+
+V1, V2, V3 = {"name": "Rex"}, {"name": "Max"}, {"name": "Buddy"}
+
+
+def summary(events):
+    return [(event.kind, event.animal_id, event.before, event.after, event.origin) for event in events]
+
+# =============================================================================
+# coalesce
+# =============================================================================
+
+class CoalesceTest(unittest.TestCase):
+    def test_updates_merge_to_first_before_and_last_after(self):
+        events = [ChangeEvent(UPDATE, "a", V1, V2), ChangeEvent(UPDATE, "a", V2, V3)]
+        self.assertEqual(summary(coalesce(events)), [(UPDATE, "a", V1, V3, LOCAL)])
+
+    def test_insert_then_update_is_an_insert(self):
+        events = [ChangeEvent(INSERT, "a", None, V1), ChangeEvent(UPDATE, "a", V1, V2)]
+        self.assertEqual(summary(coalesce(events)), [(INSERT, "a", None, V2, LOCAL)])
+
+    def test_update_then_delete_is_a_delete(self):
+        events = [ChangeEvent(UPDATE, "a", V1, V2), ChangeEvent(DELETE, "a", V2, None)]
+        self.assertEqual(summary(coalesce(events)), [(DELETE, "a", V1, None, LOCAL)])
+
+    def test_insert_then_delete_disappears(self):
+        events = [ChangeEvent(INSERT, "a", None, V1), ChangeEvent(DELETE, "a", V1, None),
+                  ChangeEvent(INSERT, "b", None, V2)]
+        self.assertEqual(summary(coalesce(events)), [(INSERT, "b", None, V2, LOCAL)])
+
+    def test_animals_keep_the_order_they_first_changed_in(self):
+        events = [ChangeEvent(INSERT, "b", None, V1), ChangeEvent(INSERT, "a", None, V2),
+                  ChangeEvent(UPDATE, "b", V1, V3)]
+        self.assertEqual([event.animal_id for event in coalesce(events)], ["b", "a"])
+
+    def test_local_then_remote_stays_local(self):
+        events = [ChangeEvent(UPDATE, "a", V1, V2, LOCAL), ChangeEvent(UPDATE, "a", V2, V3, REMOTE)]
+        self.assertEqual(summary(coalesce(events)), [(UPDATE, "a", V1, V3, LOCAL)])
+
+    def test_remote_then_local_is_local(self):
+        events = [ChangeEvent(UPDATE, "a", V1, V2, REMOTE), ChangeEvent(UPDATE, "a", V2, V3, LOCAL)]
+        self.assertEqual(summary(coalesce(events)), [(UPDATE, "a", V1, V3, LOCAL)])
+
+    def test_remote_only_stays_remote(self):
+        events = [ChangeEvent(INSERT, "a", None, V1, REMOTE), ChangeEvent(UPDATE, "a", V1, V2, REMOTE)]
+        self.assertEqual(summary(coalesce(events)), [(INSERT, "a", None, V2, REMOTE)])
+
+    def test_reload_replaces_everything_before_it(self):
+        events = [ChangeEvent(UPDATE, "a", V1, V2), ChangeEvent(RELOAD, origin=REMOTE),
+                  ChangeEvent(UPDATE, "b", V2, V3)]
+        self.assertEqual(summary(coalesce(events)),
+                         [(RELOAD, "", None, None, REMOTE), (UPDATE, "b", V2, V3, LOCAL)])
+
+    def test_json_round_trip(self):
+        event = ChangeEvent(UPDATE, "a", V1, V2, REMOTE)
+        self.assertEqual(summary([ChangeEvent.from_json(event.to_json())]), summary([event]))
+
+# =============================================================================
+# ChangeBus and ChangeFeed
+# =============================================================================
+
+class ChangeBusTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = ChangeBus()
+        self.delivered = []
+        self.bus.subscribe(self.delivered.append)
+
+    def test_deliver_hands_out_one_coalesced_batch(self):
+        self.bus.publish(ChangeEvent(INSERT, "a", None, V1))
+        self.bus.publish(ChangeEvent(UPDATE, "a", V1, V2))
+        self.assertEqual(self.bus.deliver(), 1)
+        self.assertEqual([summary(batch) for batch in self.delivered], [[(INSERT, "a", None, V2, LOCAL)]])
+        self.assertEqual(self.bus.deliver(), 0)
+
+    def test_batch_holds_delivery_until_it_ends(self):
+        with self.bus.batch():
+            self.bus.publish(ChangeEvent(INSERT, "a", None, V1))
+            self.assertEqual(self.bus.deliver(), 0)
+            self.bus.publish(ChangeEvent(INSERT, "b", None, V2))
+        self.assertEqual([len(batch) for batch in self.delivered], [2])
+
+    def test_unsubscribed_bus_drops_events(self):
+        self.bus.unsubscribe(self.delivered.append)
+        self.bus.publish(ChangeEvent(INSERT, "a", None, V1))
+        self.bus.subscribe(self.delivered.append)
+        self.assertEqual(self.bus.deliver(), 0)
+
+
+class ChangeFeedTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "animals.changes.jsonl")
+        self.feed = ChangeFeed(self.path)
+
+    def tearDown(self):
+        self.feed.close()
+        self.workdir.cleanup()
+
+    def test_feed_records_local_changes_only(self):
+        self.feed([ChangeEvent(INSERT, "a", None, V1, LOCAL), ChangeEvent(INSERT, "b", None, V2, REMOTE)])
+        events, position = read_feed(self.path)
+        self.assertEqual(summary(events), [(INSERT, "a", None, V1, LOCAL)])
+        self.assertEqual(read_feed(self.path, position), ([], position))
+
+    def test_local_change_merged_with_remote_one_is_recorded(self):
+        bus = ChangeBus()
+        bus.subscribe(self.feed)
+        with bus.batch():
+            bus.publish(ChangeEvent(UPDATE, "a", V1, V2, LOCAL))
+            bus.publish(ChangeEvent(UPDATE, "a", V2, V3, REMOTE))
+        events, _ = read_feed(self.path)
+        self.assertEqual(summary(events), [(UPDATE, "a", V1, V3, LOCAL)])
+
+    def test_reading_resumes_from_a_saved_position(self):
+        self.feed([ChangeEvent(INSERT, "a", None, V1)])
+        _, position = read_feed(self.path)
+        self.feed([ChangeEvent(INSERT, "b", None, V2)])
+        events, _ = read_feed(self.path, position)
+        self.assertEqual([event.animal_id for event in events], ["b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
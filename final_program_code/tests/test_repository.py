@@ -0,0 +1,166 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Tests: Conflict Resolution
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        resolve_update / check_delete on their own, then two workstations
+        editing the same animal through InMemoryAnimalRepository, and the
+        read index staying in step with storage when a write fails.
+
+        Usage (from the final_program_code folder):
+            python -m unittest discover tests
+
+    Dependencies:
+        - unittest, tempfile : Standard library only
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import os
+import tempfile
+import unittest
+
+from shelter.models import animal_from_dict
+from shelter.repository import ConflictError, InMemoryAnimalRepository, check_delete, resolve_update
+from shelter.storage import JournaledStorage
+
+BASE = {"id": "a1", "type": "dog", "name": "Rex", "breed": "Lab", "weight": "10", "rev": 3}
+
+
+def animal(**fields):
+    record = {"id": "a1", "type": "dog", "name": "Rex", "gender": "M", "breed": "Lab", "weight": "10",
+              "dob": "2020-01-01", "microchip": "", "health_notes": "", "description": ""}
+    record.update(fields)
+    return animal_from_dict(record)
+
+# =============================================================================
+# resolve_update / check_delete
+# =============================================================================
+
+class ResolveUpdateTest(unittest.TestCase):
+    def test_no_base_saves_as_is(self):
+        saved = resolve_update(dict(BASE, name="Max", rev=7), dict(BASE, breed="Pug"))
+        self.assertEqual(saved, dict(BASE, breed="Pug", rev=8))
+
+    def test_same_revision_saves_mine(self):
+        saved = resolve_update(BASE, dict(BASE, name="Max"), base=BASE)
+        self.assertEqual(saved, dict(BASE, name="Max", rev=4))
+
+    def test_different_fields_merge(self):
+        current = dict(BASE, breed="Pug", rev=4)
+        saved = resolve_update(current, dict(BASE, name="Max"), base=BASE)
+        self.assertEqual(saved, dict(BASE, name="Max", breed="Pug", rev=5))
+
+    def test_same_change_on_both_sides_is_not_a_conflict(self):
+        current = dict(BASE, name="Max", rev=4)
+        saved = resolve_update(current, dict(BASE, name="Max"), base=BASE)
+        self.assertEqual(saved, dict(BASE, name="Max", rev=5))
+
+    def test_same_field_changed_differently_conflicts(self):
+        current = dict(BASE, name="Buddy", weight="11", rev=4)
+        with self.assertRaises(ConflictError) as raised:
+            resolve_update(current, dict(BASE, name="Max", weight="12"), base=BASE)
+        self.assertEqual(raised.exception.fields, ["name", "weight"])
+        self.assertEqual(raised.exception.current, current)
+
+    def test_force_keeps_mine_on_conflicting_fields_only(self):
+        current = dict(BASE, name="Buddy", breed="Pug", rev=4)
+        saved = resolve_update(current, dict(BASE, name="Max"), base=BASE, force=True)
+        self.assertEqual(saved, dict(BASE, name="Max", breed="Pug", rev=5))
+
+
+class CheckDeleteTest(unittest.TestCase):
+    def test_unchanged_record_can_be_deleted(self):
+        check_delete(BASE, BASE)
+        check_delete(dict(BASE, rev=9))  #no base: no check
+
+    def test_record_changed_since_read_conflicts(self):
+        with self.assertRaises(ConflictError) as raised:
+            check_delete(dict(BASE, name="Max", rev=4), BASE)
+        self.assertEqual(raised.exception.fields, ["name"])
+
+# =============================================================================
+# Two workstations — Repositories sharing one animals.json
+# =============================================================================
+
+class SharedRepositoryTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.workdir.name, "animals.json")
+        self.first = InMemoryAnimalRepository(JournaledStorage(path))
+        self.second = InMemoryAnimalRepository(JournaledStorage(path))
+        self.first.load()
+        self.first.add(animal())
+        self.second.load()
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        self.workdir.cleanup()
+
+    def test_edits_to_different_fields_merge(self):
+        base = self.second.get("a1").to_dict()
+        self.first.update(animal(name="Max"), self.first.get("a1").to_dict())
+        saved = self.second.update(animal(breed="Pug"), base)
+        self.assertEqual((saved.name, saved.breed, saved.revision), ("Max", "Pug", 2))
+
+    def test_edits_to_same_field_conflict(self):
+        base = self.second.get("a1").to_dict()
+        self.first.update(animal(name="Max"), self.first.get("a1").to_dict())
+        with self.assertRaises(ConflictError):
+            self.second.update(animal(name="Buddy"), base)
+        self.assertEqual(self.second.get("a1").name, "Max")
+
+    def test_delete_after_other_update_conflicts(self):
+        base = self.second.get("a1").to_dict()
+        self.first.update(animal(weight="12"), self.first.get("a1").to_dict())
+        with self.assertRaises(ConflictError):
+            self.second.delete("a1", base)
+
+    def test_update_of_deleted_animal_conflicts(self):
+        base = self.second.get("a1").to_dict()
+        self.first.delete("a1")
+        with self.assertRaises(ConflictError) as raised:
+            self.second.update(animal(name="Max"), base)
+        self.assertIsNone(raised.exception.current)
+
+# =============================================================================
+# Failed writes — The index must match what is stored
+# =============================================================================
+
+class FailedWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.repository = InMemoryAnimalRepository(JournaledStorage(os.path.join(self.workdir.name, "animals.json")))
+        self.repository.load()
+        self.repository.add(animal())
+
+    def tearDown(self):
+        self.repository.close()
+        self.workdir.cleanup()
+
+    def fail_writes(self):
+        def disk_full(*args):
+            raise OSError("disk full")
+        for method in ("insert", "insert_many", "update", "delete"):
+            setattr(self.repository.storage, method, disk_full)
+
+    def test_failed_add_leaves_no_phantom(self):
+        self.fail_writes()
+        with self.assertRaises(OSError):
+            self.repository.add(animal(id="b2", name="Max"))
+        self.assertIsNone(self.repository.get("b2"))
+        self.assertEqual(len(self.repository.search(name="Max")), 0)
+
+    def test_failed_delete_keeps_animal(self):
+        self.fail_writes()
+        with self.assertRaises(OSError):
+            self.repository.delete("a1")
+        self.assertIsNotNone(self.repository.get("a1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Tests: Journaled Storage
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        Journal replay, torn and damaged lines, compaction and the crash
+        points of the compaction protocol, and two processes sharing one
+        animals.json.
+
+        Usage (from the final_program_code folder):
+            python -m unittest discover tests
+
+    Dependencies:
+        - unittest, tempfile : Standard library only
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries and local modules
+# =============================================================================
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from shelter import storage
+from shelter.storage import JournaledStorage, coalesce_entries, parse_journal
+
+
+def record(key, name="Rex", rev=0):
+    return {"id": key, "type": "dog", "name": name, "rev": rev}
+
+
+class SimulatedCrash(Exception):
+    pass
+
+
+def crash_on_replace(target):
+    """
+    Patches os.replace so renaming anything onto target raises
+    SimulatedCrash, as if the process died just before that rename.
+    """
+    replace = os.replace
+
+    def fake(source, destination):
+        if destination == target:
+            raise SimulatedCrash(destination)
+        replace(source, destination)
+    return mock.patch.object(storage.os, "replace", fake)
+
+# =============================================================================
+# Replay — Snapshot plus journal
+# =============================================================================
+
+class JournalReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "animals.json")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def open_storage(self, **options):
+        opened = JournaledStorage(self.path, compact_threshold=10_000, **options)
+        self.addCleanup(opened.close)
+        return opened
+
+    def test_changes_replay_in_order(self):
+        writer = self.open_storage()
+        writer.load()
+        writer.insert("a", record("a"))
+        writer.insert_many([("b", record("b")), ("c", record("c"))])
+        writer.update("a", record("a", "Max", 1))
+        writer.delete("b")
+        self.assertEqual(self.open_storage().load(), [record("a", "Max", 1), record("c")])
+
+    def test_torn_final_line_is_ignored_and_cut_off(self):
+        writer = self.open_storage()
+        writer.load()
+        writer.insert("a", record("a"))
+        with open(writer.journal_path, "ab") as journal:
+            journal.write(b'{"op":"insert","key":"b","rec')  #crash mid-append
+        reader = self.open_storage()
+        self.assertEqual(reader.load(), [record("a")])
+        reader.insert("c", record("c"))
+        self.assertEqual(self.open_storage().load(), [record("a"), record("c")])
+
+    def test_damaged_line_is_skipped(self):
+        writer = self.open_storage()
+        writer.load()
+        writer.insert("a", record("a"))
+        with open(writer.journal_path, "ab") as journal:
+            journal.write(b"not json\n")
+        writer.insert("b", record("b"))
+        with open(writer.journal_path, "rb") as journal:
+            header, changes, _ = parse_journal(journal.read())
+        self.assertIsNone(header)
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(self.open_storage().load(), [record("a"), record("b")])
+
+    def test_batched_durability_writes_on_close(self):
+        writer = JournaledStorage(self.path, durability="batched", flush_delay=60)
+        writer.load()
+        writer.insert("a", record("a"))
+        writer.update("a", record("a", "Max", 1))
+        self.assertEqual(writer.pending(), 2)
+        writer.close()
+        self.assertEqual(self.open_storage().load(), [record("a", "Max", 1)])
+
+    def test_coalesce_entries(self):
+        entries = [{"op": "insert", "key": "a", "record": record("a")},
+                   {"op": "update", "key": "a", "record": record("a", "Max", 1)},
+                   {"op": "insert", "key": "b", "record": record("b")},
+                   {"op": "delete", "key": "b"},
+                   {"op": "delete", "key": "c"},
+                   {"op": "insert", "key": "c", "record": record("c")}]
+        self.assertEqual(coalesce_entries(entries),
+                         [{"op": "insert", "key": "a", "record": record("a", "Max", 1)},
+                          {"op": "update", "key": "c", "record": record("c")}])
+
+# =============================================================================
+# Compaction — Protocol and crash points
+# =============================================================================
+
+class CompactionTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "animals.json")
+        writer = JournaledStorage(self.path, compact_threshold=10_000)
+        writer.load()
+        writer.insert("a", record("a"))
+        writer.insert("b", record("b"))
+        writer.update("a", record("a", "Max", 1))
+        writer.close()
+        self.expected = [record("a", "Max", 1), record("b")]
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def reopen(self):
+        opened = JournaledStorage(self.path, compact_threshold=10_000)
+        self.addCleanup(opened.close)
+        return opened
+
+    def journal_header(self):
+        with open(self.path + ".journal", "rb") as journal:
+            return json.loads(journal.readline())
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        writer = self.reopen()
+        writer.load()
+        writer.compact()
+        with open(self.path, "rb") as snapshot:
+            self.assertEqual(json.loads(snapshot.read()), self.expected)
+        self.assertEqual(self.journal_header()["generation"], 3)
+        self.assertEqual(self.reopen().load(), self.expected)
+
+    def compact_and_crash_before(self, target):
+        writer = JournaledStorage(self.path, compact_threshold=10_000)
+        writer.load()
+        with crash_on_replace(target):
+            with self.assertRaises(SimulatedCrash):
+                writer.compact()
+        writer.close()
+
+    def test_crash_before_snapshot_rename_keeps_old_files(self):
+        self.compact_and_crash_before(self.path)
+        self.assertTrue(os.path.exists(self.path + ".journal.next"))
+        reader = self.reopen()
+        self.assertEqual(reader.load(), self.expected)
+        self.assertFalse(os.path.exists(self.path + ".journal.next"))
+
+    def test_crash_before_journal_rename_finishes_compaction(self):
+        self.compact_and_crash_before(self.path + ".journal")
+        reader = self.reopen()
+        self.assertEqual(reader.load(), self.expected)  #nothing applied twice
+        self.assertFalse(os.path.exists(self.path + ".journal.next"))
+        self.assertEqual(self.journal_header()["generation"], 3)
+
+    def test_writes_after_crash_recovery_survive(self):
+        self.compact_and_crash_before(self.path + ".journal")
+        writer = self.reopen()
+        writer.load()
+        writer.delete("b")
+        writer.insert("c", record("c"))
+        self.assertEqual(self.reopen().load(), [record("a", "Max", 1), record("c")])
+
+# =============================================================================
+# Sharing — Two processes on one animals.json
+# =============================================================================
+
+class SharedStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "animals.json")
+        self.first = JournaledStorage(self.path, compact_threshold=10_000)
+        self.second = JournaledStorage(self.path, compact_threshold=10_000)
+        self.first.load()
+        self.second.load()
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        self.workdir.cleanup()
+
+    def test_poll_returns_other_writers_changes(self):
+        self.first.insert("a", record("a"))
+        self.first.update("a", record("a", "Max", 1))
+        self.assertEqual([entry["op"] for entry in self.second.poll()], ["insert", "update"])
+        self.assertEqual(self.second.poll(), [])
+
+    def test_poll_follows_on_after_other_writer_compacts(self):
+        self.first.insert("a", record("a"))
+        self.assertEqual(len(self.second.poll()), 1)
+        self.first.compact()
+        self.first.insert("c", record("c"))
+        self.assertEqual([entry["key"] for entry in self.second.poll()], ["c"])
+
+    def test_compaction_of_unseen_lines_asks_for_reload(self):
+        self.first.insert("a", record("a"))
+        self.first.compact()  #folds a line the second storage never read
+        self.assertIsNone(self.second.poll())
+        self.assertEqual(self.second.load(), [record("a")])
+
+    def test_rewrite_asks_for_reload(self):
+        self.first.insert("a", record("a"))
+        self.second.poll()
+        self.first.write_all([record("z")])
+        self.assertIsNone(self.second.poll())
+        self.assertEqual(self.second.load(), [record("z")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+"""
+===============================================================================
+    Animal Shelter Pet Tracker — Virtualized Results List
+    Developed by: Emma Kaufman, Elizabeth Ehrhardt, and Nicholas Albin
+
+    Description :
+        A results list that can hold hundreds of thousands of animals while
+        only ever putting the visible rows into its Tk Listbox. The full
+        result set lives in a plain Python list; scrolling just changes which
+        slice of it is drawn. Rows can be re-sorted by name, type, breed,
+        DOB or weight without querying the data again, and patched in place
+        when listed items change.
+
+    Dependencies:
+        - tkinter            : Listbox, Scrollbar and OptionMenu widgets
+===============================================================================
+"""
+# =============================================================================
+# Imports — Standard libraries
+# =============================================================================
+
+import bisect
+import heapq
+import tkinter as tk
+from operator import itemgetter
+from tkinter import font as tkfont
+
+# =============================================================================
+# Sort Keys — Blank values always sort last
+# =============================================================================
+
+def _text_key(attribute):
+    def key(animal):
+        value = getattr(animal, attribute).lower()
+        return (value == "", value)
+    return key
+
+
+def _number_key(attribute):
+    def key(animal):
+        value = getattr(animal, attribute)
+        return (value is None, value or 0)
+    return key
+
+
+MERGE_FRACTION = 8  #a batch this fraction of the list or more is merged in instead of bisect-inserted
+
+SORT_KEYS = {
+    "Order found": None,
+    "Name": _text_key("name"),
+    "Type": _text_key("animal_type"),
+    "Breed": _text_key("breed"),
+    "DOB": _number_key("dob_ordinal"),
+    "Weight": _number_key("weight_lb"),
+}
+
+# =============================================================================
+# Virtual Result List — Draws only the visible window of a large result set
+# =============================================================================
+
+class VirtualResultList(tk.Frame):
+    """
+    Scrollable, sortable list over a backing array of result items.
+
+    Args:
+        master                  : Parent widget
+        format_row (callable)   : Turns an item into its display text
+        on_select (callable)    : Called with the selected item
+        height (int)            : Initial number of visible rows
+        item_key (callable)     : Identifies an item for patch() (default: the item itself)
+    """
+    def __init__(self, master, format_row, on_select, height=10, item_key=None):
+        super().__init__(master)
+        self.format_row = format_row
+        self.on_select = on_select
+        self.item_key = item_key or (lambda item: item)
+        self._arrival = []  #items in the order they were found
+        self.items = []  #items in display order
+        self._keys = []  #sort key of each item in self.items, while a sort is active
+        self._sort_key = None
+        self.offset = 0  #index of the first visible row
+        self.rows = height
+
+        self.sort_choice = tk.StringVar(self, value="Order found")
+        self.sort_choice.trace_add("write", lambda *args: self.sort_by(self.sort_choice.get()))
+        tk.Label(self, text="Sort by:").grid(row=0, column=0, sticky='e')
+        tk.OptionMenu(self, self.sort_choice, *SORT_KEYS).grid(row=0, column=1, sticky='w')
+
+        self.listbox = tk.Listbox(self, height=height, exportselection=False)
+        self.listbox.grid(row=1, column=0, columnspan=2, sticky='nsew')
+        self.scrollbar = tk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.scrollbar.grid(row=1, column=2, sticky='ns')
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.listbox.bind("<<ListboxSelect>>", self._selected)
+        self.listbox.bind("<Configure>", self._resized)
+        self.listbox.bind("<MouseWheel>", self._wheel)
+        self.listbox.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll(3))
+
+    def __len__(self):
+        return len(self.items)
+
+    # -------------------------------------------------------------------------
+    # Backing array
+    # -------------------------------------------------------------------------
+
+    def clear(self):
+        self._arrival = []
+        self.items = []
+        self._keys = []
+        self.offset = 0
+        self.render()
+
+    def extend(self, new_items):
+        """
+        Adds items to the result set; only redraws if they land on screen.
+
+        With a sort active only the new items' keys are computed. A small
+        batch is inserted by binary search, a large one sorted and merged
+        in, so adding a batch never re-sorts the whole list.
+        """
+        if not new_items:
+            return
+        self._arrival.extend(new_items)
+        if self._sort_key is None:
+            first = len(self.items)
+            self.items.extend(new_items)
+        else:
+            first = self._insert_sorted(new_items)
+        if first < self.offset + self.rows:
+            self.render()
+        else:
+            self._update_scrollbar()
+
+    def _insert_sorted(self, new_items):
+        """
+        Places new_items into the sorted items / keys (after equal keys, so
+        ties keep the order found). Returns the lowest index used.
+        """
+        key = self._sort_key
+        incoming = sorted(((key(item), item) for item in new_items), key=itemgetter(0))
+        if len(incoming) * MERGE_FRACTION >= len(self.items):
+            merged = list(heapq.merge(zip(self._keys, self.items), incoming, key=itemgetter(0)))
+            first = bisect.bisect_right(self._keys, incoming[0][0])
+            self._keys = [item_key for item_key, _ in merged]
+            self.items = [item for _, item in merged]
+            return first
+        first = len(self.items)
+        for item_key, item in incoming:
+            index = bisect.bisect_right(self._keys, item_key)
+            self._keys.insert(index, item_key)
+            self.items.insert(index, item)
+            first = min(first, index)
+        return first
+
+    def patch(self, replaced=None, removed=(), added=()):
+        """
+        Applies changes to the result set in place, keeping the scroll
+        position and the current sort order. With a sort active only the
+        replaced and added items are re-positioned (after any others with
+        the same key).
+
+        Args:
+            replaced (dict) : item key -> new version of a listed item
+            removed (set)   : keys of items to drop
+            added (list)    : new items, listed as extend() would
+        """
+        replaced = replaced or {}
+        if not (replaced or removed or added):
+            return
+        key_of = self.item_key
+        arrival = []
+        for item in self._arrival:
+            key = key_of(item)
+            if key not in removed:
+                arrival.append(replaced.get(key, item))
+        arrival.extend(added)
+        self._arrival = arrival
+        if self._sort_key is None:
+            self.items = list(arrival)
+        else:
+            moved = []  #replaced items, taken out and put back where their new key sorts
+            keep = []
+            for index, item in enumerate(self.items):
+                key = key_of(item)
+                if key in removed:
+                    continue
+                if key in replaced:
+                    moved.append(replaced[key])
+                    continue
+                keep.append(index)
+            if len(keep) < len(self.items):
+                self.items = [self.items[index] for index in keep]
+                self._keys = [self._keys[index] for index in keep]
+            if moved or added:
+                self._insert_sorted(moved + list(added))
+        self.offset = max(0, min(self.offset, len(self.items) - self.rows))
+        self.render()
+
+    def sort_by(self, label):
+        """
+        Re-orders the current results in memory and scrolls back to the top.
+        Each item's key is computed once and kept for later inserts.
+        """
+        key = self._sort_key = SORT_KEYS[label]
+        if key is None:
+            self.items = list(self._arrival)
+            self._keys = []
+        else:
+            keys = [key(item) for item in self._arrival]
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self.items = [self._arrival[index] for index in order]
+            self._keys = [keys[index] for index in order]
+        self.offset = 0
+        self.render()
+
+    def item_at(self, row):
+        """
+        Returns the item shown in visible listbox row row.
+        """
+        index = self.offset + row
+        return self.items[index] if 0 <= index < len(self.items) else None
+
+    def selected_item(self):
+        selection = self.listbox.curselection()
+        return self.item_at(selection[0]) if selection else None
+
+    # -------------------------------------------------------------------------
+    # Drawing and scrolling
+    # -------------------------------------------------------------------------
+
+    def render(self):
+        """
+        Redraws the listbox with only the rows currently in view.
+        """
+        window = self.items[self.offset:self.offset + self.rows]
+        self.listbox.delete(0, tk.END)
+        if window:
+            self.listbox.insert(tk.END, *(self.format_row(item) for item in window))
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if total <= self.rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.items) - self.rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def yview(self, *args):
+        """
+        Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages").
+        """
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.items)))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def _wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _resized(self, event):
+        linespace = tkfont.nametofont(self.listbox.cget("font")).metrics("linespace") + 1
+        rows = max(1, event.height // linespace)
+        if rows != self.rows:
+            self.rows = rows
+            self.scroll_to(self.offset)
+            self.render()
+
+    def _selected(self, event):
+        item = self.selected_item()
+        if item is not None:
+            self.on_select(item)